@@ -2,11 +2,10 @@ import sys
 import os
 import json
 import time
+import uuid
 
 import streamlit as st
 
-import pandas as pd
-
 
 # Add the project root to the path so "src" can be found
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -14,14 +13,20 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 # --- Paths ---
 from src.config.paths import (
     INFER_LOG_PATH,
-    LABEL_LOG_PATH,
+    INFER_INDEX_PATH,
+    LABEL_STORE_PATH,
     REVIEW_QUEUE_PATH,
     SCHED_PATH,
-    PROCESSED_DIR,
+    RESULT_CACHE_PATH,
 )
 
-from datetime import datetime, timedelta
 from src.job_manager import start_job, end_job, get_job_info
+from src.utils.result_cache import read_cache_stats
+from src.utils.log_index import InferenceLogIndex
+from src.utils.label_store import open_label_store
+from src.utils.review_queue import open_review_queue
+from src.utils.filtering import InferenceFilter
+from src.utils.ui_components import render_entry_card, render_pagination
 
 #print("cwd:", os.getcwd())
 #print("sys.path:", sys.path)
@@ -35,61 +40,20 @@ if time.time() - st.session_state.last_refresh > AUTO_REFRESH_SECONDS:
     st.experimental_rerun()
 
 # --- Loaders ---
-@st.cache_data(ttl=30)
-def load_inference_log():
-    if not os.path.exists(INFER_LOG_PATH):
-        return pd.DataFrame()
-    with open(INFER_LOG_PATH, "r") as f:
-        records = [json.loads(line) for line in f.readlines()]
-    df = pd.DataFrame(records)
-
-    if not isinstance(df, pd.DataFrame) or df.empty:
-        st.warning("No valid entries in inference log.")
-        st.stop()
-
-    df["confidence"] = df["result"].apply(lambda x: x.get("confidence", 0.0))
-    df["flagged"] = df["result"].apply(lambda x: x.get("flagged", False))
-    df["reason"] = df["result"].apply(lambda x: x.get("reason", ""))
-    df["datetime"] = df["file"].apply(lambda f: extract_datetime_from_filename(f))
-    st.write("[DEBUG] Sample resolved datetimes:", df["datetime"].tolist())
-
-    print("[DEBUG] Log loaded:", len(df))
-    print("[DEBUG] Columns:", df.columns)
-    print(df.head())
-    
-    return df
-
-from pathlib import Path
-def extract_datetime_from_filename(filename):
-    try:
-        full_path = PROCESSED_DIR / Path(filename).name
-        if full_path.exists():
-            return datetime.fromtimestamp(full_path.stat().st_mtime)
-        else:
-            print(f"[WARN] File not found: {full_path}")
-    except Exception as e:
-        print(f"[ERROR] Failed to get datetime for {filename}: {e}")
-    return datetime.min
-
-def load_metadata_from_file(path):
-    try:
-        with open(path, "r") as f:
-            return json.load(f)
-    except:
-        return {}
+@st.cache_resource
+def get_inference_index():
+    # Survives reruns; each sync only ingests lines appended to the log since the last one.
+    return InferenceLogIndex(INFER_INDEX_PATH, INFER_LOG_PATH)
 
-def save_manual_label(metadata_id, label):
-    label_entry = {
-        "id": metadata_id,
-        "label": label,
-        "timestamp": datetime.now().isoformat()
-    }
+def load_inference_index():
+    index = get_inference_index()
+    added = index.sync()
+    print(f"[DEBUG] Log index synced: +{added} rows")
+    return index
 
-    # Ensure labels directory exists
-    Path(LABEL_LOG_PATH).parent.mkdir(parents=True, exist_ok=True)
-
-    with open(LABEL_LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(json.dumps(label_entry) + "\n")
+def save_manual_label(metadata_id, label):
+    # Streamlit reruns re-submit every set radio; the store ignores unchanged labels.
+    open_label_store(LABEL_STORE_PATH).set(metadata_id, label)
 
 def export_to_csv(df):
     return df.to_csv(index=False).encode("utf-8")
@@ -129,17 +93,21 @@ al_cfg["interval_minutes"] = interval
 sched_cfg["active_learning"] = al_cfg
 save_sched(sched_cfg)
 
+# --- Sidebar: Inference Cache ---
+st.sidebar.markdown("### Inference Cache")
+cache_stats = read_cache_stats(RESULT_CACHE_PATH)
+st.sidebar.write(
+    f"Hits: {int(cache_stats['hits'])} | Misses: {int(cache_stats['misses'])} "
+    f"| Hit rate: {cache_stats['hit_rate']:.0%}"
+)
+st.sidebar.write(f"Model time saved: {cache_stats['saved_seconds']:.1f}s ({cache_stats['entries']} entries)")
+
 # --- Main Dashboard ---
 st.title("Disinformation Detection Dashboard")
 
-df = load_inference_log()
-st.write("[DEBUG] Loaded log data:")
-st.write(df)
+index = load_inference_index()
 
-if not df.empty:
-    st.write("[DEBUG] Sample confidence values:", df["confidence"].tolist())
-    st.write("[DEBUG] Sample datetime values:", df["datetime"].tolist())
-if df.empty:
+if index.count() == 0:
     st.warning("No inference logs found.")
     st.stop()
 
@@ -154,56 +122,35 @@ min_conf_pct = st.sidebar.slider("Min Confidence (%)", 0, 100, 50, step=1)
 min_conf = min_conf_pct / 100.0
 
 days_back = st.sidebar.slider("Days Back", 0, 30, 7)
-
-from datetime import time as dtime
-# Create today's start timestamp to include entries from today
-time_threshold = pd.Timestamp.combine(
-    pd.Timestamp.now().date() - pd.Timedelta(days=days_back),
-    dtime.min
+collapse = st.sidebar.checkbox("Collapse near-duplicates", value=False)
+
+# Predicates are pushed down to the indexed log store.
+query = (
+    InferenceFilter(index)
+    .filter_by_date(days_back)
+    .filter_by_type(filter_type)
+    .filter_by_flagged(filter_flagged)
+    .filter_by_confidence(min_conf)
+    .collapse_duplicates(collapse)
 )
+total = query.count()
 
-df = df[df["datetime"] >= time_threshold]
-if filter_type != "All":
-    df = df[df["type"] == filter_type]
-if filter_flagged:
-    df = df[df["flagged"] == True]
-df = df[df["confidence"] >= min_conf]
+st.markdown(f"### {total} entries found")
 
-st.markdown(f"### {len(df)} entries found")
+# --- Pagination ---
+# Only one page is fetched and rendered per rerun, however many rows match.
+page_args = render_pagination(total)
+df = query.get_filtered(**page_args)
 
 # --- Export ---
-if not df.empty:
-    csv = export_to_csv(df)
+# Pulling every matching row is only done when asked for.
+if total and st.button("Prepare CSV Export"):
+    csv = export_to_csv(query.get_filtered(sort_by=page_args["sort_by"], descending=page_args["descending"]))
     st.download_button("Export Filtered Results to CSV", data=csv, file_name="disinfo_results.csv")
 
 # --- Show Results ---
-for idx, row in df.iterrows():
-    st.subheader(f"{row['type'].capitalize()} | Confidence: {int(row['confidence'] * 100)}%")
-    st.write(f"**Flagged**: {'Yes' if row['flagged'] else 'No'}")
-    st.write(f"**Reason**: {row['reason']}")
-    st.write(f"**File**: `{row['file']}`")
-
-    metadata = load_metadata_from_file(row["file"])
-    preview = metadata.get("text", "")[:1000]
-    st.text_area("Preview", preview, height=200, key=f"preview_{idx}")
-
-    if metadata.get("named_entities"):
-        st.markdown("**Named Entities:**")
-        st.write(", ".join(metadata["named_entities"][:10]))
-
-    if metadata.get("url"):
-        st.markdown(f"[Source Link]({metadata['url']})")
-
-    label = st.radio(
-        f"Label this item (ID: {row['file']})",
-        options=["None", "Disinformation", "Uncertain", "Legit"],
-        key=row["file"]
-    )
-    if label != "None":
-        save_manual_label(row["file"], label)
-        st.success(f"Labeled as: {label}")
-
-    st.markdown("---")
+for _, row in df.iterrows():
+    render_entry_card(row)
 
 # --- Job Monitor ---
 st.markdown("## Job Monitor")
@@ -219,18 +166,34 @@ else:
 # --- Review Queue ---
 st.markdown("### Review Queue")
 
-if os.path.exists(REVIEW_QUEUE_PATH):
-    with open(REVIEW_QUEUE_PATH, "r") as f:
-        queue = [json.loads(line) for line in f.readlines()]
-else:
-    queue = []
-
-if not queue:
+@st.cache_resource
+def get_review_queue():
+    queue = open_review_queue()
+    # One-time import of the old append-only queue file.
+    if os.path.exists(REVIEW_QUEUE_PATH):
+        queue.import_jsonl(REVIEW_QUEUE_PATH)
+        os.replace(REVIEW_QUEUE_PATH, f"{REVIEW_QUEUE_PATH}.imported")
+    return queue
+
+review_queue = get_review_queue()
+if "reviewer_id" not in st.session_state:
+    st.session_state.reviewer_id = uuid.uuid4().hex
+
+pending = len(review_queue)
+st.write(f"{pending} items pending")
+
+claim_k = st.number_input("Items to claim", min_value=1, max_value=50, value=5, step=1)
+if st.button("Claim next items"):
+    review_queue.claim_next(claim_k, st.session_state.reviewer_id)
+
+# Only this reviewer's claimed batch is loaded; other reviewers get different items.
+claimed = review_queue.claimed(st.session_state.reviewer_id)
+if not pending and not claimed:
     st.success("No items in review queue.")
 else:
-    for item in queue:
+    for item in claimed:
         st.subheader(f"Sample | Uncertainty: {int(item['uncertainty'] * 100)}%")
-        st.text_area("Text", item["text"], height=200)
+        st.text_area("Text", item["text"], height=200, key=item["file"] + "_queue_text")
         label = st.radio(
             "Assign label",
             ["None", "Disinformation", "Uncertain", "Legit"],
@@ -238,4 +201,5 @@ else:
         )
         if label != "None":
             save_manual_label(item["file"], label)
+            review_queue.complete(item["file"])
             st.success(f"Labeled as {label}")
@@ -1,44 +1,194 @@
 # src/models/bert_model.py
 
+import json
+from pathlib import Path
+
+import numpy as np
 import torch
-from transformers import BertTokenizer, BertForSequenceClassification
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
 from torch.nn.functional import softmax
 
+LABELS = ["real", "disinfo"]
+# Class that counts as disinformation in checkpoints saved with label_classes.json
+# (the active-learning checkpoints under models/active_learning/).
+DISINFO_CLASS = "Disinformation"
+BACKENDS = ("torch", "int8", "onnx")
+ONNX_DIR = Path(__file__).resolve().parent / "onnx"
+
+def onnx_cache_name(source):
+    """
+    File name for the cached ONNX export of a model. For a local checkpoint
+    directory it includes the newest file mtime, so retraining into the same
+    directory gets a fresh export.
+    """
+    path = Path(source)
+    if not path.is_dir():
+        return path.name
+    stamp = max((f.stat().st_mtime_ns for f in path.iterdir() if f.is_file()), default=0)
+    return f"{path.name}-{stamp:x}"
+
 class BertDisinfoModel:
-    def __init__(self, model_name="bert-base-uncased", checkpoint_path=None):
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.tokenizer = BertTokenizer.from_pretrained(model_name)
+    def __init__(self, model_name="bert-base-uncased", checkpoint_path=None, max_length=512,
+                 backend="torch", onnx_path=None, num_threads=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Choose one of {BACKENDS}.")
+        self.backend = backend
+        self.device = torch.device("cuda" if torch.cuda.is_available() and backend == "torch" else "cpu")
+        self.tokenizer = AutoTokenizer.from_pretrained(checkpoint_path or model_name)
+        self.max_length = max_length
+        self.session = None
+        if num_threads:
+            torch.set_num_threads(num_threads)
 
+        self.labels = LABELS
+        self.disinfo_index = 1
         if checkpoint_path:
-            self.model = BertForSequenceClassification.from_pretrained(checkpoint_path)
+            self.model = AutoModelForSequenceClassification.from_pretrained(checkpoint_path)
+            classes_path = Path(checkpoint_path) / "label_classes.json"
+            if classes_path.exists():
+                with open(classes_path, "r") as f:
+                    self.labels = json.load(f)
+                self.disinfo_index = self.labels.index(DISINFO_CLASS)
         else:
             # Start with a base model for demo/testing purposes
-            self.model = BertForSequenceClassification.from_pretrained(
+            self.model = AutoModelForSequenceClassification.from_pretrained(
                 model_name, num_labels=2
             )
 
         self.model.to(self.device)
         self.model.eval()
 
+        if backend == "int8":
+            # Dynamic quantization: int8 weights for every Linear layer, activations quantized on the fly.
+            self.model = torch.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        elif backend == "onnx":
+            if onnx_path is None:
+                onnx_path = ONNX_DIR / f"{onnx_cache_name(checkpoint_path or model_name)}.onnx"
+                if checkpoint_path and Path(checkpoint_path).is_dir():
+                    # Exports of earlier trainings into the same checkpoint directory are stale now.
+                    for stale in ONNX_DIR.glob(f"{Path(checkpoint_path).name}-*.onnx"):
+                        if stale != onnx_path:
+                            stale.unlink()
+            onnx_path = Path(onnx_path)
+            if not onnx_path.exists():
+                self.export_onnx(onnx_path)
+            self.session = self._load_onnx_session(onnx_path, num_threads)
+
+    def export_onnx(self, onnx_path):
+        onnx_path = Path(onnx_path)
+        onnx_path.parent.mkdir(parents=True, exist_ok=True)
+        dummy = self.tokenizer(["export"], return_tensors="pt").to(self.device)
+        # score_encoded only feeds what tokenizer.pad produces from bare input ids.
+        names = ["input_ids", "attention_mask"]
+        axes = {name: {0: "batch", 1: "sequence"} for name in names}
+        axes["logits"] = {0: "batch"}
+        torch.onnx.export(
+            self.model,
+            tuple(dummy[name] for name in names),
+            str(onnx_path),
+            input_names=names,
+            output_names=["logits"],
+            dynamic_axes=axes,
+            opset_version=14
+        )
+        print(f"[ONNX] Exported model to {onnx_path}")
+        return onnx_path
+
+    @staticmethod
+    def _load_onnx_session(onnx_path, num_threads=None):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("The 'onnx' backend requires onnxruntime (pip install onnxruntime).") from e
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        return ort.InferenceSession(str(onnx_path), options, providers=["CPUExecutionProvider"])
+
     def _tokenize(self, texts):
         return self.tokenizer(
             texts,
             padding=True,
             truncation=True,
-            max_length=512,
+            max_length=self.max_length,
             return_tensors="pt"
         ).to(self.device)
 
-    def predict(self, texts):
-        inputs = self._tokenize(texts)
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            preds = torch.argmax(outputs.logits, dim=1).tolist()
-        return ["disinfo" if p == 1 else "real" for p in preds]
+    def encode(self, texts):
+        """Token ids per text, truncated but not padded."""
+        return self.tokenizer(
+            texts,
+            truncation=True,
+            max_length=self.max_length,
+        )["input_ids"]
 
-    def predict_proba(self, texts):
-        inputs = self._tokenize(texts)
+    def encode_windows(self, texts, stride=128, max_windows=None):
+        """
+        Token-id windows per text, covering the whole text instead of
+        truncating it. Each window holds up to max_length tokens including
+        [CLS]/[SEP], and consecutive windows overlap by `stride` tokens. With
+        `max_windows`, very long texts get that many windows spread evenly
+        over the document.
+        """
+        body = self.max_length - self.tokenizer.num_special_tokens_to_add()
+        step = max(body - stride, 1)
+        windows = []
+        for ids in self.tokenizer(texts, add_special_tokens=False, verbose=False)["input_ids"]:
+            starts = list(range(0, max(len(ids) - body, 0) + 1, step))
+            if starts[-1] + body < len(ids):
+                starts.append(len(ids) - body)
+            if max_windows and len(starts) > max_windows:
+                starts = [starts[i] for i in np.linspace(0, len(starts) - 1, max_windows).round().astype(int)]
+            windows.append([self.tokenizer.build_inputs_with_special_tokens(ids[s:s + body]) for s in starts])
+        return windows
+
+    def score_encoded(self, input_ids):
+        """
+        One forward pass over a batch of pre-encoded texts.
+        Pads to the longest sequence in the batch and returns (labels, probabilities).
+        """
+        if self.session is not None:
+            inputs = self.tokenizer.pad({"input_ids": input_ids}, padding=True, return_tensors="np")
+            feed = {i.name: inputs[i.name].astype(np.int64) for i in self.session.get_inputs()}
+            logits = self.session.run(["logits"], feed)[0]
+            exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probs = exp / exp.sum(axis=1, keepdims=True)
+            return [self.labels[p] for p in probs.argmax(axis=1)], probs.tolist()
+
+        inputs = self.tokenizer.pad(
+            {"input_ids": input_ids},
+            padding=True,
+            return_tensors="pt"
+        ).to(self.device)
         with torch.no_grad():
             outputs = self.model(**inputs)
             probs = softmax(outputs.logits, dim=1)
-        return probs.cpu().tolist()
+        preds = torch.argmax(probs, dim=1).tolist()
+        return [self.labels[p] for p in preds], probs.cpu().tolist()
+
+    def score(self, texts):
+        return self.score_encoded(self.encode(texts))
+
+    def predict(self, texts):
+        labels, _ = self.score(texts)
+        return labels
+
+    def predict_proba(self, texts):
+        _, probs = self.score(texts)
+        return probs
+
+    def embed(self, texts, batch_size=32):
+        """Mean-pooled last-layer embeddings (float32), e.g. for the similarity index."""
+        chunks = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self._tokenize(list(texts[start:start + batch_size]))
+            with torch.no_grad():
+                hidden = self.model(**inputs, output_hidden_states=True).hidden_states[-1]
+            mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+            chunks.append(pooled.float().cpu().numpy())
+        return np.concatenate(chunks) if chunks else np.empty((0, self.model.config.hidden_size), dtype=np.float32)
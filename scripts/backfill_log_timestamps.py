@@ -0,0 +1,64 @@
+# scripts/backfill_log_timestamps.py
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.config.paths import INFER_LOG_PATH, PROJECT_ROOT, RECORD_STORE_DIR
+from src.utils.record_store import RecordStore
+from src.utils.time_utils import publish_timestamp
+
+def resolve_source(ref, store):
+    """(ingested_at, metadata) for a log 'file' value: a per-item JSON path or a record-store id."""
+    for path in (Path(ref), PROJECT_ROOT / ref):
+        if path.is_file():
+            with open(path, "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+            return datetime.fromtimestamp(path.stat().st_mtime).isoformat(), metadata
+    if store is not None:
+        ts = store.ingested_at(ref)
+        if ts is not None:
+            return datetime.fromtimestamp(ts).isoformat(), store.get(ref)
+    return None, {}
+
+def backfill(log_path, store_dir):
+    """Rewrite the log in place. Best run while ingestion is paused."""
+    store = RecordStore(store_dir) if Path(store_dir).exists() else None
+    tmp_path = f"{log_path}.backfill"
+    filled = missing = total = 0
+
+    with open(log_path, "rb") as src, open(tmp_path, "w", encoding="utf-8") as dst:
+        for line in src:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            total += 1
+            if "ingested_at" not in record:
+                ingested_at, metadata = resolve_source(record.get("file", ""), store)
+                record["ingested_at"] = ingested_at
+                record["published_at"] = publish_timestamp(metadata)
+                if ingested_at:
+                    filled += 1
+                else:
+                    missing += 1
+            dst.write(json.dumps(record) + "\n")
+        end = src.tell()
+
+    # Carry over anything appended while we were rewriting.
+    with open(log_path, "rb") as src, open(tmp_path, "ab") as dst:
+        src.seek(end)
+        dst.write(src.read())
+    os.replace(tmp_path, log_path)
+    print(f"[DONE] {total} log records: {filled} backfilled, {missing} without a resolvable source")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add ingested_at/published_at to existing inference log records.")
+    parser.add_argument("--log", default=str(INFER_LOG_PATH))
+    parser.add_argument("--store-dir", default=str(RECORD_STORE_DIR))
+    args = parser.parse_args()
+    backfill(args.log, args.store_dir)
@@ -0,0 +1,108 @@
+# scripts/benchmark_backends.py
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from models.bert_model import BACKENDS, BertDisinfoModel
+
+SAMPLE_TEXTS = [
+    "Breaking: Officials confirm new cyber campaign targeting elections.",
+    "Experts warn of AI-generated content used to sway voters.",
+    "Community celebrates record turnout at local event.",
+    "Viral post claims vaccine has microchips—experts disagree.",
+    "Transcript shows misleading edits in viral interview clip.",
+]
+
+def load_texts(path, limit):
+    if not path:
+        return (SAMPLE_TEXTS * (limit // len(SAMPLE_TEXTS) + 1))[:limit]
+    texts = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                texts.append(json.loads(line)["text"])
+            if len(texts) >= limit:
+                break
+    return texts
+
+def run_backend(model, texts, batch_size):
+    encoded = model.encode(texts)
+    model.score_encoded(encoded[:batch_size])  # warm-up
+
+    latencies, probs = [], []
+    start = time.perf_counter()
+    for i in range(0, len(encoded), batch_size):
+        t0 = time.perf_counter()
+        _, batch_probs = model.score_encoded(encoded[i:i + batch_size])
+        latencies.append((time.perf_counter() - t0) * 1000)
+        probs.extend(batch_probs)
+    elapsed = time.perf_counter() - start
+    return np.array(probs), np.array(latencies), elapsed
+
+def parity(reference, candidate):
+    """Label agreement and max absolute probability drift against the fp32 reference."""
+    agreement = float(np.mean(reference.argmax(axis=1) == candidate.argmax(axis=1)))
+    drift = float(np.max(np.abs(reference - candidate)))
+    return agreement, drift
+
+def compare_backends(texts, args, checkpoint, onnx_path=None):
+    reference = None
+    failures = []
+    for backend in ["torch"] + [b for b in args.backends if b != "torch"]:
+        model = BertDisinfoModel(checkpoint_path=checkpoint, backend=backend, num_threads=args.threads,
+                                 onnx_path=onnx_path)
+        probs, latencies, elapsed = run_backend(model, texts, args.batch_size)
+
+        line = (f"[BENCH] {backend:<6} {len(texts) / elapsed:8.1f} texts/sec  "
+                f"p50 {np.percentile(latencies, 50):7.1f} ms  p99 {np.percentile(latencies, 99):7.1f} ms")
+        if reference is None:
+            reference = probs
+        else:
+            agreement, drift = parity(reference, probs)
+            line += f"  agreement {agreement:.4f}  max drift {drift:.4f}"
+            if agreement < args.min_agreement or drift > args.max_drift:
+                failures.append(backend)
+        print(line)
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare CPU inference backends for BertDisinfoModel.")
+    parser.add_argument("--input", help="JSONL file with a 'text' field (defaults to built-in samples)")
+    parser.add_argument("--limit", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--checkpoint", default=None,
+                        help="Fine-tuned checkpoint (default: one randomly initialized head shared by all backends)")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--min-agreement", type=float, default=0.99)
+    parser.add_argument("--max-drift", type=float, default=0.05)
+    args = parser.parse_args()
+
+    texts = load_texts(args.input, args.limit)
+    print(f"[BENCH] {len(texts)} texts, batch size {args.batch_size}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        checkpoint, onnx_path = args.checkpoint, None
+        if checkpoint is None:
+            # Every base-model load draws a new random head; save one so all backends share its weights.
+            base = BertDisinfoModel()
+            base.model.save_pretrained(tmp_dir)
+            base.tokenizer.save_pretrained(tmp_dir)
+            checkpoint, onnx_path = tmp_dir, Path(tmp_dir) / "model.onnx"
+        failures = compare_backends(texts, args, checkpoint, onnx_path)
+
+    if failures:
+        print(f"[PARITY] FAILED for: {', '.join(failures)}")
+        sys.exit(1)
+    print("[PARITY] All backends within tolerance of fp32.")
+
+if __name__ == "__main__":
+    main()
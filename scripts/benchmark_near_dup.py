@@ -0,0 +1,87 @@
+# scripts/benchmark_near_dup.py
+#
+# Insert throughput of NearDupIndex as it grows, on a synthetic stream where
+# a share of records are lightly edited copies of earlier ones (the shape of
+# a coordinated campaign). Reports records/sec per checkpoint, so a flat
+# curve shows insert cost staying constant with index size, plus how many
+# planted copies landed in their source's cluster.
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.utils.near_dup import NearDupIndex
+
+def synthetic_stream(n, dup_rate, words_per_text, vocab_size, seed=0):
+    """Yields (record_id, text, source_id or None) with `dup_rate` of records copying an earlier one."""
+    rng = np.random.RandomState(seed)
+    vocab = np.array([f"w{i}" for i in range(vocab_size)])
+    originals = []
+    for i in range(n):
+        if originals and rng.rand() < dup_rate:
+            source_id, words = originals[rng.randint(len(originals))]
+            words = list(words)
+            for _ in range(max(1, len(words) // 20)):  # ~5% of words edited
+                words[rng.randint(len(words))] = vocab[rng.randint(vocab_size)]
+            yield f"r{i}", " ".join(words), source_id
+        else:
+            words = vocab[rng.randint(vocab_size, size=words_per_text)]
+            if len(originals) < 100_000:
+                originals.append((f"r{i}", words))
+            yield f"r{i}", " ".join(words), None
+
+def run(n, batch_size, checkpoint, dup_rate, words_per_text, vocab_size, db_path):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    index = NearDupIndex(db_path)
+
+    batch, copies, done = [], [], 0
+    found = total_copies = 0
+    start = window_start = time.perf_counter()
+    for rid, text, source_id in synthetic_stream(n, dup_rate, words_per_text, vocab_size):
+        batch.append((rid, text))
+        copies.append(source_id)
+        if len(batch) < batch_size:
+            continue
+
+        clusters = index.assign_many(batch)
+        for (cluster_id, _), source_id in zip(clusters, copies):
+            if source_id is not None:
+                total_copies += 1
+                found += index.cluster_of(source_id)[0] == cluster_id
+        done += len(batch)
+        batch, copies = [], []
+
+        if done % checkpoint == 0:
+            now = time.perf_counter()
+            print(f"[BENCH] {done:>11,} records | {checkpoint / (now - window_start):>8,.0f} rec/s "
+                  f"(overall {done / (now - start):,.0f}) | db {os.path.getsize(db_path) / 1e9:.2f} GB")
+            window_start = now
+
+    if batch:
+        index.assign_many(batch)
+        done += len(batch)
+    elapsed = time.perf_counter() - start
+    print(f"[DONE] {done:,} records in {elapsed:.0f}s ({done / elapsed:,.0f} rec/s), "
+          f"copies clustered with their source: {found / max(total_copies, 1):.1%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate clustering insert throughput.")
+    parser.add_argument("--records", type=int, default=10_000_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--checkpoint", type=int, default=500_000)
+    parser.add_argument("--dup-rate", type=float, default=0.2)
+    parser.add_argument("--words", type=int, default=40, help="Words per synthetic text")
+    parser.add_argument("--vocab", type=int, default=50_000)
+    parser.add_argument("--db", default="/tmp/near_dup_bench.sqlite")
+    args = parser.parse_args()
+    if args.checkpoint % args.batch_size:
+        parser.error("--checkpoint must be a multiple of --batch-size")
+    run(args.records, args.batch_size, args.checkpoint, args.dup_rate, args.words, args.vocab, args.db)
@@ -0,0 +1,48 @@
+# scripts/build_vector_index.py
+#
+# Backfill the similarity index from the record store. New records are
+# indexed as they are saved when VECTOR_INDEX_ENABLED=1; this covers
+# everything stored before that. Records already in the index are skipped,
+# so the script can be re-run safely.
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.config.paths import RECORD_STORE_DIR, VECTOR_INDEX_DIR
+from src.inference.runner_model import EMBEDDING_MODEL, load_embedder
+from src.utils.record_store import RecordStore
+from src.utils.vector_index import VectorIndex
+
+def build(store_dir, index_dir, batch_size=256, nlist=1024):
+    model = load_embedder()
+    index = VectorIndex(index_dir, nlist=nlist, model=EMBEDDING_MODEL)
+    batch, added, seen = [], 0, 0
+
+    def flush():
+        nonlocal added
+        embeddings = model.embed([record["text"] for _, record in batch])
+        added += index.add_many(zip((rid for rid, _ in batch), embeddings))
+        batch.clear()
+
+    for rid, record in RecordStore(store_dir).iter_records():
+        seen += 1
+        if record.get("text") and rid not in index:
+            batch.append((rid, record))
+        if len(batch) >= batch_size:
+            flush()
+            print(f"[VECTOR] {seen:,} records read, {added:,} indexed")
+    if batch:
+        flush()
+    print(f"[DONE] {added:,} records added; index now holds {len(index):,}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embed stored records into the similarity index.")
+    parser.add_argument("--store", default=str(RECORD_STORE_DIR))
+    parser.add_argument("--index", default=str(VECTOR_INDEX_DIR))
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--nlist", type=int, default=1024, help="IVF lists; ~sqrt(expected records) works well")
+    args = parser.parse_args()
+    build(args.store, args.index, args.batch_size, args.nlist)
@@ -0,0 +1,52 @@
+# scripts/compact_labels.py
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.config.paths import LABEL_LOG_PATH, LABEL_STORE_PATH
+from src.utils.label_store import LabelStore
+
+def compact(log_path, store_path, rewrite=True, backup=True):
+    """
+    Fold the append-only label log into the label store (latest label per id)
+    and optionally rewrite the log itself with one line per id.
+    """
+    store = LabelStore(store_path)
+    if not os.path.exists(log_path):
+        print(f"[COMPACT] No label log at {log_path}")
+        return len(store)
+
+    with open(log_path, "r", encoding="utf-8") as f:
+        before = sum(1 for _ in f)
+    # Labels written through the store since the last compaction are newer than the log's.
+    changed = store.merge_legacy_log(log_path)
+    print(f"[COMPACT] {before} log lines -> {len(store)} labels ({changed} rows changed)")
+
+    if rewrite:
+        tmp_path = f"{log_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for rid, label, updated_at in store.conn.execute(
+                "SELECT id, label, updated_at FROM labels ORDER BY updated_at"
+            ):
+                f.write(json.dumps({"id": rid, "label": label, "timestamp": updated_at}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if backup:
+            os.replace(log_path, f"{log_path}.bak")
+        os.replace(tmp_path, log_path)
+        print(f"[DONE] Rewrote {log_path}" + (f" (original kept as {log_path}.bak)" if backup else ""))
+    return len(store)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deduplicate manual labels into the SQLite label store.")
+    parser.add_argument("--log", default=str(LABEL_LOG_PATH))
+    parser.add_argument("--store", default=str(LABEL_STORE_PATH))
+    parser.add_argument("--no-rewrite", action="store_true", help="Leave the JSONL log untouched")
+    parser.add_argument("--no-backup", action="store_true", help="Don't keep the original log as .bak")
+    args = parser.parse_args()
+    compact(args.log, args.store, rewrite=not args.no_rewrite, backup=not args.no_backup)
@@ -0,0 +1,67 @@
+# scripts/migrate_processed_to_store.py
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.config.paths import PROCESSED_DIR, PROJECT_ROOT
+from src.utils.record_store import RecordStore
+
+FOLDERS = ["articles", "tweets", "transcripts"]
+
+def legacy_path(path, root=PROJECT_ROOT):
+    """The path as the pipeline wrote it (relative to the project root, e.g. data/processed/articles/x.json)."""
+    path = os.path.abspath(path)
+    root = os.path.abspath(root)
+    return os.path.relpath(path, root) if path.startswith(root + os.sep) else path
+
+def iter_legacy_records(processed_dir, root=PROJECT_ROOT):
+    for folder in FOLDERS:
+        dir_path = Path(processed_dir) / folder
+        if not dir_path.exists():
+            continue
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    record = json.load(f)
+                # Old files were named by tweet/video id or a random UUID; keep that as the id
+                # and remember the path in the form the inference log and labels used, so they still resolve.
+                record.setdefault("source_file", legacy_path(entry.path, root))
+                yield Path(entry.name).stem, record, entry.path
+
+def migrate(processed_dir, store_dir, batch_size=1000, delete=False, root=PROJECT_ROOT):
+    store = RecordStore(store_dir)
+    batch, paths, total = [], [], 0
+    for rid, record, path in iter_legacy_records(processed_dir, root):
+        batch.append((rid, record))
+        paths.append(path)
+        if len(batch) >= batch_size:
+            total += store.append_many(batch)
+            if delete:
+                for p in paths:
+                    os.remove(p)
+            batch, paths = [], []
+            print(f"[MIGRATE] {total} records")
+    if batch:
+        total += store.append_many(batch)
+        if delete:
+            for p in paths:
+                os.remove(p)
+    print(f"[DONE] Migrated {total} records into {store_dir} ({len(store)} live ids)")
+    return total
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move per-item JSON files into the sharded record store.")
+    parser.add_argument("--processed-dir", default=str(PROCESSED_DIR))
+    parser.add_argument("--store-dir", default=None)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--delete", action="store_true", help="Remove each JSON file once it is stored")
+    args = parser.parse_args()
+    migrate(args.processed_dir, args.store_dir or os.path.join(args.processed_dir, "store"),
+            batch_size=args.batch_size, delete=args.delete)
@@ -1,51 +1,161 @@
 import os
 import json
-import numpy as np
 import pandas as pd
-from preprocess import preprocess_and_vectorize
+from preprocess import preprocess_and_vectorize, load_manual_labels, RECORD_STORE_DIR
 from models.bert_model import BertDisinfoModel
+from utils.review_queue import ReviewQueue
+from utils.checkpoints import CheckpointRegistry
+from utils.record_store import open_record_store
+from utils.sampling_utils import select_diverse, select_uncertain
+from utils.embedding_cache import EmbeddingCache
+from utils.score_cache import ScoreCache
 
-REVIEW_QUEUE_PATH = "../labels/review_queue.jsonl"
+REVIEW_QUEUE_PATH = "../labels/review_queue.sqlite"
+LABEL_STORE_PATH = "../labels/labels.sqlite"
+CHECKPOINT_DIR = "../models/active_learning"
+SCHEDULER_CONFIG_PATH = "../logs/scheduler_config.json"
+SCORE_CACHE_PATH = "../data/cache/uncertainty_scores.sqlite"
+EMBEDDING_CACHE_DIR = "../data/cache/embeddings"
 NUM_QUERY_SAMPLES = 10  # number of uncertain samples to queue
 
-def entropy(probabilities):
-    return -np.sum(probabilities * np.log(probabilities + 1e-9), axis=1)
+# Overridable per deployment under "active_learning" in scheduler_config.json.
+DEFAULT_TRAINING_CONFIG = {
+    "full_retrain_every": 24,  # rounds between full retrains from the base model
+    "replay_size": 500,        # previously trained labels mixed into each incremental round
+    "incremental_epochs": 1,
+    "full_epochs": 3,
+    "keep_checkpoints": 5,
+    "uncertainty": "entropy",  # entropy | margin | least_confidence
+    "score_batch_size": 64,
+    "score_max_age_hours": 24,
+    "selection": "diverse",    # diverse | uncertainty
+    "diversity_candidates": 20  # most-uncertain items per queued item that diversity selection picks from
+}
+
+def load_training_config():
+    config = dict(DEFAULT_TRAINING_CONFIG)
+    if os.path.exists(SCHEDULER_CONFIG_PATH):
+        with open(SCHEDULER_CONFIG_PATH, "r") as f:
+            section = json.load(f).get("active_learning", {})
+        config.update({k: section[k] for k in DEFAULT_TRAINING_CONFIG if k in section})
+    return config
+
+def plan_training_set(df, latest_labels, config, rounds_since_full, seed=None):
+    """
+    Choose full vs. incremental training for this round.
+
+    Returns (full_retrain, train_df). An incremental round trains on labels
+    that are new or changed since the latest checkpoint plus a random replay
+    sample of the rest, so its cost tracks the labeling rate rather than the
+    total number of labels.
+    """
+    if latest_labels is None or rounds_since_full + 1 >= config["full_retrain_every"]:
+        return True, df
+    if not set(df["label"]) <= set(latest_labels.values()):
+        # A class the checkpoint has never seen needs a fresh classifier head.
+        return True, df
+
+    is_new = (df["source_file"].map(latest_labels) != df["label"]).to_numpy()
+    new_df = df[is_new]
+    if len(new_df) == 0:
+        return False, new_df
+    old_df = df[~is_new]
+    replay = old_df.sample(n=min(config["replay_size"], len(old_df)), random_state=seed)
+    return False, pd.concat([new_df, replay])
 
 def run_active_learning_round():
     X, y, df = preprocess_and_vectorize()
 
-    if X.empty or len(y.unique()) < 2:
+    if X.shape[0] == 0 or len(y.unique()) < 2:
         print("[ACTIVE] Not enough labeled data to train.")
         return
 
-    model = BertDisinfoModel()
-    print("[ACTIVE] Training BERT model on labeled data...")
-    model.fit(df["text"], y)
+    config = load_training_config()
+    registry = CheckpointRegistry(CHECKPOINT_DIR, keep=config["keep_checkpoints"])
+    latest = registry.latest()
+    latest_labels = registry.trained_labels(latest) if latest else None
+    full_retrain, train_df = plan_training_set(df, latest_labels, config, registry.rounds_since_full())
 
-    all_df = df.copy()
-    all_df["is_labeled"] = all_df["label"].notnull()
-    unlabeled_df = all_df[~all_df["is_labeled"]].copy()
+    if full_retrain:
+        model = BertDisinfoModel()
+        print(f"[ACTIVE] Full retrain of BERT on {len(train_df)} labeled samples...")
+        model.fit(train_df["text"], train_df["label"], epochs=config["full_epochs"])
+    else:
+        model = BertDisinfoModel.load(registry.path(latest))
+        if len(train_df):
+            print(f"[ACTIVE] Warm-starting from {latest['version']} on {len(train_df)} samples "
+                  f"(new/changed labels + replay)...")
+            model.fit(train_df["text"], train_df["label"], epochs=config["incremental_epochs"])
+        else:
+            print(f"[ACTIVE] No new labels since {latest['version']}; reusing it.")
 
-    if len(unlabeled_df) == 0:
-        print("[ACTIVE] No unlabeled samples available.")
-        return
+    if full_retrain or len(train_df):
+        checkpoint_dir = registry.next_dir()
+        model.save(str(checkpoint_dir))
+        entry = registry.commit(
+            checkpoint_dir,
+            dict(zip(df["source_file"], df["label"])),
+            full_retrain=full_retrain,
+            trained_on=len(train_df),
+            parent=None if full_retrain else latest["version"]
+        )
+        print(f"[ACTIVE] Saved checkpoint {entry['version']} ({'full' if full_retrain else 'incremental'}).")
+        model_version = entry["version"]
+    else:
+        model_version = latest["version"]
 
-    print(f"[ACTIVE] Predicting on {len(unlabeled_df)} unlabeled samples...")
-    probs = model.predict_proba(unlabeled_df["text"].tolist())
-    unlabeled_df["uncertainty"] = entropy(probs)
+    labeled = set(load_manual_labels())
+    pool = (
+        (rid, record) for rid, record in open_record_store(RECORD_STORE_DIR).iter_records()
+        if record.get("text") and rid not in labeled and (record.get("source_file") or rid) not in labeled
+    )
 
-    top_uncertain = unlabeled_df.sort_values("uncertainty", ascending=False).head(NUM_QUERY_SAMPLES)
+    cache = ScoreCache(SCORE_CACHE_PATH, f"{model_version}:{config['uncertainty']}",
+                       max_age=config["score_max_age_hours"] * 3600)
+    cache.purge_other_versions()
+    embeddings = EmbeddingCache(EMBEDDING_CACHE_DIR, model_version, model.embedding_dim)
+    embeddings.purge_other_versions()
+
+    def score_and_embed(texts):
+        # The embeddings come from the same forward pass, so caching them is free.
+        probs, vectors = model.predict_with_embeddings(texts)
+        embeddings.add_many(texts, vectors)
+        return probs
+
+    diverse = config["selection"] == "diverse"
+    stats = {}
+    top_uncertain = select_uncertain(
+        pool, score_and_embed, NUM_QUERY_SAMPLES * (config["diversity_candidates"] if diverse else 1),
+        strategy=config["uncertainty"], batch_size=config["score_batch_size"], cache=cache, stats=stats
+    )
+    cache.close()
+    print(f"[ACTIVE] Scored {stats['scored']} unlabeled samples with {model_version} "
+          f"({stats['cached']} reused from cache).")
+
+    if diverse and top_uncertain:
+        top_uncertain = select_diverse(top_uncertain, NUM_QUERY_SAMPLES, embeddings, model.embed,
+                                       batch_size=config["score_batch_size"])
+        print(f"[ACTIVE] Picked {len(top_uncertain)} diverse samples by k-center greedy.")
+    embeddings.close()
+
+    if not top_uncertain:
+        print("[ACTIVE] No unlabeled samples available.")
+        return
 
-    with open(REVIEW_QUEUE_PATH, "a", encoding="utf-8") as f:
-        for _, row in top_uncertain.iterrows():
-            queue_item = {
-                "file": row["source_file"],
-                "uncertainty": row["uncertainty"],
-                "text": row["text"][:1000]
-            }
-            f.write(json.dumps(queue_item) + "\n")
+    # Keyed by record id: items queued in earlier rounds are re-scored, not duplicated,
+    # and anything labeled in the meantime is dropped.
+    queue = ReviewQueue(REVIEW_QUEUE_PATH, labels_path=LABEL_STORE_PATH)
+    queue.purge()
+    queued = queue.push_many(
+        {
+            "file": record.get("source_file") or rid,
+            "uncertainty": score,
+            "text": record["text"][:1000]
+        }
+        for score, (rid, record) in top_uncertain
+    )
 
-    print(f"[ACTIVE] Pushed {len(top_uncertain)} uncertain samples to review queue.")
+    print(f"[ACTIVE] Pushed {queued} uncertain samples to review queue ({len(queue)} pending).")
 
 if __name__ == "__main__":
     run_active_learning_round()
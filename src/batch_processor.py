@@ -3,17 +3,25 @@ import json
 import re
 import dateparser
 import tldextract
-import concurrent.futures
+import asyncio
 import uuid
-import spacy
 from newspaper import Article
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api.formatters import TextFormatter
 
-from infer import auto_infer_from_saved_metadata
+from infer import auto_infer_batch, auto_infer_from_saved_metadata
+from nlp_stage import NLPStage
+from utils.near_dup import open_near_dup_index
+from utils.record_store import open_record_store, record_id
+from utils.vector_index import open_vector_index
+from inference.runner_model import EMBEDDING_MODEL, load_embedder
 
-# Load spaCy
-nlp = spacy.load("en_core_web_sm")
+# Shared spaCy stage; transcripts only need sentences and entities.
+nlp_stage = NLPStage(lemmas=False)
+
+# Opt-in: embedding every saved record costs a BERT forward pass per record.
+VECTOR_INDEX_ENABLED = os.getenv("VECTOR_INDEX_ENABLED", "").lower() in ("1", "true", "yes")
+_embedder = None
 
 # Logging
 import logging
@@ -71,20 +79,25 @@ def get_transcript_from_youtube(video_url: str) -> str:
 
 def extract_video_transcript_metadata(video_url: str):
     transcript_text = get_transcript_from_youtube(video_url)
-    doc = nlp(transcript_text)
+    return build_transcript_metadata(video_url, transcript_text, nlp_stage.analyze(transcript_text))
+
+def build_transcript_metadata(video_url: str, transcript_text: str, analysis: dict):
     return {
         "type": "video_transcript",
         "video_url": video_url,
         "video_id": extract_youtube_id(video_url),
         "text": transcript_text,
         "word_count": len(transcript_text.split()),
-        "sentence_count": len(list(doc.sents)),
-        "named_entities": list(set(ent.text for ent in doc.ents))
+        "sentence_count": analysis["sentence_count"],
+        "named_entities": analysis["named_entities"]
     }
   # --------- Batch Processor ---------
 
 def batch_process_sources(article_urls=[], tweet_objects=[], video_urls=[],
-                          processed_dir="data/processed/", save_combined=True):
+                          processed_dir="data/processed/", save_combined=True,
+                          fetch_concurrency=64, per_domain_limit=4, cpu_workers=None):
+    from ingest_pipeline import IngestPipeline
+
     os.makedirs(processed_dir, exist_ok=True)
     subdirs = {
         "article": os.path.join(processed_dir, "articles"),
@@ -94,25 +107,14 @@ def batch_process_sources(article_urls=[], tweet_objects=[], video_urls=[],
     for sub in subdirs.values():
         os.makedirs(sub, exist_ok=True)
 
-    results = []
-
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = []
-
-        for url in article_urls:
-            futures.append(executor.submit(safe_call, extract_article_metadata, url))
-
-        for tweet in tweet_objects:
-            futures.append(executor.submit(safe_call, extract_tweet_metadata, tweet))
-
-        for video_url in video_urls:
-            futures.append(executor.submit(safe_call, extract_video_transcript_metadata, video_url))
-
-        for future in concurrent.futures.as_completed(futures):
-            result = future.result()
-            if result:
-                results.append(result)
-                save_metadata_record(result, subdirs[result["type"]])
+    pipeline = IngestPipeline(
+        subdirs,
+        fetch_concurrency=fetch_concurrency,
+        per_domain_limit=per_domain_limit,
+        cpu_workers=cpu_workers,
+        collect_results=save_combined
+    )
+    results = asyncio.run(pipeline.run(article_urls, tweet_objects, video_urls))
 
     if save_combined:
         save_metadata_to_json(results, os.path.join(processed_dir, "metadata_combined.json"))
@@ -127,14 +129,65 @@ def safe_call(func, *args):
         logger.error(f"[FAILURE] {func.__name__} - {args[0] if args else ''} - {e}")
         return None
 
+def record_store_for(output_dir: str):
+    """Per-type output dirs (processed/articles, processed/tweets, ...) share processed/store."""
+    return open_record_store(os.path.join(os.path.dirname(os.path.normpath(output_dir)), "store"))
+
+def near_dup_index_for(output_dir: str):
+    return open_near_dup_index(os.path.join(os.path.dirname(os.path.normpath(output_dir)), "near_dup.sqlite"))
+
+def cluster_records(items: list, output_dir: str) -> list:
+    """items: [(uid, metadata)]. Near-duplicate cluster of each record, as inference-log fields."""
+    try:
+        clusters = near_dup_index_for(output_dir).assign_many(
+            (uid, metadata.get("text", "")) for uid, metadata in items
+        )
+    except Exception as e:
+        logger.error(f"[NEAR-DUP] Clustering failed: {e}")
+        return [{} for _ in items]
+    return [{"cluster_id": c[0], "cluster_size": c[1]} if c else {} for c in clusters]
+
+def vector_index_for(output_dir: str):
+    return open_vector_index(os.path.join(os.path.dirname(os.path.normpath(output_dir)), "vector_index"),
+                             model=EMBEDDING_MODEL)
+
+def get_embedder():
+    global _embedder
+    if _embedder is None:
+        _embedder = load_embedder()
+    return _embedder
+
+def index_embeddings(items: list, output_dir: str):
+    """items: [(uid, metadata)]. Adds record embeddings to the similarity index when it is enabled."""
+    items = [(uid, metadata) for uid, metadata in items if metadata.get("text")]
+    if not VECTOR_INDEX_ENABLED or not items:
+        return
+    try:
+        embeddings = get_embedder().embed([metadata["text"] for _, metadata in items])
+        added = vector_index_for(output_dir).add_many(zip((uid for uid, _ in items), embeddings))
+        logger.info(f"[VECTOR] Indexed {added} records")
+    except Exception as e:
+        logger.error(f"[VECTOR] Indexing failed: {e}")
+
 def save_metadata_record(metadata: dict, output_dir: str):
-    uid = metadata.get("video_id") or metadata.get("tweet_id") or str(uuid.uuid4())
-    filename = f"{uid}.json"
-    path = os.path.join(output_dir, filename)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(metadata, f, indent=4, ensure_ascii=False)
-    logger.info(f"[SAVE] {metadata['type']} saved to {path}")
-    auto_infer_from_saved_metadata(metadata, path)
+    uid = record_id(metadata)
+    store = record_store_for(output_dir)
+    store.append(uid, metadata)
+    logger.info(f"[SAVE] {metadata['type']} {uid} saved to {store.root}")
+    cluster = cluster_records([(uid, metadata)], output_dir)[0]
+    index_embeddings([(uid, metadata)], output_dir)
+    auto_infer_from_saved_metadata(metadata, uid, cluster)
+
+def save_metadata_records(records: list, output_dir: str):
+    """Batched save_metadata_record: one store append and one inference-log write for the whole batch."""
+    if not records:
+        return
+    items = [(record_id(metadata), metadata) for metadata in records]
+    store = record_store_for(output_dir)
+    store.append_many(items)
+    logger.info(f"[SAVE] {len(items)} records saved to {store.root}")
+    index_embeddings(items, output_dir)
+    auto_infer_batch([(metadata, uid) for uid, metadata in items], cluster_records(items, output_dir))
 
 def save_metadata_to_json(metadata: list, filepath: str):
     with open(filepath, "w", encoding="utf-8") as f:
@@ -8,9 +8,15 @@ LABELS_DIR = PROJECT_ROOT / "labels"
 DATA_DIR = PROJECT_ROOT / "data"
 
 INFER_LOG_PATH = LOGS_DIR / "inference_log.jsonl"
+INFER_INDEX_PATH = LOGS_DIR / "inference_index.sqlite"
 LABEL_LOG_PATH = LABELS_DIR / "manual_labels.jsonl"
+LABEL_STORE_PATH = LABELS_DIR / "labels.sqlite"
 REVIEW_QUEUE_PATH = LABELS_DIR / "review_queue.jsonl"
+REVIEW_QUEUE_DB_PATH = LABELS_DIR / "review_queue.sqlite"
 SCHED_PATH = LOGS_DIR / "scheduler_config.json"
 PROCESSED_DIR = DATA_DIR / "processed"
+RECORD_STORE_DIR = PROCESSED_DIR / "store"
+VECTOR_INDEX_DIR = PROCESSED_DIR / "vector_index"
+RESULT_CACHE_PATH = DATA_DIR / "cache" / "inference_cache.sqlite"
 
 print("[DEBUG] paths.py loaded")
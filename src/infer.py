@@ -1,8 +1,91 @@
 import json
-import logging
+import atexit
+import os
+import time
+from datetime import datetime
 
-# Dummy inference logic (replace with real model later)
-def run_inference_on_metadata(metadata: dict) -> dict:
+from config.paths import RESULT_CACHE_PATH
+from utils.result_cache import ResultCache
+from utils.time_utils import publish_timestamp
+
+MODEL_VERSION = "entity-heuristic-v1"
+FAST_MODEL_PATH = "models/fast_model.joblib"
+# Fine-tuned transformer checkpoints written by active_learning_loop.py.
+SLOW_CHECKPOINT_DIR = "models/active_learning"
+# Fast-model P(disinfo) range that gets a second opinion from the transformer.
+CASCADE_BAND = (0.3, 0.7)
+
+_result_cache = None
+_cascade = None
+_cascade_stamp = None
+
+def latest_slow_checkpoint():
+    """(version, path) of the newest fine-tuned transformer checkpoint, or None if none was trained yet."""
+    if not os.path.exists(os.path.join(SLOW_CHECKPOINT_DIR, "manifest.json")):
+        return None
+    from utils.checkpoints import CheckpointRegistry
+
+    registry = CheckpointRegistry(SLOW_CHECKPOINT_DIR)
+    latest = registry.latest()
+    return (latest["version"], str(registry.path(latest))) if latest else None
+
+def _slow_factory(checkpoint_path):
+    def load():
+        from inference.inference_runner import DisinfoModel
+        # Articles and transcripts run past 512 tokens; score them in windows rather than truncating.
+        return DisinfoModel(checkpoint_path=checkpoint_path, long_documents=True)
+    return load
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def get_cascade():
+    """
+    The fast -> transformer cascade, or None until a fast model has been trained.
+    Rebuilt when the fast model or the checkpoint manifest changes on disk, so
+    long-running monitors pick up retrained models without a restart.
+    """
+    global _cascade, _cascade_stamp
+    stamp = (_mtime(FAST_MODEL_PATH), _mtime(os.path.join(SLOW_CHECKPOINT_DIR, "manifest.json")))
+    if stamp != _cascade_stamp:
+        _cascade, _cascade_stamp = False, stamp
+        if stamp[0] is not None:
+            from inference.cascade import CascadeClassifier
+            from models.fast_model import FastDisinfoModel
+
+            fast_model = FastDisinfoModel.load(FAST_MODEL_PATH)
+            slow = latest_slow_checkpoint()
+            # An untrained transformer head would only add noise, so nothing is escalated without a checkpoint.
+            _cascade = CascadeClassifier(fast_model, slow_factory=_slow_factory(slow[1]) if slow else None,
+                                         band=CASCADE_BAND)
+            _cascade.slow_version = slow[0] if slow else None
+            print(f"[INFER] Cascade enabled: fast model {fast_model.version}, "
+                  f"transformer {slow[0] if slow else 'none (no escalation)'}, band {CASCADE_BAND}")
+    return _cascade or None
+
+def current_model_version() -> str:
+    cascade = get_cascade()
+    if cascade is None:
+        return MODEL_VERSION
+    slow = f"-{cascade.slow_version}-longdoc" if cascade.slow_version else ""
+    return f"cascade-{cascade.fast_model.version}-{cascade.band[0]}-{cascade.band[1]}{slow}"
+
+def get_result_cache() -> ResultCache:
+    global _result_cache
+    version = current_model_version()
+    if _result_cache is None:
+        _result_cache = ResultCache(RESULT_CACHE_PATH, version)
+        atexit.register(_result_cache.close)
+    else:
+        # The cascade reloads retrained models, so results are keyed by whichever one is live now.
+        _result_cache.set_model_version(version)
+    return _result_cache
+
+# Fallback heuristic until a fast model is trained (see train_fast_model.py)
+def heuristic_inference(metadata: dict) -> dict:
     """
     Fake disinfo classifier — flags texts with over 5 named entities.
     """
@@ -15,16 +98,64 @@ def run_inference_on_metadata(metadata: dict) -> dict:
         "confidence": 0.85 if flag else 0.10
     }
 
-def auto_infer_from_saved_metadata(metadata: dict, filepath: str):
-    result = run_inference_on_metadata(metadata)
-    output = {
-        "file": filepath,
-        "type": metadata.get("type", "unknown"),
-        "result": result
-    }
+def run_inference_batch(records: list) -> list:
+    cascade = get_cascade()
+    if cascade is None:
+        return [heuristic_inference(metadata) for metadata in records]
+    return cascade.score_batch(records)
+
+def run_inference_on_metadata(metadata: dict) -> dict:
+    return run_inference_batch([metadata])[0]
+
+def cached_inference_on_metadata(metadata: dict):
+    """Score through the content-hash cache; returns (result, cache_hit)."""
+    return cached_inference_batch([metadata])[0]
+
+def cached_inference_batch(records: list) -> list:
+    """Cache lookups per record, then one model call for all the misses. Returns [(result, cache_hit)]."""
+    cache = get_result_cache()
+    out = [None] * len(records)
+    misses = []
+    for i, metadata in enumerate(records):
+        result = cache.get(metadata["text"]) if metadata.get("text") else None
+        if result is not None:
+            out[i] = (result, True)
+        else:
+            misses.append(i)
+
+    if misses:
+        start = time.perf_counter()
+        results = run_inference_batch([records[i] for i in misses])
+        per_record = (time.perf_counter() - start) / len(misses)
+        for i, result in zip(misses, results):
+            if records[i].get("text"):
+                cache.put(records[i]["text"], result, per_record)
+            out[i] = (result, False)
+    return out
+
+def auto_infer_from_saved_metadata(metadata: dict, filepath: str, extra: dict = None):
+    auto_infer_batch([(metadata, filepath)], [extra] if extra else None)
+
+def auto_infer_batch(items, extras=None):
+    """
+    items: [(metadata, filepath)]. Scores each record and appends all log lines
+    in one write; `extras` (one dict per item) are merged into the log records.
+    """
+    lines = []
+    scored = cached_inference_batch([metadata for metadata, _ in items])
+    for i, ((metadata, filepath), (result, cache_hit)) in enumerate(zip(items, scored)):
+        output = {
+            "file": filepath,
+            "type": metadata.get("type", "unknown"),
+            "ingested_at": datetime.now().isoformat(),
+            "published_at": publish_timestamp(metadata),
+            "result": result
+        }
+        if extras:
+            output.update(extras[i])
+        lines.append(json.dumps(output) + "\n")
+        print(f"[INFER] {filepath} flagged={result['flagged']} confidence={result['confidence']} stage={result.get('stage', 'heuristic')} cached={cache_hit}")
 
     log_path = "logs/inference_log.jsonl"
     with open(log_path, "a", encoding="utf-8") as log:
-        log.write(json.dumps(output) + "\n")
-
-    print(f"[INFER] {filepath} flagged={result['flagged']} confidence={result['confidence']}")
+        log.write("".join(lines))
@@ -0,0 +1,90 @@
+# src/inference/cascade.py
+
+from typing import Callable, List, Optional, Tuple
+
+# Default position of P(disinfo) in the transformer's probabilities, for slow
+# models that don't report their own `disinfo_index`.
+SLOW_DISINFO_INDEX = 1
+
+
+class CascadeClassifier:
+    """
+    Two-stage scoring: a sparse linear model scores every record, and only
+    records whose fast P(disinfo) falls inside `band` are re-scored by the
+    transformer. The transformer is loaded through `slow_factory` on first
+    use, so a run where nothing is escalated never loads it.
+
+    Each result keeps both stages' scores under "stages" for the inference log.
+    If the transformer fails to load or score, the affected records keep
+    their fast score, and a failed load is not retried.
+    """
+
+    def __init__(self, fast_model, slow_factory: Optional[Callable] = None,
+                 band: Tuple[float, float] = (0.3, 0.7), threshold: float = 0.5):
+        low, high = band
+        if not 0.0 <= low <= high <= 1.0:
+            raise ValueError(f"Invalid uncertainty band {band}")
+        self.fast_model = fast_model
+        self.slow_factory = slow_factory
+        self.band = band
+        self.threshold = threshold
+        self._slow = None
+        self.stats = {"records": 0, "escalated": 0}
+
+    @property
+    def slow_model(self):
+        if self._slow is None and self.slow_factory is not None:
+            try:
+                self._slow = self.slow_factory()
+            except Exception as e:
+                print(f"[CASCADE] Could not load the transformer, scoring with the fast model only: {e}")
+                self.slow_factory = None
+        return self._slow
+
+    def escalation_rate(self) -> float:
+        return self.stats["escalated"] / self.stats["records"] if self.stats["records"] else 0.0
+
+    def _slow_proba(self, texts: List[str]) -> Optional[List[float]]:
+        model = self.slow_model
+        if model is None:
+            return None
+        index = getattr(model, "disinfo_index", SLOW_DISINFO_INDEX)
+        try:
+            return [prob[index] for _, _, prob in model.predict_with_proba(texts)]
+        except Exception as e:
+            print(f"[CASCADE] Transformer failed on {len(texts)} records, keeping fast scores: {e}")
+            return None
+
+    def score_batch(self, records: List[dict]) -> List[dict]:
+        if not records:
+            return []
+        fast = self.fast_model.disinfo_proba(records)
+        low, high = self.band
+        escalate = [
+            i for i, p in enumerate(fast)
+            if low <= p <= high and records[i].get("text") and self.slow_factory is not None
+        ]
+        slow_scores = self._slow_proba([records[i]["text"] for i in escalate]) if escalate else None
+        slow = dict(zip(escalate, slow_scores)) if slow_scores is not None else {}
+
+        self.stats["records"] += len(records)
+        self.stats["escalated"] += len(slow)
+
+        results = []
+        for i, p_fast in enumerate(fast):
+            stages = {"fast": {"confidence": round(float(p_fast), 4), "model": self.fast_model.version}}
+            if i in slow:
+                confidence, stage = float(slow[i]), "slow"
+                stages["slow"] = {"confidence": round(confidence, 4)}
+                reason = "Transformer score (fast model uncertain)"
+            else:
+                confidence, stage = float(p_fast), "fast"
+                reason = "Fast model score"
+            results.append({
+                "flagged": confidence >= self.threshold,
+                "reason": reason,
+                "confidence": round(confidence, 4),
+                "stage": stage,
+                "stages": stages
+            })
+        return results
@@ -1,52 +1,194 @@
 # src/inference/inference_runner.py
 
+import argparse
 import json
+import os
+from itertools import islice
 from pathlib import Path
-from typing import List, Union
-from models.bert_model import BertDisinfoModel
+from typing import Iterable, Iterator, List, Tuple, Union
+from inference.micro_batcher import MicroBatcher
+from inference.runner_model import load_runner_module
+
+BertDisinfoModel = load_runner_module().BertDisinfoModel
 
 class DisinfoModel:
-    def __init__(self, model_type="bert"):
+    def __init__(self, model_type="bert", max_batch_size=32, max_tokens=8192, window_size=1024, backend="torch",
+                 checkpoint_path=None, long_documents=False, aggregate="max", max_windows=16, stop_threshold=0.9):
         self.model_type = model_type.lower()
         if self.model_type == "bert":
-            self.model = BertDisinfoModel()
+            self.model = BertDisinfoModel(checkpoint_path=checkpoint_path, backend=backend)
         else:
             raise NotImplementedError(f"Model type '{self.model_type}' not implemented in inference runner.")
 
+        self.engine = MicroBatcher(
+            self.model,
+            max_batch_size=max_batch_size,
+            max_tokens=max_tokens,
+            window_size=window_size,
+            long_documents=long_documents,
+            aggregate=aggregate,
+            max_windows=max_windows,
+            stop_threshold=stop_threshold
+        )
+
+    @property
+    def disinfo_index(self) -> int:
+        return self.model.disinfo_index
+
     def predict(self, texts: List[str]) -> List[str]:
-        return self.model.predict(texts)
+        return [label for _, label, _ in self.engine.run(texts)]
 
     def predict_proba(self, texts: List[str]) -> List[List[float]]:
-        return self.model.predict_proba(texts)
+        return [prob for _, _, prob in self.engine.run(texts)]
 
-def load_texts_from_jsonl(file_path: Union[str, Path]) -> List[str]:
+    def predict_with_proba(self, texts: Iterable[str]) -> Iterator[Tuple[str, str, List[float]]]:
+        """Labels and probabilities from a single forward pass, streamed in input order."""
+        return self.engine.run(texts)
+
+def iter_texts_from_jsonl(file_path: Union[str, Path]) -> Iterator[str]:
     with open(file_path, "r", encoding="utf-8") as f:
-        return [json.loads(line)["text"] for line in f if line.strip()]
+        for line in f:
+            if line.strip():
+                yield json.loads(line)["text"]
+
+def load_texts_from_jsonl(file_path: Union[str, Path]) -> List[str]:
+    return list(iter_texts_from_jsonl(file_path))
 
-def run_inference(input_data: Union[str, List[str]], model_type="bert") -> List[dict]:
-    model = DisinfoModel(model_type=model_type)
+def iter_inference(input_data: Union[str, Iterable[str]], model_type="bert", **engine_args) -> Iterator[dict]:
+    model = DisinfoModel(model_type=model_type, **engine_args)
 
     if isinstance(input_data, str) and input_data.endswith(".jsonl"):
-        texts = load_texts_from_jsonl(input_data)
-    elif isinstance(input_data, list):
-        texts = input_data
-    else:
+        texts = iter_texts_from_jsonl(input_data)
+    elif isinstance(input_data, str):
         raise ValueError("Input must be a JSONL file path or a list of text strings.")
+    else:
+        texts = input_data
 
-    predictions = model.predict(texts)
-    probabilities = model.predict_proba(texts)
-
-    results = []
-    for text, label, prob in zip(texts, predictions, probabilities):
-        results.append({
+    for text, label, prob in model.predict_with_proba(texts):
+        yield {
             "text": text,
             "predicted_label": label,
             "confidence": max(prob),
             "probabilities": prob
-        })
-    return results
+        }
+
+    print(f"[INFER] Engine stats: {json.dumps(model.engine.stats.as_dict())}")
+
+def run_inference(input_data: Union[str, List[str]], model_type="bert", **engine_args) -> List[dict]:
+    if not (isinstance(input_data, list) or (isinstance(input_data, str) and input_data.endswith(".jsonl"))):
+        raise ValueError("Input must be a JSONL file path or a list of text strings.")
+    return list(iter_inference(input_data, model_type=model_type, **engine_args))
+
+def iter_jsonl_with_offsets(file_path: Union[str, Path], start_offset: int = 0) -> Iterator[Tuple[dict, int]]:
+    """Lazily yield (record, end_offset) pairs, starting at a byte offset."""
+    with open(file_path, "rb") as f:
+        f.seek(start_offset)
+        offset = start_offset
+        for line in f:
+            offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                if not line.endswith(b"\n"):
+                    # A partially written trailing line; leave it for the next run.
+                    return
+                raise
+            yield record, offset
+
+def load_checkpoint(checkpoint_path: Union[str, Path]) -> dict:
+    if not os.path.exists(checkpoint_path):
+        return {"input_offset": 0, "output_offset": 0, "records": 0}
+    with open(checkpoint_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_checkpoint(checkpoint_path: Union[str, Path], checkpoint: dict):
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, checkpoint_path)
+
+def stream_inference(input_path: Union[str, Path], output_path: Union[str, Path], checkpoint_path=None,
+                     chunk_size=1024, resume=True, model_type="bert", **engine_args) -> dict:
+    """
+    Score a JSONL file chunk by chunk, appending results to `output_path`.
+
+    Every output record is the input record plus the prediction fields. After
+    each chunk the output is fsynced and the input/output byte offsets are
+    checkpointed, so a killed job picks up at the last completed chunk.
+    """
+    checkpoint_path = checkpoint_path or f"{output_path}.ckpt"
+    checkpoint = {"input_offset": 0, "output_offset": 0, "records": 0}
+    if resume:
+        checkpoint = load_checkpoint(checkpoint_path)
+        output_size = os.path.getsize(output_path) if os.path.exists(output_path) else 0
+        if output_size < checkpoint["output_offset"]:
+            raise RuntimeError(f"Output {output_path} is shorter than its checkpoint; rerun with resume=False.")
+    model = DisinfoModel(model_type=model_type, **engine_args)
+
+    if checkpoint["records"]:
+        print(f"[STREAM] Resuming {input_path} at byte {checkpoint['input_offset']} "
+              f"({checkpoint['records']} records done)")
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "ab") as out:
+        # Drop anything written after the last checkpoint (a chunk cut short by a kill).
+        out.truncate(checkpoint["output_offset"])
+
+        records = iter_jsonl_with_offsets(input_path, checkpoint["input_offset"])
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+
+            texts = [record.get("text", "") for record, _ in chunk]
+            lines = []
+            for (record, _), (_, label, prob) in zip(chunk, model.predict_with_proba(texts)):
+                record.update({
+                    "predicted_label": label,
+                    "confidence": max(prob),
+                    "probabilities": prob
+                })
+                lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+
+            out.write("".join(lines).encode("utf-8"))
+            out.flush()
+            os.fsync(out.fileno())
+
+            checkpoint = {
+                "input_offset": chunk[-1][1],
+                "output_offset": out.tell(),
+                "records": checkpoint["records"] + len(chunk)
+            }
+            save_checkpoint(checkpoint_path, checkpoint)
+            print(f"[STREAM] {checkpoint['records']} records scored "
+                  f"({model.engine.stats.throughput():.1f} texts/sec)")
+
+    print(f"[STREAM] Done. Engine stats: {json.dumps(model.engine.stats.as_dict())}")
+    return checkpoint
 
 if __name__ == "__main__":
-    sample_input = "data/processed/test_inputs/sample1.json"
-    results = run_inference(sample_input, model_type="bert")
-    print(json.dumps(results, indent=2))
+    parser = argparse.ArgumentParser(description="Run disinfo inference on a JSONL file.")
+    parser.add_argument("input", nargs="?", default="data/processed/test_inference.jsonl")
+    parser.add_argument("--output", help="Stream results to this JSONL file instead of printing them")
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--no-resume", action="store_true", help="Ignore an existing checkpoint")
+    parser.add_argument("--backend", choices=["torch", "int8", "onnx"], default="torch")
+    parser.add_argument("--checkpoint", help="Fine-tuned checkpoint directory (default: base model)")
+    parser.add_argument("--long-documents", action="store_true",
+                        help="Score whole documents in overlapping windows instead of truncating them")
+    parser.add_argument("--aggregate", choices=["max", "mean", "attention"], default="max")
+    parser.add_argument("--max-windows", type=int, default=16)
+    args = parser.parse_args()
+
+    engine_args = {"backend": args.backend, "checkpoint_path": args.checkpoint, "long_documents": args.long_documents,
+                   "aggregate": args.aggregate, "max_windows": args.max_windows}
+    if args.output:
+        stream_inference(args.input, args.output, chunk_size=args.chunk_size,
+                         resume=not args.no_resume, **engine_args)
+    else:
+        results = run_inference(args.input, model_type="bert", **engine_args)
+        print(json.dumps(results, indent=2))
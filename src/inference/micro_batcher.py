@@ -0,0 +1,174 @@
+# src/inference/micro_batcher.py
+
+import math
+import time
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple
+
+DISINFO_INDEX = 1
+AGGREGATIONS = ("max", "mean", "attention")
+
+
+def aggregate_windows(window_probs: List[List[float]], method="max", temperature=0.1,
+                      disinfo_index=DISINFO_INDEX) -> List[float]:
+    """
+    Combine per-window class probabilities into one document score.
+
+    max: the window most likely to be disinformation speaks for the document.
+    mean: every window counts equally.
+    attention: windows weighted by softmax(P(disinfo) / temperature), so a
+    few strongly flagged passages dominate without ignoring the rest.
+    """
+    if method == "max":
+        return list(max(window_probs, key=lambda p: p[disinfo_index]))
+    if method == "mean":
+        weights = [1.0] * len(window_probs)
+    elif method == "attention":
+        top = max(p[disinfo_index] for p in window_probs)
+        weights = [math.exp((p[disinfo_index] - top) / temperature) for p in window_probs]
+    else:
+        raise ValueError(f"Unknown aggregation '{method}'. Choose one of {AGGREGATIONS}.")
+    total = sum(weights)
+    return [sum(w * p[c] for w, p in zip(weights, window_probs)) / total for c in range(len(window_probs[0]))]
+
+
+class InferenceStats:
+    def __init__(self):
+        self.texts = 0
+        self.windows = 0
+        self.stopped_early = 0
+        self.tokens = 0
+        self.padded_tokens = 0
+        self.batches = 0
+        self.seconds = 0.0
+
+    def throughput(self) -> float:
+        return self.texts / self.seconds if self.seconds else 0.0
+
+    def padding_ratio(self) -> float:
+        return 1 - self.tokens / self.padded_tokens if self.padded_tokens else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "texts": self.texts,
+            "windows": self.windows,
+            "stopped_early": self.stopped_early,
+            "batches": self.batches,
+            "tokens": self.tokens,
+            "padded_tokens": self.padded_tokens,
+            "seconds": round(self.seconds, 3),
+            "texts_per_sec": round(self.throughput(), 2),
+            "padding_ratio": round(self.padding_ratio(), 4),
+        }
+
+
+class MicroBatcher:
+    """
+    Length-bucketed batching over a stream of texts.
+
+    Texts are read in windows of `window_size`, encoded once, sorted by token
+    length and cut into batches bounded by `max_batch_size` rows and
+    `max_tokens` padded tokens. Each batch gets exactly one forward pass via
+    `model.score_encoded`, and results are yielded back in input order, so
+    memory stays bounded by the window rather than the corpus.
+
+    With `long_documents`, texts are not truncated. Each one is split into
+    overlapping token windows (`model.encode_windows`, at most
+    `max_windows`). Windows are scored in rounds: every round takes the next
+    window of every unfinished document and batches them together. A
+    document stops once one window's P(disinfo) reaches `stop_threshold`,
+    and that window is then the document's score whatever the aggregation,
+    so the result doesn't depend on where in the text the passage sits.
+    Otherwise window scores are combined with `aggregate` (max, mean or
+    attention).
+    """
+
+    def __init__(self, model, max_batch_size=32, max_tokens=8192, window_size=1024,
+                 long_documents=False, aggregate="max", stride=128, max_windows=16, stop_threshold=0.9):
+        if aggregate not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation '{aggregate}'. Choose one of {AGGREGATIONS}.")
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_tokens = max_tokens
+        self.window_size = max(window_size, max_batch_size)
+        self.long_documents = long_documents
+        self.aggregate = aggregate
+        self.stride = stride
+        self.max_windows = max_windows
+        self.stop_threshold = stop_threshold
+        self.stats = InferenceStats()
+
+    def _buckets(self, encoded: List[List[int]]) -> Iterator[List[int]]:
+        order = sorted(range(len(encoded)), key=lambda i: len(encoded[i]))
+        bucket, longest = [], 0
+        for i in order:
+            length = len(encoded[i])
+            padded = max(longest, length) * (len(bucket) + 1)
+            if bucket and (len(bucket) >= self.max_batch_size or padded > self.max_tokens):
+                yield bucket
+                bucket, longest = [], 0
+            bucket.append(i)
+            longest = max(longest, length)
+        if bucket:
+            yield bucket
+
+    def _score_encoded(self, encoded: List[List[int]]) -> List[Tuple[str, List[float]]]:
+        results = [None] * len(encoded)
+        for bucket in self._buckets(encoded):
+            batch = [encoded[i] for i in bucket]
+            labels, probs = self.model.score_encoded(batch)
+            self.stats.batches += 1
+            self.stats.tokens += sum(len(ids) for ids in batch)
+            self.stats.padded_tokens += max(len(ids) for ids in batch) * len(batch)
+            for i, label, prob in zip(bucket, labels, probs):
+                results[i] = (label, prob)
+        return results
+
+    def _score_long(self, texts: List[str]) -> List[Tuple[str, List[float]]]:
+        windows = self.model.encode_windows(texts, stride=self.stride, max_windows=self.max_windows)
+        disinfo_index = getattr(self.model, "disinfo_index", DISINFO_INDEX)
+        window_probs = [[] for _ in texts]
+        decided = {}
+        active = [d for d in range(len(texts)) if windows[d]]
+        step = 0
+        while active:
+            scored = self._score_encoded([windows[d][step] for d in active])
+            for d, (_, prob) in zip(active, scored):
+                window_probs[d].append(prob)
+            self.stats.windows += len(active)
+            step += 1
+
+            still_active = []
+            for d in active:
+                if window_probs[d][-1][disinfo_index] >= self.stop_threshold:
+                    decided[d] = window_probs[d][-1]
+                    self.stats.stopped_early += step < len(windows[d])
+                elif step < len(windows[d]):
+                    still_active.append(d)
+            active = still_active
+
+        results = []
+        for d, probs in enumerate(window_probs):
+            probs = decided.get(d) or aggregate_windows(probs, self.aggregate, disinfo_index=disinfo_index)
+            results.append((self.model.labels[max(range(len(probs)), key=probs.__getitem__)], probs))
+        return results
+
+    def _score_window(self, texts: List[str]) -> List[Tuple[str, List[float]]]:
+        start = time.perf_counter()
+        if self.long_documents:
+            results = self._score_long(texts)
+        else:
+            results = self._score_encoded(self.model.encode(texts))
+        self.stats.texts += len(texts)
+        self.stats.seconds += time.perf_counter() - start
+        return results
+
+    def run(self, texts: Iterable[str]) -> Iterator[Tuple[str, str, List[float]]]:
+        """Yield (text, label, probabilities) for every input text, in order."""
+        stream = iter(texts)
+        while True:
+            window = list(islice(stream, self.window_size))
+            if not window:
+                return
+            for text, (label, prob) in zip(window, self._score_window(window)):
+                yield text, label, prob
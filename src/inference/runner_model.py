@@ -0,0 +1,28 @@
+# src/inference/runner_model.py
+#
+# The inference runner's transformer lives in models/bert_model.py at the repo
+# root. Scripts under src/ put src/ first on sys.path, where src/models/ (the
+# active-learning model) shadows the name "models.bert_model", so the runner
+# model is loaded from its file path under a name of its own.
+
+import importlib.util
+import sys
+from pathlib import Path
+
+RUNNER_MODEL_FILE = Path(__file__).resolve().parents[2] / "models" / "bert_model.py"
+RUNNER_MODULE_NAME = "disinfo_runner_bert_model"
+# Base model whose mean-pooled states fill the similarity index; recorded in its meta.json.
+EMBEDDING_MODEL = "bert-base-uncased"
+
+def load_runner_module():
+    module = sys.modules.get(RUNNER_MODULE_NAME)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(RUNNER_MODULE_NAME, RUNNER_MODEL_FILE)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[RUNNER_MODULE_NAME] = module
+        spec.loader.exec_module(module)
+    return module
+
+def load_embedder():
+    """The model behind every similarity-index embedding, at ingest and in the backfill script alike."""
+    return load_runner_module().BertDisinfoModel(model_name=EMBEDDING_MODEL)
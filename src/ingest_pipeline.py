@@ -0,0 +1,219 @@
+# src/ingest_pipeline.py
+#
+# Staged asyncio ingestion used by batch_process_sources:
+#
+#   fetch (pooled keep-alive HTTP, per-domain limits)
+#     -> parse (newspaper HTML parsing in a process pool)
+#     -> nlp (batched nlp.pipe over transcripts in a process pool)
+#     -> persist (save_metadata_record, one writer thread)
+#
+# Stages are joined by bounded queues, so a slow stage backs up the ones
+# in front of it instead of piling up futures or memory.
+
+import asyncio
+import contextlib
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import aiohttp
+import tldextract
+from newspaper import Article
+
+from batch_processor import (
+    build_transcript_metadata,
+    extract_tweet_metadata,
+    get_transcript_from_youtube,
+    logger,
+    nlp_stage,
+    save_metadata_record,
+)
+
+_DONE = object()
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; disinfo-ai/1.0)"}
+
+# --------- Process-pool workers ---------
+
+def parse_article_html(url: str, html: str) -> dict:
+    article = Article(url)
+    article.download(input_html=html)
+    article.parse()
+    return {
+        "type": "article",
+        "title": article.title,
+        "authors": article.authors,
+        "publish_date": str(article.publish_date),
+        "text": article.text,
+        "source_domain": tldextract.extract(url).domain,
+        "url": url,
+        "word_count": len(article.text.split())
+    }
+
+def analyze_transcripts(items: list) -> list:
+    """items: [(video_url, transcript_text)]. One nlp.pipe pass over the whole micro-batch."""
+    analyses = nlp_stage.pipe(text for _, text in items)
+    return [
+        build_transcript_metadata(url, text, analysis)
+        for (url, text), analysis in zip(items, analyses)
+    ]
+
+# --------- Pipeline ---------
+
+class IngestPipeline:
+    def __init__(self, subdirs: dict, fetch_concurrency=64, per_domain_limit=4,
+                 cpu_workers=None, queue_size=256, timeout=30, collect_results=True,
+                 nlp_batch_size=16):
+        self.subdirs = subdirs
+        self.fetch_concurrency = fetch_concurrency
+        self.per_domain_limit = per_domain_limit
+        self.cpu_workers = cpu_workers or os.cpu_count() or 2
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.collect_results = collect_results
+        self.nlp_batch_size = nlp_batch_size
+        self.results = []
+        # domain -> [semaphore, fetches holding or waiting for it]
+        self._domain_limits = {}
+
+    @contextlib.asynccontextmanager
+    async def _domain_limit(self, url: str):
+        """
+        Hold one of the domain's per_domain_limit slots. A domain's semaphore
+        only lives while fetches for it are in flight, so the table stays
+        bounded by fetch_concurrency however many domains a run touches.
+        """
+        domain = tldextract.extract(url).registered_domain or url
+        entry = self._domain_limits.get(domain)
+        if entry is None:
+            entry = self._domain_limits[domain] = [asyncio.Semaphore(self.per_domain_limit), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._domain_limits[domain]
+
+    async def _stage(self, name, inbox, handler, workers, outbox=None, downstream_workers=0):
+        async def worker():
+            while True:
+                job = await inbox.get()
+                if job is _DONE:
+                    return
+                try:
+                    job = await handler(job)
+                except Exception as e:
+                    logger.error(f"[FAILURE] {name} - {job.get('source', '')} - {e}")
+                    continue
+                if job is not None and outbox is not None:
+                    await outbox.put(job)
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        for _ in range(downstream_workers):
+            await outbox.put(_DONE)
+
+    # --------- Stage handlers ---------
+
+    async def _fetch(self, job):
+        kind, source = job["kind"], job["source"]
+        async with self._domain_limit(source):
+            if kind == "article":
+                async with self.session.get(source) as resp:
+                    resp.raise_for_status()
+                    job["html"] = await resp.text(errors="replace")
+            elif kind == "video":
+                job["transcript"] = await self.loop.run_in_executor(
+                    self.io_pool, get_transcript_from_youtube, source
+                )
+        return job
+
+    async def _parse(self, job):
+        if job["kind"] == "article":
+            job["metadata"] = await self.loop.run_in_executor(
+                self.cpu_pool, parse_article_html, job["source"], job.pop("html")
+            )
+        return job
+
+    async def _nlp_stage(self, inbox, workers, outbox):
+        """Like _stage, but drains up to nlp_batch_size transcripts per nlp.pipe call."""
+        async def worker():
+            done = False
+            while not done:
+                batch = []
+                job = await inbox.get()
+                while True:
+                    if job is _DONE:
+                        done = True
+                        break
+                    batch.append(job)
+                    if len(batch) >= self.nlp_batch_size or inbox.empty():
+                        break
+                    job = inbox.get_nowait()
+
+                videos = [job for job in batch if job["kind"] == "video"]
+                if videos:
+                    items = [(job["source"], job.pop("transcript")) for job in videos]
+                    try:
+                        metadata = await self.loop.run_in_executor(self.cpu_pool, analyze_transcripts, items)
+                    except Exception as e:
+                        logger.error(f"[FAILURE] nlp - {[url for url, _ in items]} - {e}")
+                        batch = [job for job in batch if job["kind"] != "video"]
+                    else:
+                        for job, meta in zip(videos, metadata):
+                            job["metadata"] = meta
+                for job in batch:
+                    await outbox.put(job)
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        await outbox.put(_DONE)
+
+    async def _persist(self, job):
+        metadata = job["metadata"]
+        await self.loop.run_in_executor(
+            self.writer, save_metadata_record, metadata, self.subdirs[metadata["type"]]
+        )
+        logger.info(f"[SUCCESS] {job['kind']} - {job['source']}")
+        if self.collect_results:
+            self.results.append(metadata)
+
+    async def _produce(self, fetch_q, article_urls, tweet_objects, video_urls):
+        for url in article_urls:
+            await fetch_q.put({"kind": "article", "source": url})
+        for url in video_urls:
+            await fetch_q.put({"kind": "video", "source": url})
+        for tweet in tweet_objects:
+            try:
+                metadata = extract_tweet_metadata(tweet)
+            except Exception as e:
+                logger.error(f"[FAILURE] extract_tweet_metadata - {tweet} - {e}")
+                continue
+            await fetch_q.put({"kind": "tweet", "source": metadata["tweet_id"], "metadata": metadata})
+        for _ in range(self.fetch_concurrency):
+            await fetch_q.put(_DONE)
+
+    async def run(self, article_urls=(), tweet_objects=(), video_urls=()) -> list:
+        self.loop = asyncio.get_running_loop()
+        fetch_q, parse_q, nlp_q, persist_q = (asyncio.Queue(self.queue_size) for _ in range(4))
+
+        connector = aiohttp.TCPConnector(
+            limit=self.fetch_concurrency,
+            limit_per_host=self.per_domain_limit,
+            keepalive_timeout=30
+        )
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        # Enough in-flight CPU jobs to keep every process busy without queueing the backlog.
+        cpu_stage_workers = self.cpu_workers * 2
+
+        with ProcessPoolExecutor(self.cpu_workers) as self.cpu_pool, \
+                ThreadPoolExecutor(self.fetch_concurrency) as self.io_pool, \
+                ThreadPoolExecutor(1) as self.writer:
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=HEADERS) as self.session:
+                await asyncio.gather(
+                    self._produce(fetch_q, article_urls, tweet_objects, video_urls),
+                    self._stage("fetch", fetch_q, self._fetch, self.fetch_concurrency, parse_q, cpu_stage_workers),
+                    self._stage("parse", parse_q, self._parse, cpu_stage_workers, nlp_q, self.cpu_workers),
+                    self._nlp_stage(nlp_q, self.cpu_workers, persist_q),
+                    self._stage("persist", persist_q, self._persist, 1),
+                )
+        return self.results
@@ -1,49 +1,129 @@
+import os
+import json
 import torch
 import numpy as np
 from sklearn.preprocessing import LabelEncoder
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, Trainer, TrainingArguments
+from transformers import (
+    AutoConfig,
+    AutoTokenizer,
+    AutoModelForSequenceClassification,
+    DataCollatorWithPadding,
+    Trainer,
+    TrainingArguments,
+)
+from transformers.trainer_pt_utils import LengthGroupedSampler
 from torch.utils.data import Dataset
 from .base_model import BaseDisinfoModel
 
+
+class TokenizedDataset(Dataset):
+    """
+    Unpadded token ids for a training set, stored as one flat int32 array
+    plus offsets instead of per-example Python lists. Padding happens per
+    batch in the collator. Module-level, so DataLoader workers can pickle it.
+    """
+
+    def __init__(self, token_ids, offsets, labels):
+        self.token_ids = token_ids
+        self.offsets = offsets
+        self.labels = labels
+
+    @classmethod
+    def from_texts(cls, tokenizer, texts, labels, max_length=512, chunk_size=1000):
+        chunks, lengths = [], []
+        for i in range(0, len(texts), chunk_size):
+            encoded = tokenizer(
+                list(texts[i:i + chunk_size]),
+                truncation=True,
+                max_length=max_length,
+                return_attention_mask=False,
+                return_token_type_ids=False
+            )["input_ids"]
+            for ids in encoded:
+                chunks.append(np.asarray(ids, dtype=np.int32))
+                lengths.append(len(ids))
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        token_ids = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int32)
+        return cls(token_ids, offsets, np.asarray(labels, dtype=np.int64))
+
+    @property
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, idx):
+        ids = self.token_ids[self.offsets[idx]:self.offsets[idx + 1]]
+        return {"input_ids": ids.tolist(), "labels": int(self.labels[idx])}
+
+
+class LengthGroupedTrainer(Trainer):
+    """
+    Trainer whose group_by_length sampler takes the lengths TokenizedDataset
+    already has, instead of indexing every example to measure it.
+    """
+
+    def _get_train_sampler(self, train_dataset=None):
+        dataset = train_dataset if train_dataset is not None else self.train_dataset
+        if self.args.group_by_length and isinstance(dataset, TokenizedDataset):
+            return LengthGroupedSampler(
+                self.args.train_batch_size * self.args.gradient_accumulation_steps,
+                lengths=dataset.lengths.tolist()
+            )
+        return super()._get_train_sampler(*([train_dataset] if train_dataset is not None else []))
+
+
 class BertDisinfoModel(BaseDisinfoModel):
-    def __init__(self, model_name="distilbert-base-uncased", num_labels=3):
+    def __init__(self, model_name="distilbert-base-uncased", num_labels=3, max_length=512,
+                 dataloader_workers=None):
+        self.model_name = model_name
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
         self.model = AutoModelForSequenceClassification.from_pretrained(model_name, num_labels=num_labels)
         self.label_encoder = LabelEncoder()
+        self.max_length = max_length
+        if dataloader_workers is None:
+            dataloader_workers = min(4, max((os.cpu_count() or 1) - 1, 0))
+        self.dataloader_workers = dataloader_workers
         self.trainer = None
 
     def _tokenize(self, texts):
-        return self.tokenizer(texts, truncation=True, padding=True, return_tensors="pt")
-
-    def fit(self, texts, labels):
-        encoded_labels = self.label_encoder.fit_transform(labels)
+        return self.tokenizer(texts, truncation=True, padding=True, max_length=self.max_length, return_tensors="pt")
 
-        class DisinfoDataset(Dataset):
-            def __init__(self, texts, labels):
-                self.encodings = self.tokenizer(texts, truncation=True, padding=True)
-                self.labels = labels
-
-            def __getitem__(self, idx):
-                item = {key: torch.tensor(val[idx]) for key, val in self.encodings.items()}
-                item["labels"] = torch.tensor(self.labels[idx])
-                return item
-
-            def __len__(self):
-                return len(self.labels)
-
-        dataset = DisinfoDataset(texts, encoded_labels)
+    def fit(self, texts, labels, epochs=3):
+        # A warm-started model keeps its label encoding, so its classifier head stays valid.
+        if hasattr(self.label_encoder, "classes_") and set(labels) <= set(self.label_encoder.classes_):
+            encoded_labels = self.label_encoder.transform(labels)
+        else:
+            encoded_labels = self.label_encoder.fit_transform(labels)
+            if self.model.config.num_labels != len(self.label_encoder.classes_):
+                # Size the head to the classes actually labeled, so saved checkpoints match label_classes.json.
+                self.model = AutoModelForSequenceClassification.from_pretrained(
+                    self.model_name, num_labels=len(self.label_encoder.classes_)
+                )
+        dataset = TokenizedDataset.from_texts(self.tokenizer, list(texts), encoded_labels, self.max_length)
 
         args = TrainingArguments(
             output_dir="./models/bert-checkpoints",
             per_device_train_batch_size=8,
-            num_train_epochs=3,
+            num_train_epochs=epochs,
             logging_dir="./logs/bert",
             logging_steps=10,
             disable_tqdm=True,
-            save_strategy="no"
+            save_strategy="no",
+            # Batches of similar length, padded only to their own longest example.
+            group_by_length=True,
+            dataloader_num_workers=self.dataloader_workers,
+            dataloader_pin_memory=torch.cuda.is_available()
         )
 
-        self.trainer = Trainer(model=self.model, args=args, train_dataset=dataset)
+        self.trainer = LengthGroupedTrainer(
+            model=self.model,
+            args=args,
+            train_dataset=dataset,
+            data_collator=DataCollatorWithPadding(self.tokenizer)
+        )
         self.trainer.train()
 
     def predict(self, texts):
@@ -63,3 +143,42 @@ class BertDisinfoModel(BaseDisinfoModel):
         logits = outputs.logits
         probs = torch.softmax(logits, dim=1).numpy()
         return probs
+
+    def predict_with_embeddings(self, texts, pooling="mean"):
+        """Class probabilities plus a pooled last-layer embedding per text, from one forward pass."""
+        self.model.eval()
+        inputs = self._tokenize(texts)
+        with torch.no_grad():
+            outputs = self.model(**inputs, output_hidden_states=True)
+        probs = torch.softmax(outputs.logits, dim=1).numpy()
+        hidden = outputs.hidden_states[-1]
+        if pooling == "cls":
+            embeddings = hidden[:, 0]
+        else:
+            mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            embeddings = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+        return probs, embeddings.numpy().astype(np.float32)
+
+    def embed(self, texts, pooling="mean"):
+        return self.predict_with_embeddings(texts, pooling)[1]
+
+    @property
+    def embedding_dim(self):
+        return self.model.config.hidden_size
+
+    def save(self, path):
+        self.model.save_pretrained(path)
+        self.tokenizer.save_pretrained(path)
+        with open(os.path.join(path, "label_classes.json"), "w") as f:
+            json.dump([str(c) for c in self.label_encoder.classes_], f)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Warm start from a checkpoint written by save()."""
+        with open(os.path.join(path, "label_classes.json"), "r") as f:
+            classes = json.load(f)
+        # The head is loaded at the size it was saved with, whatever the class count.
+        num_labels = AutoConfig.from_pretrained(str(path)).num_labels
+        model = cls(model_name=str(path), num_labels=num_labels, **kwargs)
+        model.label_encoder.classes_ = np.array(classes, dtype=object)
+        return model
@@ -0,0 +1,63 @@
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from .base_model import BaseDisinfoModel
+
+POSITIVE_LABEL = "Disinformation"
+
+
+class FastDisinfoModel(BaseDisinfoModel):
+    """
+    Sparse linear model over the preprocess FeatureBuilder features.
+
+    Cheap enough to score every incoming record; trained as disinformation
+    vs. everything else ("Uncertain" labels are left out of training).
+    """
+
+    def __init__(self, builder=None, C=1.0):
+        self.builder = builder
+        self.classifier = LogisticRegression(C=C, class_weight="balanced", max_iter=1000, solver="liblinear")
+        self.version = None
+
+    def fit(self, X, y):
+        y = pd.Series(y).reset_index(drop=True)
+        keep = (y != "Uncertain").to_numpy()
+        target = (y[keep] == POSITIVE_LABEL).astype(int)
+        if target.nunique() < 2:
+            raise ValueError("Need both disinformation and non-disinformation labels to train the fast model.")
+        self.classifier.fit(X[keep], target)
+        self.version = time.strftime("%Y%m%d%H%M%S")
+        return self
+
+    def predict(self, X):
+        return np.where(self.predict_proba(X)[:, 1] >= 0.5, POSITIVE_LABEL, "Legit")
+
+    def predict_proba(self, X):
+        return self.classifier.predict_proba(X)
+
+    def featurize(self, records):
+        """Featurize raw metadata records exactly as preprocess_and_vectorize does for training."""
+        from preprocess import add_nlp_features
+
+        df = pd.DataFrame(records)
+        df["text"] = df["text"].fillna("") if "text" in df else ""
+        df = add_nlp_features(df)
+        return self.builder.transform(df)
+
+    def disinfo_proba(self, records) -> np.ndarray:
+        return self.predict_proba(self.featurize(records))[:, 1]
+
+    def save(self, path):
+        joblib.dump({"builder": self.builder, "classifier": self.classifier, "version": self.version}, path)
+
+    @classmethod
+    def load(cls, path):
+        state = joblib.load(path)
+        model = cls(builder=state["builder"])
+        model.classifier = state["classifier"]
+        model.version = state["version"]
+        return model
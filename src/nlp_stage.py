@@ -0,0 +1,81 @@
+# src/nlp_stage.py
+
+from typing import Iterable, Iterator, List
+
+import spacy
+
+# Components each output depends on in en_core_web_sm.
+LEMMA_PIPES = {"tok2vec", "tagger", "attribute_ruler", "lemmatizer"}
+SENTENCE_PIPES = {"senter"}
+ENTITY_PIPES = {"ner"}
+
+
+class NLPStage:
+    """
+    One spaCy parse per text, shared by the batch processor and the preprocessor.
+
+    Texts are streamed through `nlp.pipe` with the configured `batch_size` and
+    `n_process`. Only the components needed for the requested outputs are
+    loaded; sentence boundaries come from the lightweight `senter` instead of
+    the dependency parser.
+    """
+
+    def __init__(self, model="en_core_web_sm", batch_size=64, n_process=1,
+                 lemmas=True, sentences=True, entities=True, disable=None):
+        self.model = model
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.lemmas = lemmas
+        self.sentences = sentences
+        self.entities = entities
+        self.disable = set(disable or [])
+        self._nlp = None
+
+    @property
+    def nlp(self):
+        if self._nlp is None:
+            needed = set()
+            if self.lemmas:
+                needed |= LEMMA_PIPES
+            if self.sentences:
+                needed |= SENTENCE_PIPES
+            if self.entities:
+                needed |= ENTITY_PIPES
+            needed -= self.disable
+
+            nlp = spacy.load(self.model, exclude=["parser"])
+            for name in list(nlp.component_names):
+                if name not in needed:
+                    nlp.remove_pipe(name)
+            if "senter" in nlp.disabled:
+                nlp.enable_pipe("senter")
+            self._nlp = nlp
+        return self._nlp
+
+    def _analyze(self, doc) -> dict:
+        result = {}
+        if self.lemmas:
+            result["clean_text"] = " ".join(
+                t.lemma_.lower() for t in doc if not t.is_stop and not t.is_punct
+            )
+        if self.sentences:
+            result["sentence_count"] = len(list(doc.sents))
+        if self.entities:
+            result["named_entities"] = list(set(ent.text for ent in doc.ents))
+        return result
+
+    def pipe(self, texts: Iterable[str]) -> Iterator[dict]:
+        """Yield one analysis dict per input text, in order."""
+        docs = self.nlp.pipe(
+            (text or "" for text in texts),
+            batch_size=self.batch_size,
+            n_process=self.n_process
+        )
+        for doc in docs:
+            yield self._analyze(doc)
+
+    def analyze(self, text: str) -> dict:
+        return next(self.pipe([text]))
+
+    def analyze_many(self, texts: List[str]) -> List[dict]:
+        return list(self.pipe(texts))
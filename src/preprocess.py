@@ -1,46 +1,64 @@
 import os
-import json
 import pandas as pd
-import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.preprocessing import StandardScaler
+from nlp_stage import NLPStage
+from utils.record_store import RecordStore
+from utils.label_store import LabelStore
 
-nlp = spacy.load("en_core_web_sm")
+nlp_stage = NLPStage(batch_size=64, n_process=1)
 
 # Paths
 PROCESSED_DIR = "../data/processed"
+RECORD_STORE_DIR = os.path.join(PROCESSED_DIR, "store")
 LABELS_FILE = "../labels/manual_labels.jsonl"
+LABEL_STORE_FILE = "../labels/labels.sqlite"
 
-def load_metadata_files():
-    all_data = []
-    for folder in ["articles", "tweets", "transcripts"]:
-        dir_path = os.path.join(PROCESSED_DIR, folder)
-        if not os.path.exists(dir_path):
-            continue
-        for file in os.listdir(dir_path):
-            if file.endswith(".json"):
-                path = os.path.join(dir_path, file)
-                with open(path, "r") as f:
-                    data = json.load(f)
-                    data["source_file"] = path
-                    all_data.append(data)
-    return pd.DataFrame(all_data)
+def load_metadata_files(columns=None):
+    """All stored records as a DataFrame, via one columnar scan of the record store."""
+    if not os.path.exists(RECORD_STORE_DIR):
+        print(f"[PREPROCESS] No record store at {RECORD_STORE_DIR}; "
+              "run scripts/migrate_processed_to_store.py for per-file data.")
+        return pd.DataFrame(columns=["id", "type", "text", "source_file"])
+
+    df = RecordStore(RECORD_STORE_DIR).scan(columns=columns)
+    # Records migrated from per-file JSON keep their original path, which older labels use as id.
+    if "source_file" in df:
+        df["source_file"] = df["source_file"].fillna(df["id"])
+    else:
+        df["source_file"] = df["id"]
+    return df
 
 def clean_text(text):
-    doc = nlp(text)
-    tokens = [t.lemma_.lower() for t in doc if not t.is_stop and not t.is_punct]
-    return " ".join(tokens)
+    return nlp_stage.analyze(text)["clean_text"]
+
+def add_nlp_features(df):
+    """Lemmas, sentence counts and entities from a single nlp.pipe pass over df["text"]."""
+    # Explicit columns, so an empty frame still gets them.
+    analyses = pd.DataFrame(list(nlp_stage.pipe(df["text"])), index=df.index,
+                            columns=["clean_text", "sentence_count", "named_entities"])
+    df["clean_text"] = analyses["clean_text"]
+    df["sentence_count"] = analyses["sentence_count"]
+    if "named_entities" in df:
+        # Keep extractor-provided entities; fill the rest (articles, tweets) from the parse.
+        has_entities = df["named_entities"].apply(lambda x: isinstance(x, list))
+        df["named_entities"] = df["named_entities"].where(has_entities, analyses["named_entities"])
+    else:
+        df["named_entities"] = analyses["named_entities"]
+    return add_metadata_features(df)
 
 def add_metadata_features(df):
     df["word_count"] = df["text"].apply(lambda x: len(x.split()))
-    df["sentence_count"] = df["text"].apply(lambda x: len(list(nlp(x).sents)))
+    if "sentence_count" not in df or df["sentence_count"].isnull().any():
+        df["sentence_count"] = [a["sentence_count"] for a in nlp_stage.pipe(df["text"])]
     df["ner_count"] = df["named_entities"].apply(lambda x: len(x) if isinstance(x, list) else 0)
     return df
 def load_manual_labels():
-    if not os.path.exists(LABELS_FILE):
+    if not os.path.exists(LABEL_STORE_FILE) and not os.path.exists(LABELS_FILE):
         return {}
-    with open(LABELS_FILE, "r") as f:
-        entries = [json.loads(line) for line in f.readlines()]
-    return {e["id"]: e["label"] for e in entries}
+    # Labels still only in the legacy append-only log are merged into the store on open.
+    return LabelStore(LABEL_STORE_FILE, legacy_log=LABELS_FILE).as_dict()
 
 def apply_labels(df):
     label_map = load_manual_labels()
@@ -48,20 +66,73 @@ def apply_labels(df):
     df = df[df["label"].notnull()]
     return df
 
-def preprocess_and_vectorize():
+METADATA_FEATURES = ["word_count", "sentence_count", "ner_count"]
+
+class FeatureBuilder:
+    """
+    Sparse text features hstacked with scaled metadata features, as one CSR matrix.
+
+    mode="tfidf" fits a vocabulary over the corpus; mode="hashing" uses a
+    stateless HashingVectorizer, so no vocabulary pass is needed and new
+    documents can be transformed chunk by chunk.
+    """
+
+    def __init__(self, mode="tfidf", max_features=1000, n_features=2 ** 18, chunk_size=10000):
+        if mode not in ("tfidf", "hashing"):
+            raise ValueError(f"Unknown vectorizer mode '{mode}'")
+        self.mode = mode
+        self.chunk_size = chunk_size
+        if mode == "tfidf":
+            self.vectorizer = TfidfVectorizer(max_features=max_features)
+        else:
+            self.vectorizer = HashingVectorizer(n_features=n_features, alternate_sign=False)
+        # with_mean=False keeps the scaling sparse-safe (no centering).
+        self.scaler = StandardScaler(with_mean=False)
+
+    def _metadata(self, df):
+        return df[METADATA_FEATURES].astype(float).to_numpy()
+
+    def _text(self, df):
+        if self.mode == "tfidf":
+            return self.vectorizer.transform(df["clean_text"])
+        # Hashing is stateless, so transform in chunks to bound the intermediate token lists.
+        chunks = [
+            self.vectorizer.transform(df["clean_text"].iloc[i:i + self.chunk_size])
+            for i in range(0, len(df), self.chunk_size)
+        ]
+        return sp.vstack(chunks, format="csr") if chunks else sp.csr_matrix((0, self.vectorizer.n_features))
+
+    def fit(self, df):
+        if self.mode == "tfidf":
+            self.vectorizer.fit(df["clean_text"])
+        self.scaler.fit(self._metadata(df))
+        return self
+
+    def transform(self, df):
+        metadata = sp.csr_matrix(self.scaler.transform(self._metadata(df)))
+        return sp.hstack([self._text(df), metadata], format="csr")
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+def preprocess_and_vectorize(mode="tfidf", return_builder=False):
     df = load_metadata_files()
-    df = df[df["text"].notnull()]
-    df["clean_text"] = df["text"].apply(clean_text)
-    df = add_metadata_features(df)
+    df = df[df["text"].notnull()].copy()
+    df = add_nlp_features(df)
     df = apply_labels(df)
 
-    vectorizer = TfidfVectorizer(max_features=1000)
-    X_text = vectorizer.fit_transform(df["clean_text"])
-
-    metadata_features = df[["word_count", "sentence_count", "ner_count"]].reset_index(drop=True)
-    X = pd.concat([pd.DataFrame(X_text.toarray()), metadata_features], axis=1)
+    builder = FeatureBuilder(mode=mode)
+    if df.empty:
+        # Nothing labeled yet: the scaler and vocabulary can't be fitted, so callers get an
+        # empty matrix (and an unfitted builder) and stop there.
+        X = sp.csr_matrix((0, 0))
+    else:
+        X = builder.fit_transform(df)
     y = df["label"].reset_index(drop=True)
 
+    # The fitted builder is needed to featurize new records the same way (e.g. the fast model).
+    if return_builder:
+        return X, y, df, builder
     return X, y, df
 
 if __name__ == "__main__":
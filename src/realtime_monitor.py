@@ -1,10 +1,13 @@
 import os
 import json
-import feedparser
+import threading
+from datetime import datetime
 import logging
 import tweepy
 from dotenv import load_dotenv
-from batch_processor import extract_article_metadata, extract_tweet_metadata, save_metadata_record
+from batch_processor import extract_tweet_metadata, save_metadata_records
+from rss_poller import RSSPoller
+from utils.stream_buffer import StreamBuffer
 
 # Load Twitter API token
 load_dotenv()
@@ -29,35 +32,50 @@ os.makedirs(article_dir, exist_ok=True)
 os.makedirs(tweet_dir, exist_ok=True)
 
 # ------------- RSS MONITORING -------------
-def monitor_rss_feeds(feed_urls, known_urls_file="data/rss_seen.json", interval=60):
+def monitor_rss_feeds(feed_urls, known_urls_file="data/rss_seen.json", interval=60,
+                      state_file="data/rss_state.json", seen_index_file="data/rss_seen.idx",
+                      poll_workers=16, extract_workers=4):
     logger.info(f"Starting RSS monitor with interval {interval}s")
-    if os.path.exists(known_urls_file):
-        with open(known_urls_file, "r") as f:
-            seen = set(json.load(f))
-    else:
-        seen = set()
-
-    while True:
-        new_seen = set(seen)
-        for feed_url in feed_urls:
-            parsed = feedparser.parse(feed_url)
-            for entry in parsed.entries:
-                link = entry.link
-                if link not in seen:
-                    try:
-                        meta = extract_article_metadata(link)
-                        save_metadata_record(meta, article_dir)
-                        logger.info(f"[RSS] Processed: {link}")
-                        new_seen.add(link)
-                    except Exception as e:
-                        logger.error(f"[RSS ERROR] {link}: {e}")
-        seen = new_seen
-        with open(known_urls_file, "w") as f:
-            json.dump(list(seen), f)
-        time.sleep(interval)
+    poller = RSSPoller(
+        feed_urls,
+        article_dir,
+        state_file=state_file,
+        seen_index_file=seen_index_file,
+        known_urls_file=known_urls_file,
+        interval=interval,
+        poll_workers=poll_workers,
+        extract_workers=extract_workers
+    )
+    poller.run_forever()
 
 # ------------- TWITTER STREAMING -------------
 class TwitterStream(tweepy.StreamingClient):
+    """
+    on_tweet only snapshots the tweet into a bounded StreamBuffer, so the
+    tweepy thread keeps up with the connection during surges. Worker threads
+    drain the buffer in micro-batches and persist + score each batch with one
+    store append and one inference-log write. Buffer metrics (depth, spills,
+    drops, lag) are logged and written to `metrics_path` every
+    `metrics_interval` seconds.
+    """
+
+    def __init__(self, bearer_token, workers=2, batch_size=64, max_queue=10000,
+                 spill_path="data/queue/tweet_spill.sqlite", metrics_path="logs/twitter_stream_metrics.json",
+                 metrics_interval=30, **kwargs):
+        super().__init__(bearer_token, **kwargs)
+        self.batch_size = batch_size
+        self.metrics_path = metrics_path
+        self.metrics_interval = metrics_interval
+        self.buffer = StreamBuffer(max_items=max_queue, spill_path=spill_path)
+        self._stopping = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"tweet-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        self._threads.append(threading.Thread(target=self._report_metrics, name="tweet-metrics", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
     def on_tweet(self, tweet):
         try:
             tweet_obj = {
@@ -71,12 +89,50 @@ class TwitterStream(tweepy.StreamingClient):
                 "quote_count": tweet.public_metrics.get("quote_count", 0),
                 "lang": tweet.lang
             }
-            meta = extract_tweet_metadata(tweet_obj)
-            save_metadata_record(meta, tweet_dir)
-            logger.info(f"[Twitter] Processed tweet {tweet.id}")
+            if not self.buffer.put(tweet_obj):
+                logger.warning(f"[Twitter] Buffer full, dropped tweet {tweet.id}")
         except Exception as e:
             logger.error(f"[Twitter ERROR] {e}")
 
+    def _worker(self):
+        while not self._stopping.is_set():
+            batch = self.buffer.get_batch(self.batch_size, timeout=1.0)
+            if not batch:
+                continue
+            records = []
+            for _, tweet_obj in batch:
+                try:
+                    records.append(extract_tweet_metadata(tweet_obj))
+                except Exception as e:
+                    logger.error(f"[Twitter ERROR] {tweet_obj.get('id')}: {e}")
+            try:
+                save_metadata_records(records, tweet_dir)
+                logger.info(f"[Twitter] Processed {len(records)} tweets")
+            except Exception as e:
+                # Saving is all-or-nothing per batch, so hand the tweets back rather than lose them.
+                kept = self.buffer.requeue(batch)
+                logger.error(f"[Twitter ERROR] batch of {len(records)}: {e}; requeued {kept} tweets")
+                self._stopping.wait(1.0)
+                continue
+            self.buffer.task_done(batch)
+
+    def metrics(self) -> dict:
+        return {"timestamp": datetime.now().isoformat(), **self.buffer.metrics()}
+
+    def _report_metrics(self):
+        while not self._stopping.wait(self.metrics_interval):
+            metrics = self.metrics()
+            logger.info(f"[Twitter METRICS] {metrics}")
+            os.makedirs(os.path.dirname(self.metrics_path) or ".", exist_ok=True)
+            with open(self.metrics_path, "w") as f:
+                json.dump(metrics, f, indent=2)
+
+    def stop_workers(self, timeout=10):
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self.buffer.close()
+
 def start_twitter_stream(keywords):
     logger.info(f"Starting Twitter stream with keywords: {keywords}")
     stream = TwitterStream(BEARER_TOKEN)
@@ -87,4 +143,7 @@ def start_twitter_stream(keywords):
         stream.delete_rules(rule_ids)
 
     stream.add_rules(tweepy.StreamRule(value=" OR ".join(keywords)))
-    stream.filter(tweet_fields=["created_at", "lang", "public_metrics", "author_id"])
+    try:
+        stream.filter(tweet_fields=["created_at", "lang", "public_metrics", "author_id"])
+    finally:
+        stream.stop_workers()
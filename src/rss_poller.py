@@ -0,0 +1,189 @@
+# src/rss_poller.py
+#
+# Concurrent RSS polling used by realtime_monitor.monitor_rss_feeds:
+#
+#   scheduler (per-feed next-due times)
+#     -> poll pool (conditional GET with stored ETag/Last-Modified, per-host limits)
+#     -> extraction pool (extract_article_metadata + save_metadata_record)
+#
+# Each feed's poll interval shrinks while it keeps publishing and backs off
+# while it doesn't, so quiet feeds stop costing a request every minute.
+
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import feedparser
+
+from batch_processor import extract_article_metadata, save_metadata_record
+from utils.seen_index import SeenIndex, canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+
+class RSSPoller:
+    def __init__(self, feed_urls, output_dir, state_file="data/rss_state.json",
+                 seen_index_file="data/rss_seen.idx", known_urls_file="data/rss_seen.json",
+                 seen_ttl=30 * 24 * 3600, interval=60, min_interval=30, max_interval=3600,
+                 poll_workers=16, per_host_limit=2, extract_workers=4):
+        self.feed_urls = list(feed_urls)
+        self.output_dir = output_dir
+        self.state_file = state_file
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.per_host_limit = per_host_limit
+
+        self.poll_pool = ThreadPoolExecutor(poll_workers, thread_name_prefix="rss-poll")
+        self.extract_pool = ThreadPoolExecutor(extract_workers, thread_name_prefix="rss-extract")
+        self._lock = threading.Lock()
+        self._host_limits = {}
+        self._in_flight = set()
+        self._dirty = False
+
+        self.state = self._load_json(state_file, {})
+        self.seen = SeenIndex(seen_index_file, ttl=seen_ttl)
+        if os.path.exists(known_urls_file):
+            # One-time import of the old JSON list of every URL ever seen.
+            imported = self.seen.import_json(known_urls_file)
+            os.replace(known_urls_file, f"{known_urls_file}.imported")
+            logger.info(f"[RSS] Imported {imported} seen URLs from {known_urls_file}")
+
+    # --------- Persistence ---------
+
+    @staticmethod
+    def _load_json(path, default):
+        if not os.path.exists(path):
+            return default
+        with open(path, "r") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_json(path, data):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            state = dict(self.state)
+            self._dirty = False
+        self._write_json(self.state_file, state)
+
+    # --------- Polling ---------
+
+    def _host_limit(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.Semaphore(self.per_host_limit)
+            return self._host_limits[host]
+
+    def _feed_state(self, feed_url):
+        with self._lock:
+            return self.state.setdefault(feed_url, {"interval": self.interval})
+
+    def poll(self, feed_url) -> float:
+        """Poll one feed and queue its unseen links. Returns seconds until it is due again."""
+        feed = self._feed_state(feed_url)
+        with self._host_limit(feed_url):
+            parsed = feedparser.parse(feed_url, etag=feed.get("etag"), modified=feed.get("modified"))
+
+        status = getattr(parsed, "status", None)
+        new_links = []
+        if status == 304:
+            logger.info(f"[RSS] Not modified: {feed_url}")
+        elif parsed.get("bozo") and not parsed.entries:
+            logger.error(f"[RSS ERROR] {feed_url}: {parsed.get('bozo_exception')}")
+        else:
+            for entry in parsed.entries:
+                link = entry.get("link")
+                if not link or link in self.seen:
+                    continue
+                key = canonicalize_url(link)
+                with self._lock:
+                    if key in self._in_flight:
+                        continue
+                    self._in_flight.add(key)
+                new_links.append(link)
+            for link in new_links:
+                self.extract_pool.submit(self._extract, link)
+
+        with self._lock:
+            if parsed.get("etag"):
+                feed["etag"] = parsed.etag
+            if parsed.get("modified"):
+                feed["modified"] = parsed.modified
+            # Halve the interval while the feed is publishing, back off by half again while it isn't.
+            factor = 0.5 if new_links else 1.5
+            feed["interval"] = min(self.max_interval, max(self.min_interval, feed["interval"] * factor))
+            feed["last_polled"] = time.time()
+            if new_links:
+                feed["last_new"] = feed["last_polled"]
+            self._dirty = True
+        return feed["interval"]
+
+    def _extract(self, link):
+        try:
+            meta = extract_article_metadata(link)
+            save_metadata_record(meta, self.output_dir)
+            logger.info(f"[RSS] Processed: {link}")
+            self.seen.add(link)
+        except Exception as e:
+            logger.error(f"[RSS ERROR] {link}: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(canonicalize_url(link))
+
+    def _poll_safely(self, feed_url) -> float:
+        try:
+            return self.poll(feed_url)
+        except Exception as e:
+            logger.error(f"[RSS ERROR] {feed_url}: {e}")
+            return self._feed_state(feed_url)["interval"]
+
+    def run_forever(self, save_every=30, compact_every=24 * 3600):
+        """Poll each feed when it is due; results reschedule the feed by its adapted interval."""
+        logger.info(f"Starting RSS poller for {len(self.feed_urls)} feeds")
+        now = time.time()
+        due = [(self.state.get(url, {}).get("last_polled", 0) + self._feed_state(url)["interval"], url)
+               for url in self.feed_urls]
+        heapq.heapify(due)
+        pending = {}
+        last_save = last_compact = now
+
+        try:
+            while True:
+                now = time.time()
+                while due and due[0][0] <= now:
+                    _, url = heapq.heappop(due)
+                    pending[url] = self.poll_pool.submit(self._poll_safely, url)
+
+                for url, future in list(pending.items()):
+                    if future.done():
+                        del pending[url]
+                        heapq.heappush(due, (time.time() + future.result(), url))
+
+                if now - last_save >= save_every:
+                    self.save()
+                    last_save = now
+                if now - last_compact >= compact_every:
+                    kept = self.seen.compact()
+                    logger.info(f"[RSS] Compacted seen index to {kept} URLs")
+                    last_compact = now
+
+                next_due = due[0][0] if due else now + 1
+                time.sleep(max(0.1, min(1.0, next_due - time.time())))
+        finally:
+            self.save()
+            self.poll_pool.shutdown(wait=False)
+            self.extract_pool.shutdown(wait=True)
@@ -0,0 +1,45 @@
+# src/train_fast_model.py
+#
+# Trains the fast first stage of the inference cascade (see infer.get_cascade)
+# on the manual labels, using the same features as preprocess_and_vectorize.
+
+import argparse
+import os
+
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import classification_report
+
+from preprocess import preprocess_and_vectorize
+from models.fast_model import FastDisinfoModel
+
+FAST_MODEL_PATH = "../models/fast_model.joblib"
+
+def train_fast_model(output_path=FAST_MODEL_PATH, mode="tfidf", C=1.0, holdout=0.2):
+    X, y, df, builder = preprocess_and_vectorize(mode=mode, return_builder=True)
+    if X.shape[0] == 0:
+        print("[FAST] No labeled data to train on.")
+        return None
+
+    model = FastDisinfoModel(builder=builder, C=C)
+    if holdout and X.shape[0] >= 20:
+        idx_train, idx_test = train_test_split(range(X.shape[0]), test_size=holdout, random_state=0)
+        model.fit(X[idx_train], y.iloc[idx_train])
+        y_test = y.iloc[idx_test]
+        keep = (y_test != "Uncertain").to_numpy()
+        target = (y_test[keep] == "Disinformation").map({True: "Disinformation", False: "Legit"})
+        print(classification_report(target, model.predict(X[idx_test][keep]), zero_division=0))
+
+    model.fit(X, y)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    model.save(output_path)
+    print(f"[FAST] Trained on {X.shape[0]} records ({X.shape[1]} features), saved {model.version} to {output_path}")
+    return model
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the fast linear stage of the inference cascade.")
+    parser.add_argument("--output", default=FAST_MODEL_PATH)
+    parser.add_argument("--mode", choices=["tfidf", "hashing"], default="tfidf")
+    parser.add_argument("--C", type=float, default=1.0, help="Inverse regularization strength")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction held out for a report (0 to skip)")
+    args = parser.parse_args()
+    train_fast_model(args.output, mode=args.mode, C=args.C, holdout=args.holdout)
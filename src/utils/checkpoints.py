@@ -0,0 +1,87 @@
+# src/utils/checkpoints.py
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class CheckpointRegistry:
+    """
+    Versioned model checkpoints under one directory.
+
+    Each version lives in its own `v0001`, `v0002`, ... subdirectory next to
+    the labels it was trained on (`trained_labels.json`, id -> label), and
+    `manifest.json` lists the versions in order with their round metadata.
+    The manifest is rewritten atomically after a checkpoint is complete, so
+    a crashed round never becomes the latest version.
+    """
+
+    def __init__(self, root, keep=5):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.keep = keep
+        self.manifest_path = self.root / "manifest.json"
+
+    def versions(self) -> List[dict]:
+        if not self.manifest_path.exists():
+            return []
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)["versions"]
+
+    def latest(self) -> Optional[dict]:
+        versions = self.versions()
+        return versions[-1] if versions else None
+
+    def path(self, entry: dict) -> Path:
+        return self.root / entry["version"]
+
+    def next_dir(self) -> Path:
+        """A fresh directory for the next version; becomes visible only through commit()."""
+        versions = self.versions()
+        number = int(versions[-1]["version"][1:]) + 1 if versions else 1
+        path = self.root / f"v{number:04d}"
+        if path.exists():
+            # Left over from a round that died before committing.
+            shutil.rmtree(path)
+        path.mkdir()
+        return path
+
+    def commit(self, path, trained_labels: Dict[str, str], **info) -> dict:
+        """Register the checkpoint written to `path` as the latest version."""
+        path = Path(path)
+        with open(path / "trained_labels.json", "w", encoding="utf-8") as f:
+            json.dump(trained_labels, f)
+
+        entry = {"version": path.name, "created_at": time.time(), "num_labels": len(trained_labels), **info}
+        # Stored per entry, because pruning can drop the full retrain it counts from.
+        entry["rounds_since_full"] = 0 if info.get("full_retrain") else self.rounds_since_full() + 1
+        versions = self.versions() + [entry]
+        for old in versions[:-self.keep] if self.keep else []:
+            shutil.rmtree(self.root / old["version"], ignore_errors=True)
+        versions = versions[-self.keep:] if self.keep else versions
+
+        tmp_path = self.manifest_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"versions": versions}, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+        return entry
+
+    def trained_labels(self, entry: dict) -> Dict[str, str]:
+        with open(self.path(entry) / "trained_labels.json", "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def rounds_since_full(self) -> int:
+        """Incremental rounds trained since the most recent full retrain."""
+        versions = self.versions()
+        if versions and "rounds_since_full" in versions[-1]:
+            return versions[-1]["rounds_since_full"]
+        # Manifests written before the counter was stored.
+        count = 0
+        for entry in reversed(versions):
+            if entry.get("full_retrain"):
+                return count
+            count += 1
+        return count
@@ -0,0 +1,115 @@
+# src/utils/embedding_cache.py
+
+import shutil
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from .result_cache import content_hash
+
+
+class EmbeddingCache:
+    """
+    Pooled document embeddings keyed by (content hash, model version).
+
+    Each model version gets its own directory holding a float32 memmap
+    (`vectors.f32`, grown by doubling) and a SQLite map from content hash to
+    row, so identical texts share a row and a new checkpoint starts clean.
+    rows() hands back indices into `vectors`, which can be sliced without
+    loading the whole array.
+    """
+
+    def __init__(self, root, model_version, dim):
+        self.root = Path(root)
+        self.model_version = model_version
+        self.dim = dim
+        self.dir = self.root / model_version
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._path = self.dir / "vectors.f32"
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(str(self.dir / "keys.sqlite"), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS keys (
+                hash TEXT PRIMARY KEY,
+                row INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+        """)
+        self.conn.execute("INSERT OR IGNORE INTO meta VALUES ('dim', ?)", (dim,))
+        self.conn.commit()
+        stored_dim = self.conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()[0]
+        if stored_dim != dim:
+            raise ValueError(f"Embedding cache at {self.dir} holds {stored_dim}-d vectors, not {dim}-d")
+
+        self.size = self.conn.execute("SELECT COUNT(*) FROM keys").fetchone()[0]
+        capacity = self._path.stat().st_size // (4 * dim) if self._path.exists() else 0
+        self.vectors = self._map(capacity) if capacity else np.zeros((0, dim), dtype=np.float32)
+
+    def _map(self, capacity):
+        with open(self._path, "ab") as f:
+            f.truncate(capacity * self.dim * 4)
+        return np.memmap(self._path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _ensure_capacity(self, n):
+        if n <= len(self.vectors):
+            return
+        if isinstance(self.vectors, np.memmap):
+            self.vectors.flush()
+        self.vectors = self._map(max(n, 2 * len(self.vectors), 1024))
+
+    def rows(self, texts: List[str]) -> np.ndarray:
+        """Row index per text, -1 where it has no embedding yet."""
+        hashes = [content_hash(text) for text in texts]
+        found = {}
+        for i in range(0, len(hashes), 500):
+            chunk = hashes[i:i + 500]
+            found.update(self.conn.execute(
+                f"SELECT hash, row FROM keys WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+            ))
+        return np.array([found.get(h, -1) for h in hashes], dtype=np.int64)
+
+    def add_many(self, texts: List[str], embeddings: np.ndarray) -> np.ndarray:
+        """Store embeddings for texts not cached yet. Returns the row of every text."""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        with self._lock:
+            rows = self.rows(texts)
+            new = {}
+            for i in np.flatnonzero(rows < 0):
+                h = content_hash(texts[i])
+                if h not in new:
+                    new[h] = (self.size + len(new), i)
+                rows[i] = new[h][0]
+            if new:
+                self._ensure_capacity(self.size + len(new))
+                positions = [row for row, _ in new.values()]
+                self.vectors[positions] = embeddings[[i for _, i in new.values()]]
+                self.vectors.flush()
+                self.conn.executemany("INSERT INTO keys VALUES (?, ?)", [(h, row) for h, (row, _) in new.items()])
+                self.conn.commit()
+                self.size += len(new)
+        return rows
+
+    def __len__(self) -> int:
+        return self.size
+
+    def purge_other_versions(self) -> int:
+        """Delete the caches of every other model version. Returns how many were removed."""
+        removed = 0
+        for path in self.root.iterdir():
+            if path.is_dir() and path.name != self.model_version:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def close(self):
+        if isinstance(self.vectors, np.memmap):
+            self.vectors.flush()
+        self.conn.close()
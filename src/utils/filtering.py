@@ -1,33 +1,82 @@
 # src/utils/filtering.py
 
 import pandas as pd
-from datetime import datetime, timedelta, time as dtime
+from datetime import time as dtime
+
+def date_threshold(days_back: int) -> pd.Timestamp:
+    """Start of the day `days_back` days ago, so today's entries are always included."""
+    return pd.Timestamp.combine(
+        pd.Timestamp.now().date() - pd.Timedelta(days=days_back),
+        dtime.min
+    )
 
 class InferenceFilter:
-    def __init__(self, df: pd.DataFrame):
-        self.df = df.copy()
+    """
+    Collects date/type/flagged/confidence predicates and applies them in one go.
+
+    Backed either by a DataFrame (one combined mask, no upfront copy) or by an
+    InferenceLogIndex, in which case the predicates and LIMIT/OFFSET are
+    pushed down to indexed SQL.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.filters = {}
+
+    @property
+    def indexed(self) -> bool:
+        return not isinstance(self.source, pd.DataFrame)
 
     def filter_by_date(self, days_back: int) -> 'InferenceFilter':
-        time_threshold = pd.Timestamp.combine(
-            pd.Timestamp.now().date() - pd.Timedelta(days=days_back),
-            dtime.min
-        )
-        self.df = self.df[self.df["datetime"] >= time_threshold]
+        self.filters["since"] = date_threshold(days_back)
         return self
 
     def filter_by_type(self, content_type: str) -> 'InferenceFilter':
         if content_type != "All":
-            self.df = self.df[self.df["type"] == content_type]
+            self.filters["content_type"] = content_type
         return self
 
     def filter_by_flagged(self, flagged_only: bool) -> 'InferenceFilter':
         if flagged_only:
-            self.df = self.df[self.df["flagged"] == True]
+            self.filters["flagged_only"] = True
         return self
 
     def filter_by_confidence(self, min_confidence: float) -> 'InferenceFilter':
-        self.df = self.df[self.df["confidence"] >= min_confidence]
+        self.filters["min_confidence"] = min_confidence
         return self
 
-    def get_filtered(self) -> pd.DataFrame:
-        return self.df
+    def collapse_duplicates(self, collapse: bool) -> 'InferenceFilter':
+        if collapse:
+            self.filters["collapse_duplicates"] = True
+        return self
+
+    def _mask(self):
+        df, f = self.source, self.filters
+        mask = pd.Series(True, index=df.index)
+        if "since" in f:
+            mask &= df["datetime"] >= f["since"]
+        if "content_type" in f:
+            mask &= df["type"] == f["content_type"]
+        if f.get("flagged_only"):
+            mask &= df["flagged"] == True
+        if "min_confidence" in f:
+            mask &= df["confidence"] >= f["min_confidence"]
+        if f.get("collapse_duplicates") and "cluster_id" in df:
+            clustered = df["cluster_id"].notna()
+            latest = ~df[mask & clustered].duplicated("cluster_id", keep="last")
+            mask &= ~clustered | latest.reindex(df.index, fill_value=False)
+        return mask
+
+    def count(self) -> int:
+        if self.indexed:
+            return self.source.count(**self.filters)
+        return int(self._mask().sum())
+
+    def get_filtered(self, limit=None, offset=0, sort_by="time", descending=True) -> pd.DataFrame:
+        if self.indexed:
+            return self.source.query(limit=limit, offset=offset, sort_by=sort_by,
+                                     descending=descending, **self.filters)
+        df = self.source[self._mask()]
+        if limit is not None:
+            df = df.iloc[offset:offset + limit]
+        return df
@@ -0,0 +1,142 @@
+# src/utils/label_store.py
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class LabelStore:
+    """
+    Latest manual label per record id, in SQLite.
+
+    Writes are upserts keyed on id that only touch the row when the label
+    actually changes, and an in-process memo of what this process last wrote
+    lets Streamlit reruns skip the database entirely for unchanged radios.
+
+    With `legacy_log`, labels from an older manual_labels.jsonl are merged in
+    on open whenever that file has changed since the last merge; a label
+    only replaces a stored one if its timestamp is newer.
+    """
+
+    def __init__(self, db_path, legacy_log=None):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._written = {}
+
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS labels (
+                id TEXT PRIMARY KEY,
+                label TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS imports (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL
+            );
+        """)
+        self.conn.commit()
+        if legacy_log:
+            self.merge_legacy_log(legacy_log)
+
+    def set(self, rid, label, timestamp=None) -> bool:
+        """Record `label` for `rid`. Returns False if it was already the stored label."""
+        rid = str(rid)
+        if self._written.get(rid) == label:
+            return False
+        return self.set_many([(rid, label, timestamp)]) > 0
+
+    def set_many(self, items: Iterable[Tuple[str, str, Optional[str]]], newer_only=False) -> int:
+        """
+        Upsert (id, label, timestamp) triples; later items win. With
+        `newer_only`, a stored label is only replaced by a newer timestamp.
+        Returns rows changed.
+        """
+        now = datetime.now().isoformat()
+        rows = [(str(rid), label, ts or ("" if newer_only else now)) for rid, label, ts in items]
+        newer = " AND excluded.updated_at > labels.updated_at" if newer_only else ""
+        with self._lock:
+            before = self.conn.total_changes
+            self.conn.executemany(f"""
+                INSERT INTO labels (id, label, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET label = excluded.label, updated_at = excluded.updated_at
+                WHERE labels.label != excluded.label{newer}
+            """, rows)
+            self.conn.commit()
+            changed = self.conn.total_changes - before
+            for rid, label, _ in rows:
+                if newer_only:
+                    # The row may have kept its newer label; look it up next time.
+                    self._written.pop(rid, None)
+                else:
+                    self._written[rid] = label
+        return changed
+
+    def get(self, rid) -> Optional[str]:
+        row = self.conn.execute("SELECT label FROM labels WHERE id = ?", (str(rid),)).fetchone()
+        return row[0] if row else None
+
+    def as_dict(self) -> Dict[str, str]:
+        """Bulk id -> label map, e.g. for joining labels onto training data."""
+        return dict(self.conn.execute("SELECT id, label FROM labels"))
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM labels").fetchone()[0]
+
+    def import_jsonl(self, path, batch_size=10000, newer_only=False) -> int:
+        """Load a legacy manual_labels.jsonl, keeping the last label seen per id."""
+        changed, batch = 0, []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"[WARN] Skipping malformed label line in {path}")
+                    continue
+                batch.append((entry["id"], entry["label"], entry.get("timestamp")))
+                if len(batch) >= batch_size:
+                    changed += self.set_many(batch, newer_only)
+                    batch = []
+        return changed + self.set_many(batch, newer_only)
+
+    def merge_legacy_log(self, path) -> int:
+        """Merge `path` into the store unless it is unchanged since the last merge. Returns rows changed."""
+        path = os.path.abspath(path)
+        if not os.path.exists(path):
+            return 0
+        size = os.path.getsize(path)
+        row = self.conn.execute("SELECT size FROM imports WHERE path = ?", (path,)).fetchone()
+        if row and row[0] == size:
+            return 0
+        changed = self.import_jsonl(path, newer_only=True)
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO imports VALUES (?, ?)", (path, size))
+            self.conn.commit()
+        if changed:
+            print(f"[LABELS] Merged {changed} labels from {path}")
+        return changed
+
+    def close(self):
+        self.conn.close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def open_label_store(path=None) -> LabelStore:
+    """One LabelStore per database per process, with the label log next to it merged in."""
+    from src.config.paths import LABEL_LOG_PATH, LABEL_STORE_PATH
+
+    key = os.path.abspath(path or LABEL_STORE_PATH)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = LabelStore(key, legacy_log=os.path.join(os.path.dirname(key), LABEL_LOG_PATH.name))
+        return _stores[key]
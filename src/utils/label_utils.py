@@ -1,24 +1,13 @@
 # src/utils/label_utils.py
 
-import json
-from datetime import datetime
-from pathlib import Path
-from src.config.paths import LABEL_LOG_PATH
+from src.config.paths import LABEL_STORE_PATH
+from src.utils.label_store import open_label_store
+from src.utils.review_queue import open_review_queue
 
 
 def save_manual_label(metadata_id, label):
-    label_entry = {
-        "id": metadata_id,
-        "label": label,
-        "timestamp": datetime.now().isoformat()
-    }
+    # Idempotent: re-saving the same label on a Streamlit rerun is a no-op.
+    open_label_store(LABEL_STORE_PATH).set(metadata_id, label)
 
-    Path(LABEL_LOG_PATH).parent.mkdir(parents=True, exist_ok=True)
-    with open(LABEL_LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(json.dumps(label_entry) + "\n")
-
-def append_to_review_queue(entries, queue_path):
-    Path(queue_path).parent.mkdir(parents=True, exist_ok=True)
-    with open(queue_path, "a", encoding="utf-8") as f:
-        for entry in entries:
-            f.write(json.dumps(entry) + "\n")
+def append_to_review_queue(entries, queue_path=None):
+    return open_review_queue(queue_path).push_many(entries)
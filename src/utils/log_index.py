@@ -0,0 +1,183 @@
+# src/utils/log_index.py
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from src.utils.log_reader import tail_jsonl
+
+SORT_COLUMNS = {"time": "ts", "confidence": "confidence"}
+
+
+def _epoch(value) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class InferenceLogIndex:
+    """
+    SQLite mirror of the inference log with indexes on time, type, flagged
+    and confidence, so dashboard filters become indexed range scans with
+    LIMIT/OFFSET instead of boolean masks over the whole history.
+
+    sync() ingests only the lines appended since the last sync.
+    """
+
+    def __init__(self, db_path, log_path):
+        self.db_path = Path(db_path)
+        self.log_path = Path(log_path)
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS inference (
+                id INTEGER PRIMARY KEY,
+                file TEXT,
+                type TEXT,
+                flagged INTEGER NOT NULL,
+                confidence REAL NOT NULL,
+                reason TEXT,
+                ts REAL,
+                published_ts REAL,
+                result TEXT,
+                cluster_id INTEGER,
+                cluster_size INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_inference_ts ON inference(ts, type, flagged, confidence);
+            CREATE INDEX IF NOT EXISTS idx_inference_type ON inference(type, ts);
+            CREATE INDEX IF NOT EXISTS idx_inference_flagged ON inference(flagged, ts);
+            CREATE INDEX IF NOT EXISTS idx_inference_confidence ON inference(confidence);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(inference)")}
+        if "cluster_id" not in columns:
+            # Index built before near-duplicate clustering: add the columns and re-sync from scratch.
+            self.conn.execute("ALTER TABLE inference ADD COLUMN cluster_id INTEGER")
+            self.conn.execute("ALTER TABLE inference ADD COLUMN cluster_size INTEGER")
+            self.conn.execute("DELETE FROM sync_state")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_inference_cluster ON inference(cluster_id)")
+        self.conn.commit()
+
+    def _state(self, key, default=0):
+        row = self.conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_state(self, **values):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO sync_state VALUES (?, ?)", list(values.items())
+        )
+
+    @staticmethod
+    def _row(record):
+        result = record.get("result") or {}
+        return (
+            record.get("file"),
+            record.get("type", "unknown"),
+            int(bool(result.get("flagged", False))),
+            float(result.get("confidence", 0.0)),
+            result.get("reason", ""),
+            _epoch(record.get("ingested_at")),
+            _epoch(record.get("published_at")),
+            json.dumps(result),
+            record.get("cluster_id"),
+            record.get("cluster_size"),
+        )
+
+    def sync(self) -> int:
+        """Ingest newly appended log lines. Returns the number of rows added."""
+        with self._lock:
+            if not self.log_path.exists():
+                return 0
+            stat = self.log_path.stat()
+            offset = self._state("log_offset")
+            if stat.st_ino != self._state("log_inode", None) or stat.st_size < offset:
+                # Log was rotated, truncated or rewritten (e.g. by a backfill): rebuild.
+                self.conn.execute("DELETE FROM inference")
+                offset = 0
+
+            added = 0
+            while True:
+                records, new_offset = tail_jsonl(self.log_path, offset, max_bytes=64 * 1024 * 1024)
+                if new_offset == offset:
+                    break
+                self.conn.executemany(
+                    "INSERT INTO inference (file, type, flagged, confidence, reason, ts, published_ts, result, "
+                    "cluster_id, cluster_size) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [self._row(r) for r in records]
+                )
+                added += len(records)
+                offset = new_offset
+                self._set_state(log_offset=offset, log_inode=stat.st_ino)
+                self.conn.commit()
+
+            self._set_state(log_offset=offset, log_inode=stat.st_ino)
+            self.conn.commit()
+            if added > 100_000:
+                self.conn.execute("ANALYZE")
+            return added
+
+    # --------- Queries ---------
+
+    @classmethod
+    def _where(cls, since=None, content_type=None, flagged_only=False, min_confidence=None,
+               collapse_duplicates=False):
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("ts >= ?")
+            if not isinstance(since, (int, float)):
+                # Naive timestamps are local time, matching how ingested_at is written.
+                since = pd.Timestamp(since).to_pydatetime().timestamp()
+            params.append(since)
+        if content_type and content_type != "All":
+            clauses.append("type = ?")
+            params.append(content_type)
+        if flagged_only:
+            clauses.append("flagged = 1")
+        if min_confidence is not None:
+            clauses.append("confidence >= ?")
+            params.append(min_confidence)
+        if collapse_duplicates:
+            # One row per near-duplicate cluster among the matches: its latest entry.
+            inner, inner_params = cls._where(since, content_type, flagged_only, min_confidence)
+            clauses.append(f"id IN (SELECT MAX(id) FROM inference{inner} GROUP BY COALESCE(cluster_id, -id))")
+            params += inner_params
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, **filters) -> int:
+        where, params = self._where(**filters)
+        return self.conn.execute(f"SELECT COUNT(*) FROM inference{where}", params).fetchone()[0]
+
+    def query(self, limit=None, offset=0, sort_by="time", descending=True, **filters) -> pd.DataFrame:
+        where, params = self._where(**filters)
+        order = f"{SORT_COLUMNS[sort_by]} {'DESC' if descending else 'ASC'}, id {'DESC' if descending else 'ASC'}"
+        sql = (f"SELECT id, file, type, flagged, confidence, reason, ts, published_ts, result, cluster_id, cluster_size "
+               f"FROM inference{where} ORDER BY {order}")
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+
+        df = pd.read_sql_query(sql, self.conn, params=params)
+        df["flagged"] = df["flagged"].astype(bool)
+        # ts came from naive local ISO strings, so convert back to naive local time.
+        local_tz = datetime.now().astimezone().tzinfo
+        df["datetime"] = pd.to_datetime(df["ts"], unit="s", utc=True).dt.tz_convert(local_tz).dt.tz_localize(None)
+        df["published_at"] = pd.to_datetime(df.pop("published_ts"), unit="s", utc=True)
+        df["result"] = df["result"].map(lambda x: json.loads(x) if x else {})
+        return df.drop(columns=["ts"])
+
+    def close(self):
+        self.conn.close()
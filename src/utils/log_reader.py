@@ -0,0 +1,131 @@
+# src/utils/log_reader.py
+
+import json
+import mmap
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+CONTENT_TYPES = pd.CategoricalDtype(["article", "tweet", "video_transcript", "unknown"])
+
+
+def tail_jsonl(path, offset=0, max_bytes=None):
+    """
+    Parse the complete lines appended to a JSONL file since `offset`, reading
+    at most `max_bytes`. Returns (records, new_offset); a trailing partial
+    line is left for next time.
+    """
+    size = os.path.getsize(path)
+    if size <= offset:
+        return [], offset
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        limit = size if max_bytes is None else min(size, offset + max_bytes)
+        end = mm.rfind(b"\n", offset, limit) + 1
+        if end <= offset:
+            return [], offset
+        chunk = mm[offset:end]
+
+    records = []
+    for line in chunk.splitlines():
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            print(f"[WARN] Skipping malformed log line in {path}")
+    return records, end
+
+
+def records_to_frame(records) -> pd.DataFrame:
+    """Flatten inference log records into typed columns in one pass (no per-row .apply)."""
+    results = [r.get("result") or {} for r in records]
+    types = pd.Series([r.get("type", "unknown") for r in records], dtype="object")
+    df = pd.DataFrame({
+        "file": [r.get("file") for r in records],
+        "type": types.where(types.isin(CONTENT_TYPES.categories), "unknown").astype(CONTENT_TYPES),
+        "confidence": pd.Series([res.get("confidence", 0.0) for res in results], dtype="float64"),
+        "flagged": pd.Series([bool(res.get("flagged", False)) for res in results], dtype="bool"),
+        "reason": [res.get("reason", "") for res in results],
+        "result": results,
+        # Timestamps are written with each log record; rows that predate that are NaT
+        # until scripts/backfill_log_timestamps.py has been run.
+        "datetime": pd.to_datetime([r.get("ingested_at") for r in records], errors="coerce"),
+        "published_at": pd.to_datetime([r.get("published_at") for r in records], errors="coerce", utc=True),
+        "cluster_id": pd.array([r.get("cluster_id") for r in records], dtype="Int64"),
+        "cluster_size": pd.array([r.get("cluster_size") for r in records], dtype="Int64"),
+    })
+    return df
+
+
+class InferenceLogReader:
+    """
+    Incremental reader for the append-only inference log.
+
+    Remembers the byte offset it has parsed up to; each refresh() memory-maps
+    the file and parses only the newly appended lines. Parsed rows live in a
+    preallocated frame that doubles when full, so new rows are written into
+    free capacity and the history is copied only O(log n) times rather than
+    on every refresh. `frame` is a slice of that buffer: copy it before
+    modifying it. If the log shrinks or is replaced, it starts over.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self.inode = None
+        self.rows = 0
+        self._buffer = records_to_frame([])
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        return self._buffer.iloc[:self.rows]
+
+    def _append(self, new: pd.DataFrame):
+        end = self.rows + len(new)
+        if end > len(self._buffer):
+            capacity = max(end, 2 * len(self._buffer))
+            # Padding repeats a real row, so every column keeps its dtype.
+            padding = new.iloc[np.zeros(capacity - end, dtype=int)]
+            self._buffer = pd.concat([self.frame, new, padding], ignore_index=True)
+        else:
+            for j in range(new.shape[1]):
+                self._buffer.iloc[self.rows:end, j] = new.iloc[:, j].array
+        self.rows = end
+
+    def refresh(self) -> pd.DataFrame:
+        with self._lock:
+            if not self.path.exists():
+                self._reset()
+                return self.frame
+
+            stat = self.path.stat()
+            if stat.st_ino != self.inode or stat.st_size < self.offset:
+                self._reset()
+                self.inode = stat.st_ino
+
+            records, self.offset = tail_jsonl(self.path, self.offset)
+            if records:
+                self._append(records_to_frame(records))
+            return self.frame
+
+
+_readers = {}
+_readers_lock = threading.Lock()
+
+def get_log_reader(path=None) -> InferenceLogReader:
+    """Shared reader per log file, so every caller benefits from the parsed tail."""
+    from src.config.paths import INFER_LOG_PATH
+
+    key = os.path.abspath(path or INFER_LOG_PATH)
+    with _readers_lock:
+        if key not in _readers:
+            _readers[key] = InferenceLogReader(key)
+        return _readers[key]
@@ -1,11 +1,62 @@
 # src/utils/metadata_utils.py
 
 import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from src.config.paths import RECORD_STORE_DIR, VECTOR_INDEX_DIR
+from src.utils.record_store import open_record_store
 
 
 def load_metadata_from_file(path):
+    """Load a record by legacy per-file path, or by record-store id."""
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        if RECORD_STORE_DIR.exists():
+            store = open_record_store(RECORD_STORE_DIR)
+            # Migrated per-file records are stored under their file name's stem.
+            return store.get(str(path)) or (str(path).endswith(".json") and store.get(Path(path).stem)) or {}
     except Exception:
-        return {}
+        pass
+    return {}
+
+
+@lru_cache(maxsize=2048)
+def _cached_preview(path, max_chars):
+    metadata = load_metadata_from_file(path)
+    if not metadata:
+        # Not stored yet; lru_cache doesn't cache exceptions, so the next call looks again.
+        raise LookupError(path)
+    return {
+        "text": (metadata.get("text") or "")[:max_chars],
+        "named_entities": tuple(metadata.get("named_entities") or [])[:10],
+        "url": metadata.get("url") or metadata.get("video_url"),
+    }
+
+
+def load_preview(path, max_chars=1000):
+    """
+    Just what a dashboard card shows: the start of the text, a few entities
+    and the source link. Cached per record, so reruns and page flips don't
+    re-read records that were already shown; each call gets its own copy.
+    """
+    try:
+        preview = _cached_preview(path, max_chars)
+    except LookupError:
+        return {"text": "", "named_entities": [], "url": None}
+    return dict(preview, named_entities=list(preview["named_entities"]))
+
+
+def find_similar(path, k=5):
+    """Top-k (record id, cosine score) neighbours from the vector index, or None if the record isn't indexed."""
+    if not (VECTOR_INDEX_DIR / "meta.json").exists():
+        return None
+    from src.utils.vector_index import open_vector_index
+
+    index = open_vector_index(VECTOR_INDEX_DIR)
+    if str(path) not in index:
+        return None
+    return index.similar_to(str(path), k)
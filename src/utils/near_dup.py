@@ -0,0 +1,220 @@
+# src/utils/near_dup.py
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .result_cache import normalize_text
+
+
+# Per-position multipliers for combining word hashes into k-gram hashes.
+_GRAM_MULTIPLIERS = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9,
+                              0x27D4EB2F165667C5, 0xFF51AFD7ED558CCD], dtype=np.uint64)
+
+
+def shingle_hashes(text: str, k: int = 3) -> np.ndarray:
+    """Hashes of the word k-grams of the normalized text (each word is hashed once); empty if it has no words."""
+    words = normalize_text(text or "").split()
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    words = np.fromiter((zlib.crc32(w.encode("utf-8")) for w in words), dtype=np.uint64, count=len(words))
+    k = max(1, min(k, len(words)))
+    n = len(words) - k + 1
+    grams = np.zeros(max(n, 1), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for j in range(k):
+            grams ^= words[j:j + n] * _GRAM_MULTIPLIERS[j % len(_GRAM_MULTIPLIERS)]
+    return np.unique(grams >> np.uint64(32))
+
+
+class MinHasher:
+    """MinHash signatures from `num_perm` multiply-shift hash functions over shingle hashes."""
+
+    def __init__(self, num_perm=64, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        # Odd multipliers keep the multiply-shift family universal.
+        self.a = rng.randint(1, 2 ** 63 - 1, size=num_perm, dtype=np.int64).astype(np.uint64) | np.uint64(1)
+        self.b = rng.randint(0, 2 ** 63 - 1, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def signatures(self, shingle_sets: List[np.ndarray]) -> np.ndarray:
+        """(n, num_perm) uint32 signatures for a batch, in one vectorized pass."""
+        lengths = np.array([len(s) for s in shingle_sets])
+        flat = np.concatenate(shingle_sets)
+        with np.errstate(over="ignore"):
+            hashed = (flat[None, :] * self.a[:, None] + self.b[:, None]) >> np.uint64(32)
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        return np.minimum.reduceat(hashed, starts, axis=1).T.astype(np.uint32)
+
+    def signature(self, shingles: np.ndarray) -> np.ndarray:
+        return self.signatures([shingles])[0]
+
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer
+    with np.errstate(over="ignore"):
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+def estimate_jaccard(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    return float(np.mean(sig_a == sig_b))
+
+
+class NearDupIndex:
+    """
+    Clusters near-identical texts as they arrive.
+
+    Each text gets a MinHash signature split into `bands` bands; every band
+    hashes to a 64-bit bucket key in SQLite that points at a cluster. A new
+    record looks up only its own band keys (an indexed lookup per band, so
+    insert cost does not grow with the corpus), checks the estimated Jaccard
+    similarity against the candidate cluster's representative signature, and
+    either joins that cluster or starts a new one. With the defaults (16
+    bands x 4 rows) texts above ~0.5 Jaccard over word 3-grams are likely
+    to collide, and `threshold` filters out the chance collisions.
+    """
+
+    def __init__(self, db_path, num_perm=64, bands=16, threshold=0.5, shingle_size=3, seed=1,
+                 cache_mb=256):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_perm, seed)
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # Bucket keys are random, so inserts touch random B-tree pages; keep plenty cached.
+        self.conn.execute(f"PRAGMA cache_size = -{cache_mb * 1024}")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS buckets (
+                band_key INTEGER PRIMARY KEY,
+                cluster_id INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS clusters (
+                cluster_id INTEGER PRIMARY KEY,
+                size INTEGER NOT NULL,
+                first_id TEXT,
+                signature BLOB NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS members (
+                record_id TEXT PRIMARY KEY,
+                cluster_id INTEGER NOT NULL
+            );
+        """)
+        self.conn.commit()
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.hasher.signature(shingle_hashes(text, self.shingle_size))
+
+    def band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """(n, bands) int64 bucket keys; the band number is mixed in so bands never share buckets."""
+        bands = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+        key = np.arange(self.bands, dtype=np.uint64)[None, :] + np.uint64(0x9E3779B97F4A7C15)
+        for r in range(self.rows):
+            key = _mix64(key ^ bands[:, :, r])
+        return key.view(np.int64)
+
+    def _assign(self, rid: str, signature: np.ndarray, keys: List[int], now: float) -> Tuple[int, int]:
+        candidates = self.conn.execute(
+            f"SELECT cluster_id, COUNT(*) AS hits FROM buckets WHERE band_key IN ({','.join('?' * len(keys))}) "
+            "GROUP BY cluster_id ORDER BY hits DESC LIMIT 3",
+            keys
+        ).fetchall()
+
+        for cluster_id, _ in candidates:
+            rep, size = self.conn.execute(
+                "SELECT signature, size FROM clusters WHERE cluster_id = ?", (cluster_id,)
+            ).fetchone()
+            if estimate_jaccard(signature, np.frombuffer(rep, dtype=np.uint32)) >= self.threshold:
+                self.conn.execute("UPDATE clusters SET size = size + 1 WHERE cluster_id = ?", (cluster_id,))
+                self.conn.execute("INSERT INTO members VALUES (?, ?)", (rid, cluster_id))
+                return cluster_id, size + 1
+
+        # New cluster. Only representatives are bucketed: members are matched
+        # against the representative anyway, and duplicates add no bucket rows.
+        cluster_id = self.conn.execute(
+            "INSERT INTO clusters (size, first_id, signature, created_at) VALUES (1, ?, ?, ?)",
+            (rid, signature.tobytes(), now)
+        ).lastrowid
+        self.conn.executemany("INSERT OR IGNORE INTO buckets VALUES (?, ?)", [(k, cluster_id) for k in keys])
+        self.conn.execute("INSERT INTO members VALUES (?, ?)", (rid, cluster_id))
+        return cluster_id, 1
+
+    def assign_many(self, items: Iterable[Tuple[str, str]]) -> List[Optional[Tuple[int, int]]]:
+        """
+        items: [(record_id, text)]. Returns [(cluster_id, cluster_size)] in one
+        transaction, or None for records without any words to compare.
+        """
+        items = [(str(rid), shingle_hashes(text, self.shingle_size)) for rid, text in items]
+        results = [None] * len(items)
+        todo = [i for i, (_, shingles) in enumerate(items) if len(shingles)]
+        if not todo:
+            return results
+        signatures = self.hasher.signatures([items[i][1] for i in todo])
+        keys = self.band_keys(signatures).tolist()
+        now = time.time()
+        with self._lock:
+            rids = [items[i][0] for i in todo]
+            # Re-saved records keep their cluster and aren't counted twice,
+            # including a record repeated within this batch.
+            known = set()
+            for i in range(0, len(rids), 500):
+                chunk = rids[i:i + 500]
+                known.update(row[0] for row in self.conn.execute(
+                    f"SELECT record_id FROM members WHERE record_id IN ({','.join('?' * len(chunk))})", chunk
+                ))
+            try:
+                for i, rid, sig, band_keys in zip(todo, rids, signatures, keys):
+                    if rid in known:
+                        results[i] = self.cluster_of(rid)
+                    else:
+                        results[i] = self._assign(rid, sig, band_keys, now)
+                        known.add(rid)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        return results
+
+    def assign(self, rid: str, text: str) -> Optional[Tuple[int, int]]:
+        return self.assign_many([(rid, text)])[0]
+
+    def cluster_of(self, rid: str) -> Optional[Tuple[int, int]]:
+        return self.conn.execute(
+            "SELECT m.cluster_id, c.size FROM members m JOIN clusters c USING (cluster_id) WHERE m.record_id = ?",
+            (str(rid),)
+        ).fetchone()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM members").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def open_near_dup_index(path) -> NearDupIndex:
+    """One NearDupIndex per database per process."""
+    key = os.path.abspath(path)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = NearDupIndex(key)
+        return _indexes[key]
@@ -0,0 +1,254 @@
+# src/utils/record_store.py
+
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+SHARD_PATTERN = "shard-{:06d}.jsonl.gz"
+
+
+def record_id(metadata: dict) -> str:
+    """Stable id for a metadata record: platform id if there is one, else a hash of its URL."""
+    uid = metadata.get("video_id") or metadata.get("tweet_id")
+    if uid:
+        return str(uid)
+    url = metadata.get("url") or metadata.get("video_url")
+    if url:
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()[:20]
+    return str(uuid.uuid4())
+
+
+class RecordStore:
+    """
+    Append-only store of metadata records in rotating gzip JSONL shards.
+
+    Every record is written as its own gzip member, so a shard is still a
+    valid .jsonl.gz file for zcat/pandas while any single record can be read
+    back with one seek. A SQLite index maps record id -> (shard, offset,
+    length); re-appending an id supersedes the earlier copy. When a shard
+    reaches `shard_max_bytes` it is sealed and, if pyarrow is available, a
+    Parquet copy is written next to it for fast columnar scans.
+    """
+
+    def __init__(self, root, shard_max_bytes=64 * 1024 * 1024):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.shard_max_bytes = shard_max_bytes
+        self._lock = threading.Lock()
+        self._lock_path = self.root / ".lock"
+
+        self.conn = sqlite3.connect(str(self.root / "index.sqlite"), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS records (
+                id TEXT PRIMARY KEY,
+                type TEXT,
+                shard INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                ingested_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_records_position ON records(shard, offset);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO meta VALUES ('active_shard', 1);
+        """)
+        self.conn.commit()
+
+    def _shard_path(self, shard: int) -> Path:
+        return self.root / SHARD_PATTERN.format(shard)
+
+    def _parquet_path(self, shard: int) -> Path:
+        return self._shard_path(shard).with_suffix("").with_suffix(".parquet")
+
+    @contextmanager
+    def _write_lock(self):
+        # Thread lock for this process, flock for other processes sharing the directory.
+        with self._lock, open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _active_shard(self) -> int:
+        return self.conn.execute("SELECT value FROM meta WHERE key = 'active_shard'").fetchone()[0]
+
+    # --------- Writes ---------
+
+    def append(self, rid: str, record: dict) -> str:
+        self.append_many([(rid, record)])
+        return rid
+
+    def append_many(self, items: Iterable[Tuple[str, dict]]) -> int:
+        """Append (id, record) pairs in one file write and one index transaction."""
+        items = list(items)
+        if not items:
+            return 0
+        now = time.time()
+        with self._write_lock():
+            shard = self._active_shard()
+            path = self._shard_path(shard)
+            if path.exists() and path.stat().st_size >= self.shard_max_bytes:
+                self._seal(shard)
+                shard += 1
+                self.conn.execute("UPDATE meta SET value = ? WHERE key = 'active_shard'", (shard,))
+                path = self._shard_path(shard)
+
+            rows, blobs = [], []
+            offset = path.stat().st_size if path.exists() else 0
+            for rid, record in items:
+                line = json.dumps(record, ensure_ascii=False) + "\n"
+                blob = gzip.compress(line.encode("utf-8"), compresslevel=6)
+                rows.append((rid, record.get("type"), shard, offset, len(blob), now))
+                blobs.append(blob)
+                offset += len(blob)
+
+            with open(path, "ab") as f:
+                f.write(b"".join(blobs))
+                f.flush()
+                os.fsync(f.fileno())
+            self.conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self.conn.commit()
+        return len(items)
+
+    def _seal(self, shard: int):
+        # The Parquet copy is only an accelerator: if it can't be written, scans
+        # read the JSONL shard, and the store keeps accepting writes either way.
+        path = self._parquet_path(shard)
+        tmp_path = path.with_suffix(".parquet.tmp")
+        try:
+            records = [dict(record, id=rid) for rid, record in self._iter_shard(shard)]
+            pd.DataFrame(records).to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except ImportError:
+            pass  # No pyarrow: scans fall back to the JSONL shard.
+        except Exception as e:
+            # e.g. a column mixing ints and strings that pyarrow can't convert.
+            print(f"[WARN] No Parquet copy for shard {shard}, scans will read its JSONL: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    # --------- Reads ---------
+
+    def _read(self, shard: int, offset: int, length: int, f=None) -> dict:
+        if f is None:
+            with open(self._shard_path(shard), "rb") as f:
+                return self._read(shard, offset, length, f)
+        f.seek(offset)
+        return json.loads(gzip.decompress(f.read(length)))
+
+    def get(self, rid: str) -> Optional[dict]:
+        row = self.conn.execute(
+            "SELECT shard, offset, length FROM records WHERE id = ?", (rid,)
+        ).fetchone()
+        return self._read(*row) if row else None
+
+    def get_many(self, rids: List[str]) -> dict:
+        found = {}
+        for i in range(0, len(rids), 500):
+            chunk = rids[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT id, shard, offset, length FROM records WHERE id IN ({','.join('?' * len(chunk))}) "
+                "ORDER BY shard, offset",
+                chunk
+            ).fetchall()
+            for rid, shard, offset, length in rows:
+                found[rid] = self._read(shard, offset, length)
+        return found
+
+    def ingested_at(self, rid: str) -> Optional[float]:
+        row = self.conn.execute("SELECT ingested_at FROM records WHERE id = ?", (rid,)).fetchone()
+        return row[0] if row else None
+
+    def __contains__(self, rid: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM records WHERE id = ?", (rid,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def _iter_shard(self, shard: int, types: Optional[List[str]] = None) -> Iterator[Tuple[str, dict]]:
+        query = "SELECT id, offset, length FROM records WHERE shard = ?"
+        params = [shard]
+        if types is not None:
+            query += f" AND type IN ({','.join('?' * len(types))})"
+            params += list(types)
+        rows = self.conn.execute(query + " ORDER BY offset", params).fetchall()
+        with open(self._shard_path(shard), "rb") as f:
+            for rid, offset, length in rows:
+                yield rid, self._read(shard, offset, length, f)
+
+    def shards(self) -> List[int]:
+        return [row[0] for row in self.conn.execute("SELECT DISTINCT shard FROM records ORDER BY shard")]
+
+    def iter_records(self, types: Optional[List[str]] = None) -> Iterator[Tuple[str, dict]]:
+        """Stream live (id, record) pairs in write order with sequential reads."""
+        for shard in self.shards():
+            yield from self._iter_shard(shard, types)
+
+    def _scan_parquet(self, shard: int, columns: Optional[List[str]]) -> Optional[pd.DataFrame]:
+        path = self._parquet_path(shard)
+        if not path.exists():
+            return None
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            return None
+        if columns:
+            available = set(pq.read_schema(path).names)
+            columns = [c for c in columns if c in available]
+        return pd.read_parquet(path, columns=columns)
+
+    def scan(self, columns: Optional[List[str]] = None, types: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Columnar read of every live record. Sealed shards are read from their
+        Parquet copy, projecting only the requested columns; the active shard
+        is read from JSONL.
+        """
+        wanted = list(dict.fromkeys(["id", "type"] + columns)) if columns else None
+        frames = []
+        for shard in self.shards():
+            live = {row[0] for row in self.conn.execute("SELECT id FROM records WHERE shard = ?", (shard,))}
+            frame = self._scan_parquet(shard, wanted)
+            if frame is None:
+                records = (dict(record, id=rid) for rid, record in self._iter_shard(shard, types))
+                if wanted:
+                    records = ({k: r.get(k) for k in wanted} for r in records)
+                frame = pd.DataFrame(list(records))
+            # Sealed Parquet copies can hold records superseded by a later append.
+            frames.append(frame[frame["id"].isin(live)] if len(frame) else frame)
+
+        if not frames:
+            return pd.DataFrame(columns=wanted or ["id", "type"])
+        df = pd.concat(frames, ignore_index=True)
+        if types is not None:
+            df = df[df["type"].isin(types)]
+        return df.reset_index(drop=True)
+
+    def close(self):
+        self.conn.close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def open_record_store(root) -> RecordStore:
+    """One RecordStore per directory per process."""
+    key = os.path.abspath(root)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = RecordStore(key)
+        return _stores[key]
@@ -0,0 +1,201 @@
+# src/utils/result_cache.py
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(text: str) -> str:
+    """Case-fold, NFKC-normalize and collapse whitespace so retweets/syndicated copies hash alike."""
+    text = unicodedata.normalize("NFKC", text or "")
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Inference results keyed by (normalized-text hash, model version).
+
+    An in-process LRU sits in front of a SQLite file so repeated texts skip
+    both the model and the disk. The SQLite table is capped at `max_entries`
+    rows; the least recently used rows are evicted once it grows past that.
+    Hits, including those answered from memory, refresh a row's last_access
+    in batches. Hit/miss counters and the model time saved are persisted
+    alongside.
+    """
+
+    FLUSH_EVERY = 100
+
+    def __init__(self, db_path, model_version, max_entries=1_000_000, lru_size=10_000):
+        self.db_path = Path(db_path)
+        self.model_version = model_version
+        self.max_entries = max_entries
+        self.lru_size = lru_size
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = {"hits": 0, "misses": 0, "saved_seconds": 0.0}
+        self._touched = {}
+        self._ops = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS results (
+                text_hash TEXT NOT NULL,
+                model_version TEXT NOT NULL,
+                result TEXT NOT NULL,
+                compute_seconds REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (text_hash, model_version)
+            );
+            CREATE INDEX IF NOT EXISTS idx_results_last_access ON results(last_access);
+            CREATE TABLE IF NOT EXISTS stats (
+                name TEXT PRIMARY KEY,
+                value REAL NOT NULL
+            );
+        """)
+        self.conn.commit()
+
+    # --------- Lookup ---------
+
+    def _lru_get(self, key):
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            return self._lru[key]
+        return None
+
+    def _lru_put(self, key, value):
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get(self, text):
+        key = content_hash(text)
+        with self._lock:
+            entry = self._lru_get(key)
+            if entry is None:
+                row = self.conn.execute(
+                    "SELECT result, compute_seconds FROM results WHERE text_hash = ? AND model_version = ?",
+                    (key, self.model_version)
+                ).fetchone()
+                if row is not None:
+                    entry = (json.loads(row[0]), row[1])
+                    self._lru_put(key, entry)
+            if entry is not None:
+                self._touched[key] = time.time()
+            self._record(hit=entry is not None, saved=entry[1] if entry else 0.0)
+        return entry[0] if entry else None
+
+    def put(self, text, result, compute_seconds=0.0):
+        key = content_hash(text)
+        with self._lock:
+            self._lru_put(key, (result, compute_seconds))
+            self._touched.pop(key, None)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (key, self.model_version, json.dumps(result), compute_seconds, time.time())
+            )
+            self._ops += 1
+            if self._ops % self.FLUSH_EVERY == 0:
+                self._evict()
+                self._flush()
+
+    def get_or_compute(self, text, compute):
+        """Return (result, hit). On a miss `compute()` runs and its result is stored."""
+        result = self.get(text)
+        if result is not None:
+            return result, True
+        start = time.perf_counter()
+        result = compute()
+        self.put(text, result, time.perf_counter() - start)
+        return result, False
+
+    def set_model_version(self, model_version):
+        """Answer from `model_version` from now on; the old version's results stay on disk until evicted."""
+        with self._lock:
+            if model_version == self.model_version:
+                return
+            self._write_touches()
+            self._lru.clear()
+            self.model_version = model_version
+
+    # --------- Bookkeeping ---------
+
+    def _record(self, hit, saved):
+        self._pending["hits" if hit else "misses"] += 1
+        self._pending["saved_seconds"] += saved
+        self._ops += 1
+        if self._ops % self.FLUSH_EVERY == 0:
+            self._flush()
+
+    def _write_touches(self):
+        if self._touched:
+            self.conn.executemany(
+                "UPDATE results SET last_access = ? WHERE text_hash = ? AND model_version = ?",
+                [(ts, key, self.model_version) for key, ts in self._touched.items()]
+            )
+            self._touched = {}
+
+    def _flush(self):
+        self._write_touches()
+        self.conn.executemany(
+            "INSERT INTO stats VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            list(self._pending.items())
+        )
+        self.conn.commit()
+        self._pending = {name: 0 for name in self._pending}
+
+    def _evict(self):
+        self._write_touches()
+        count = self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            # Evict a little extra so we aren't evicting on every flush.
+            excess += self.max_entries // 10
+            self.conn.execute(
+                "DELETE FROM results WHERE rowid IN "
+                "(SELECT rowid FROM results ORDER BY last_access LIMIT ?)",
+                (excess,)
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._flush()
+        return read_cache_stats(self.db_path)
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self.conn.close()
+
+
+def read_cache_stats(db_path) -> dict:
+    """Persisted counters for a cache file, readable without knowing the model version."""
+    stats = {"hits": 0, "misses": 0, "saved_seconds": 0.0, "entries": 0, "hit_rate": 0.0}
+    if not os.path.exists(db_path):
+        return stats
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    try:
+        for name, value in conn.execute("SELECT name, value FROM stats"):
+            stats[name] = value
+        stats["entries"] = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+    except sqlite3.OperationalError:
+        pass
+    finally:
+        conn.close()
+    total = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / total if total else 0.0
+    return stats
@@ -0,0 +1,197 @@
+# src/utils/review_queue.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from .label_store import LabelStore
+
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_LEASE = 15 * 60
+
+
+class ReviewQueue:
+    """
+    Persistent priority queue of records awaiting manual review.
+
+    Keyed by record id, so re-queuing an item just refreshes its score and
+    expiry. Items are served highest-uncertainty first through a B-tree
+    index on priority. Reviewers claim items under a lease, so several of
+    them can work the queue at once; unfinished claims return to the queue
+    when the lease runs out. If `labels_path` is given, the label store is
+    attached and labeled ids are never handed out.
+    """
+
+    def __init__(self, db_path, labels_path=None, ttl=DEFAULT_TTL):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False,
+                                    isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS queue (
+                id TEXT PRIMARY KEY,
+                priority REAL NOT NULL,
+                text TEXT,
+                payload TEXT,
+                enqueued_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                claimed_by TEXT,
+                claimed_until REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_queue_priority ON queue(priority DESC);
+            CREATE INDEX IF NOT EXISTS idx_queue_expires ON queue(expires_at);
+        """)
+
+        self.labels_attached = labels_path is not None
+        if self.labels_attached:
+            LabelStore(labels_path).close()  # make sure the labels table exists
+            self.conn.execute("ATTACH DATABASE ? AS labels", (str(labels_path),))
+
+    def _unlabeled(self):
+        if not self.labels_attached:
+            return ""
+        return " AND NOT EXISTS (SELECT 1 FROM labels.labels l WHERE l.id = queue.id)"
+
+    @staticmethod
+    def _item(row) -> dict:
+        rid, priority, text, payload, claimed_by, claimed_until = row
+        item = json.loads(payload) if payload else {}
+        item.update({"file": rid, "uncertainty": priority, "text": text,
+                     "claimed_by": claimed_by, "claimed_until": claimed_until})
+        return item
+
+    # --------- Writes ---------
+
+    def push_many(self, entries: Iterable[dict], ttl: Optional[float] = None) -> int:
+        """
+        Queue entries shaped like {"file", "uncertainty", "text", ...}. Ids that
+        are already queued get the new score and a fresh expiry; labeled ids
+        are dropped. Returns the number of entries now queued from this call.
+        """
+        now = time.time()
+        expires = now + (ttl or self.ttl)
+        rows = []
+        for entry in entries:
+            extra = {k: v for k, v in entry.items() if k not in ("file", "uncertainty", "text")}
+            rows.append((str(entry["file"]), float(entry["uncertainty"]), entry.get("text"),
+                         json.dumps(extra) if extra else None, now, expires))
+        if not rows:
+            return 0
+
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany("""
+                    INSERT INTO queue (id, priority, text, payload, enqueued_at, expires_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        priority = excluded.priority,
+                        text = excluded.text,
+                        payload = excluded.payload,
+                        expires_at = excluded.expires_at
+                """, rows)
+                dropped = self._purge_labeled()
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return len(rows) - dropped
+
+    def claim_next(self, k: int, reviewer: str, lease: float = DEFAULT_LEASE) -> List[dict]:
+        """Atomically hand the top-k unclaimed, unexpired, unlabeled items to `reviewer`."""
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self.conn.execute(f"""
+                    SELECT id FROM queue
+                    WHERE expires_at > ? AND (claimed_until IS NULL OR claimed_until < ?){self._unlabeled()}
+                    ORDER BY priority DESC LIMIT ?
+                """, (now, now, k)).fetchall()
+                ids = [row[0] for row in rows]
+                self.conn.executemany(
+                    "UPDATE queue SET claimed_by = ?, claimed_until = ? WHERE id = ?",
+                    [(reviewer, now + lease, rid) for rid in ids]
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return self.claimed(reviewer)
+
+    def release(self, rid: str):
+        with self._lock:
+            self.conn.execute("UPDATE queue SET claimed_by = NULL, claimed_until = NULL WHERE id = ?", (rid,))
+
+    def complete(self, rid: str):
+        with self._lock:
+            self.conn.execute("DELETE FROM queue WHERE id = ?", (str(rid),))
+
+    def _purge_labeled(self) -> int:
+        if not self.labels_attached:
+            return 0
+        cur = self.conn.execute("DELETE FROM queue WHERE id IN (SELECT id FROM labels.labels)")
+        return cur.rowcount
+
+    def purge(self) -> int:
+        """Drop expired and already-labeled entries."""
+        with self._lock:
+            removed = self.conn.execute("DELETE FROM queue WHERE expires_at <= ?", (time.time(),)).rowcount
+            return removed + self._purge_labeled()
+
+    # --------- Reads ---------
+
+    def claimed(self, reviewer: str) -> List[dict]:
+        rows = self.conn.execute(f"""
+            SELECT id, priority, text, payload, claimed_by, claimed_until FROM queue
+            WHERE claimed_by = ? AND claimed_until >= ?{self._unlabeled()}
+            ORDER BY priority DESC
+        """, (reviewer, time.time())).fetchall()
+        return [self._item(row) for row in rows]
+
+    def page(self, limit: int = 25, offset: int = 0) -> List[dict]:
+        """Live entries by descending priority, one page at a time."""
+        rows = self.conn.execute(f"""
+            SELECT id, priority, text, payload, claimed_by, claimed_until FROM queue
+            WHERE expires_at > ?{self._unlabeled()}
+            ORDER BY priority DESC LIMIT ? OFFSET ?
+        """, (time.time(), limit, offset)).fetchall()
+        return [self._item(row) for row in rows]
+
+    def __len__(self) -> int:
+        return self.conn.execute(
+            f"SELECT COUNT(*) FROM queue WHERE expires_at > ?{self._unlabeled()}", (time.time(),)
+        ).fetchone()[0]
+
+    def import_jsonl(self, path) -> int:
+        """Load a legacy review_queue.jsonl; duplicate ids collapse to their last score."""
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        return self.push_many(entries)
+
+    def close(self):
+        self.conn.close()
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+def open_review_queue(path=None, labels_path=None) -> ReviewQueue:
+    """One ReviewQueue per database per process, filtered against the shared label store."""
+    from src.config.paths import LABEL_STORE_PATH, REVIEW_QUEUE_DB_PATH
+
+    key = os.path.abspath(path or REVIEW_QUEUE_DB_PATH)
+    with _queues_lock:
+        if key not in _queues:
+            _queues[key] = ReviewQueue(key, labels_path=labels_path or LABEL_STORE_PATH)
+        return _queues[key]
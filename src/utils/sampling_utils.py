@@ -1,4 +1,147 @@
+import heapq
+import itertools
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
 import numpy as np
 
 def entropy(probabilities):
     return -np.sum(probabilities * np.log(probabilities + 1e-9), axis=1)
+
+def margin(probabilities):
+    """Higher when the top two classes are close (1 - (p1 - p2))."""
+    top2 = np.sort(probabilities, axis=1)[:, -2:]
+    return 1.0 - (top2[:, 1] - top2[:, 0])
+
+def least_confidence(probabilities):
+    return 1.0 - np.max(probabilities, axis=1)
+
+UNCERTAINTY_FUNCTIONS = {
+    "entropy": entropy,
+    "margin": margin,
+    "least_confidence": least_confidence,
+}
+
+
+class TopK:
+    """The k highest-scoring items seen so far, in a bounded min-heap."""
+
+    def __init__(self, k):
+        self.k = k
+        self._heap = []
+        self._seq = itertools.count()
+
+    def threshold(self) -> float:
+        return self._heap[0][0] if len(self._heap) >= self.k else -np.inf
+
+    def push_many(self, scores, items):
+        scores = np.asarray(scores, dtype=float)
+        # Only items that beat the current k-th best can enter, so most batches cost one comparison.
+        for i in np.flatnonzero(scores > self.threshold()):
+            entry = (float(scores[i]), next(self._seq), items[i])
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, entry)
+            elif entry[0] > self._heap[0][0]:
+                heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List[Tuple[float, object]]:
+        """(score, item) pairs, highest score first."""
+        return [(score, item) for score, _, item in sorted(self._heap, key=lambda e: (-e[0], e[1]))]
+
+    def __len__(self):
+        return len(self._heap)
+
+
+def _batches(iterable, size) -> Iterator[list]:
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def select_uncertain(records: Iterable[Tuple[str, dict]], predict_proba: Callable, k: int,
+                     strategy="entropy", batch_size=64, cache=None, stats: Optional[dict] = None):
+    """
+    Stream (id, record) pairs through `predict_proba` in fixed-size batches
+    and keep the `k` most uncertain. Memory is bounded by one batch plus the
+    heap, whatever the pool size. With a ScoreCache, records scored recently
+    under the same model version reuse their stored score instead of going
+    through the model. Returns [(score, (id, record))], most uncertain first.
+    """
+    score_fn = UNCERTAINTY_FUNCTIONS[strategy]
+    top = TopK(k)
+    stats = stats if stats is not None else {}
+    stats.update(scored=0, cached=0)
+    for batch in _batches(records, batch_size):
+        cached = cache.get_many([rid for rid, _ in batch]) if cache is not None else {}
+        misses = [item for item in batch if item[0] not in cached]
+        if cached:
+            hits = [item for item in batch if item[0] in cached]
+            top.push_many([cached[rid] for rid, _ in hits], hits)
+            stats["cached"] += len(hits)
+        if misses:
+            scores = score_fn(np.asarray(predict_proba([record.get("text") or "" for _, record in misses])))
+            top.push_many(scores, misses)
+            if cache is not None:
+                cache.put_many(zip((rid for rid, _ in misses), scores.tolist()))
+            stats["scored"] += len(misses)
+    return top.items()
+
+def k_center_greedy(embeddings, k: int, initial: Optional[List[int]] = None, chunk_size=65536) -> List[int]:
+    """
+    Greedy k-center selection: repeatedly take the point farthest from
+    everything chosen so far, so near-duplicates are never picked twice.
+    Starts from `initial` (default: row 0, e.g. the most uncertain item).
+    Works on any (n, d) array including a memmap, reading it in chunks; each
+    step is one matrix-vector product, so k steps cost O(k * n * d).
+    Returns fewer than k indices if the remaining points all coincide with
+    a chosen one.
+    """
+    n = len(embeddings)
+    if n == 0 or k <= 0:
+        return []
+    sq_norms = np.empty(n, dtype=np.float32)
+    for start in range(0, n, chunk_size):
+        block = np.asarray(embeddings[start:start + chunk_size], dtype=np.float32)
+        sq_norms[start:start + len(block)] = np.einsum("ij,ij->i", block, block)
+    min_dist = np.full(n, np.inf, dtype=np.float32)
+
+    def add_center(c):
+        center = np.asarray(embeddings[c], dtype=np.float32)
+        for start in range(0, n, chunk_size):
+            block = np.asarray(embeddings[start:start + chunk_size], dtype=np.float32)
+            dist = sq_norms[start:start + len(block)] - 2 * (block @ center) + sq_norms[c]
+            np.minimum(min_dist[start:start + len(block)], dist, out=min_dist[start:start + len(block)])
+        min_dist[c] = 0.0
+
+    selected = []
+    for c in initial or []:
+        add_center(c)
+    if not initial:
+        add_center(0)
+        selected.append(0)
+    while len(selected) < k:
+        c = int(np.argmax(min_dist))
+        if min_dist[c] <= 1e-6:
+            break
+        add_center(c)
+        selected.append(c)
+    return selected
+
+def select_diverse(candidates, k: int, embedding_cache, embed: Callable, batch_size=64):
+    """
+    Narrow select_uncertain() output (most uncertain first) to `k` items that
+    are spread out in embedding space, via k-center greedy on the cached
+    embeddings (cosine geometry). Candidates without a cached embedding are
+    embedded in batches and cached.
+    """
+    texts = [record.get("text") or "" for _, (_, record) in candidates]
+    rows = embedding_cache.rows(texts)
+    missing = np.flatnonzero(rows < 0)
+    for start in range(0, len(missing), batch_size):
+        chunk = missing[start:start + batch_size]
+        batch = [texts[i] for i in chunk]
+        rows[chunk] = embedding_cache.add_many(batch, embed(batch))
+    vectors = np.asarray(embedding_cache.vectors[rows], dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-9
+    return [candidates[i] for i in k_center_greedy(vectors, k)]
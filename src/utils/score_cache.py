@@ -0,0 +1,69 @@
+# src/utils/score_cache.py
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+
+class ScoreCache:
+    """
+    Uncertainty scores per (record id, model version), in SQLite.
+
+    Lets an active-learning round skip re-running the model over records it
+    already scored with the same checkpoint within `max_age` seconds. Rows
+    for other model versions are dropped by purge_other_versions().
+    """
+
+    def __init__(self, db_path, model_version, max_age=24 * 3600):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.model_version = model_version
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS scores (
+                id TEXT NOT NULL,
+                model_version TEXT NOT NULL,
+                score REAL NOT NULL,
+                scored_at REAL NOT NULL,
+                PRIMARY KEY (id, model_version)
+            );
+        """)
+        self.conn.commit()
+
+    def get_many(self, rids: List[str]) -> Dict[str, float]:
+        """Fresh scores for whichever of `rids` have one under this model version."""
+        found = {}
+        cutoff = time.time() - self.max_age
+        for i in range(0, len(rids), 500):
+            chunk = [str(rid) for rid in rids[i:i + 500]]
+            found.update(self.conn.execute(
+                f"SELECT id, score FROM scores WHERE model_version = ? AND scored_at >= ? "
+                f"AND id IN ({','.join('?' * len(chunk))})",
+                [self.model_version, cutoff] + chunk
+            ))
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, float]]):
+        now = time.time()
+        rows = [(str(rid), self.model_version, float(score), now) for rid, score in items]
+        with self._lock:
+            self.conn.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)", rows)
+            self.conn.commit()
+
+    def purge_other_versions(self) -> int:
+        with self._lock:
+            removed = self.conn.execute(
+                "DELETE FROM scores WHERE model_version != ?", (self.model_version,)
+            ).rowcount
+            self.conn.commit()
+        return removed
+
+    def close(self):
+        self.conn.close()
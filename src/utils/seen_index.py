@@ -0,0 +1,224 @@
+# src/utils/seen_index.py
+
+import fcntl
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+
+RECORD = struct.Struct("<Qd")  # url hash, time seen
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "cmpid", "_ga", "spm", "share", "smid",
+}
+
+
+def canonicalize_url(url: str) -> str:
+    """Collapse the usual variants of one article URL: scheme, www., ports, tracking params, fragments, trailing slash."""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def url_hash(url: str) -> int:
+    return int.from_bytes(hashlib.blake2b(canonicalize_url(url).encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class SeenIndex:
+    """
+    Seen-URL set for the realtime monitor, shareable between processes.
+
+    Every URL is canonicalized and reduced to a 64-bit hash. Hashes are
+    appended with their timestamp to a fixed-width log file under an
+    exclusive flock, so several monitors can share one index; each process
+    picks up the others' appends from where it last read. In memory the
+    index is a sorted numpy array (16 bytes per URL) plus a small dict of
+    recent additions, fronted by a bloom filter that answers most lookups of
+    new URLs without touching either. Entries older than `ttl` count as
+    unseen and are dropped from the file by compact().
+    """
+
+    MERGE_EVERY = 50_000
+
+    def __init__(self, path, ttl=30 * 24 * 3600, bloom_bits=2 ** 24, bloom_hashes=7):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+        self.ttl = ttl
+        self.bloom_bits = bloom_bits
+        self.bloom_hashes = bloom_hashes
+        self._lock = threading.Lock()
+        self._load()
+
+    # --------- In-memory state ---------
+
+    def _reset(self):
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._ts = np.empty(0, dtype=np.float64)
+        self._recent = {}
+        self._bloom = np.zeros(self.bloom_bits // 8, dtype=np.uint8)
+        self._offset = 0
+        self._inode = None
+
+    def _bloom_positions(self, hashes: np.ndarray) -> np.ndarray:
+        # Double hashing: position_i = h1 + i * h2 (mod m).
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        i = np.arange(self.bloom_hashes, dtype=np.uint64)
+        return ((h1[:, None] + i[None, :] * h2[:, None]) % np.uint64(self.bloom_bits)).astype(np.int64)
+
+    def _bloom_add(self, hashes: np.ndarray):
+        pos = self._bloom_positions(hashes).ravel()
+        np.bitwise_or.at(self._bloom, pos >> 3, (1 << (pos & 7)).astype(np.uint8))
+
+    def _bloom_maybe(self, h: int) -> bool:
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        bloom = self._bloom
+        for i in range(self.bloom_hashes):
+            pos = (h1 + i * h2) % self.bloom_bits
+            if not bloom[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def _ingest(self, data: bytes):
+        if not data:
+            return
+        records = np.frombuffer(data, dtype=[("h", "<u8"), ("ts", "<f8")])
+        self._bloom_add(records["h"])
+        for h, ts in zip(records["h"].tolist(), records["ts"].tolist()):
+            self._recent[h] = max(ts, self._recent.get(h, 0.0))
+        if len(self._recent) >= self.MERGE_EVERY:
+            self._merge()
+
+    def _merge(self):
+        if not self._recent:
+            return
+        hashes = np.concatenate([self._hashes, np.fromiter(self._recent.keys(), dtype=np.uint64, count=len(self._recent))])
+        ts = np.concatenate([self._ts, np.fromiter(self._recent.values(), dtype=np.float64, count=len(self._recent))])
+        # Keep the newest timestamp per hash.
+        order = np.lexsort((-ts, hashes))
+        hashes, ts = hashes[order], ts[order]
+        keep = np.ones(len(hashes), dtype=bool)
+        keep[1:] = hashes[1:] != hashes[:-1]
+        self._hashes, self._ts = hashes[keep], ts[keep]
+        self._recent = {}
+
+    def _load(self):
+        self._reset()
+        self._refresh()
+        self._merge()
+
+    def _refresh(self):
+        """Pick up records appended by any process since the last read."""
+        stat = self.path.stat()
+        if self._inode is not None and (stat.st_ino != self._inode or stat.st_size < self._offset):
+            # Compacted by another process.
+            self._reset()
+        self._inode = stat.st_ino
+        end = stat.st_size - stat.st_size % RECORD.size
+        if end <= self._offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(end - self._offset)
+        self._offset = end
+        self._ingest(data)
+
+    def _last_seen(self, h: int):
+        if h in self._recent:
+            return self._recent[h]
+        i = np.searchsorted(self._hashes, np.uint64(h))
+        if i < len(self._hashes) and self._hashes[i] == h:
+            return float(self._ts[i])
+        return None
+
+    # --------- Public API ---------
+
+    def contains(self, url: str) -> bool:
+        h = url_hash(url)
+        with self._lock:
+            self._refresh()
+            if not self._bloom_maybe(h):
+                return False
+            ts = self._last_seen(h)
+        return ts is not None and ts >= time.time() - self.ttl
+
+    __contains__ = contains
+
+    def add(self, url: str):
+        self.add_many([url])
+
+    def add_many(self, urls):
+        now = time.time()
+        hashes = [url_hash(u) for u in urls]
+        if not hashes:
+            return
+        data = b"".join(RECORD.pack(h, now) for h in hashes)
+        with self._lock:
+            while True:
+                with open(self.path, "ab") as f:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                    try:
+                        # A compaction may have swapped the file while we waited for the lock.
+                        if os.fstat(f.fileno()).st_ino != os.stat(self.path).st_ino:
+                            continue
+                        f.write(data)
+                        f.flush()
+                        break
+                    finally:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+            # Reading back from our last offset also ingests anything other processes wrote meanwhile.
+            self._refresh()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            self._merge()
+            return int(np.count_nonzero(self._ts >= time.time() - self.ttl))
+
+    def compact(self) -> int:
+        """Rewrite the log with one live record per URL, dropping expired ones. Returns records kept."""
+        with self._lock, open(self.path, "ab") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                self._merge()
+                live = self._ts >= time.time() - self.ttl
+                records = np.empty(int(live.sum()), dtype=[("h", "<u8"), ("ts", "<f8")])
+                records["h"], records["ts"] = self._hashes[live], self._ts[live]
+
+                tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+                with open(tmp_path, "wb") as f:
+                    f.write(records.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            self._load()
+            return len(records)
+
+    def import_json(self, path) -> int:
+        """Load a legacy rss_seen.json list of URLs."""
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r") as f:
+            urls = json.load(f)
+        self.add_many(urls)
+        return len(urls)
@@ -0,0 +1,182 @@
+# src/utils/stream_buffer.py
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+
+class StreamBuffer:
+    """
+    Bounded hand-off between a streaming callback and batch workers.
+
+    put() never blocks: items go to an in-memory queue of `max_items`; when
+    that is full they spill to a SQLite-backed overflow queue (if
+    `spill_path` is set and it holds fewer than `max_spill` items), and
+    otherwise are dropped and counted. Until the spill is drained, new items
+    go to it as well, so they stay behind the older spilled ones. A batch
+    whose processing failed can be handed back with requeue(), which puts it
+    at the head of the spill. Workers call get_batch(), which
+    drains memory first and refills from the spill file once memory runs
+    low, oldest spilled items first.
+    """
+
+    def __init__(self, max_items=10000, spill_path=None, max_spill=1_000_000):
+        self.max_items = max_items
+        self.max_spill = max_spill
+        self._memory = queue.Queue(max_items)
+        self._lock = threading.Lock()
+        self._counts = {"enqueued": 0, "processed": 0, "spilled": 0, "dropped": 0, "requeued": 0, "batches": 0}
+        self._lag = {"last": 0.0, "max": 0.0, "ewma": 0.0}
+
+        self._spill = None
+        self._spilled = 0
+        if spill_path:
+            Path(spill_path).parent.mkdir(parents=True, exist_ok=True)
+            self._spill = sqlite3.connect(str(spill_path), timeout=30, check_same_thread=False)
+            self._spill.execute("PRAGMA journal_mode=WAL")
+            # put() commits once per spilled item on the stream's callback thread; with WAL,
+            # NORMAL skips the fsync per commit while staying crash-consistent.
+            self._spill.execute("PRAGMA synchronous=NORMAL")
+            self._spill.execute("""
+                CREATE TABLE IF NOT EXISTS spill (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    enqueued_at REAL NOT NULL,
+                    item TEXT NOT NULL
+                )
+            """)
+            self._spill.commit()
+            # Whatever a previous run left behind is still pending.
+            self._spilled = self._spill.execute("SELECT COUNT(*) FROM spill").fetchone()[0]
+
+    def put(self, item) -> bool:
+        """Enqueue without blocking the caller. Returns False if the item was dropped."""
+        entry = (time.time(), item)
+        with self._lock:
+            # While anything is spilled, new items queue behind it on disk to keep FIFO order.
+            if not self._spilled:
+                try:
+                    self._memory.put_nowait(entry)
+                    self._counts["enqueued"] += 1
+                    return True
+                except queue.Full:
+                    pass
+
+            if self._spill is not None and self._spilled < self.max_spill:
+                self._spill.execute("INSERT INTO spill (enqueued_at, item) VALUES (?, ?)",
+                                    (entry[0], json.dumps(item, default=str)))
+                self._spill.commit()
+                self._spilled += 1
+                self._counts["enqueued"] += 1
+                self._counts["spilled"] += 1
+                return True
+            self._counts["dropped"] += 1
+            return False
+
+    def _refill(self):
+        """Move the oldest spilled items back into memory while there is room."""
+        with self._lock:
+            if not self._spilled:
+                return
+            room = self.max_items - self._memory.qsize()
+            if room <= 0:
+                return
+            rows = self._spill.execute(
+                "SELECT seq, enqueued_at, item FROM spill ORDER BY seq LIMIT ?", (room,)
+            ).fetchall()
+            moved = 0
+            for _, enqueued_at, item in rows:
+                try:
+                    self._memory.put_nowait((enqueued_at, json.loads(item)))
+                except queue.Full:
+                    break
+                moved += 1
+            if moved:
+                self._spill.execute("DELETE FROM spill WHERE seq <= ?", (rows[moved - 1][0],))
+                self._spill.commit()
+                self._spilled -= moved
+
+    def requeue(self, batch) -> int:
+        """
+        Return a batch from get_batch() whose processing failed. It goes to the
+        head of the spill, ahead of newer items; without a spill file it goes
+        back to memory while there is room. Returns how many items were kept.
+        """
+        if not batch:
+            return 0
+        with self._lock:
+            if self._spill is None:
+                kept = 0
+                for entry in batch:
+                    try:
+                        self._memory.put_nowait(entry)
+                    except queue.Full:
+                        break
+                    kept += 1
+                self._counts["dropped"] += len(batch) - kept
+            else:
+                head = self._spill.execute("SELECT MIN(seq) FROM spill").fetchone()[0]
+                head = 1 if head is None else head
+                self._spill.executemany(
+                    "INSERT INTO spill (seq, enqueued_at, item) VALUES (?, ?, ?)",
+                    [(head - len(batch) + i, enqueued_at, json.dumps(item, default=str))
+                     for i, (enqueued_at, item) in enumerate(batch)]
+                )
+                self._spill.commit()
+                self._spilled += len(batch)
+                kept = len(batch)
+            self._counts["requeued"] += kept
+        return kept
+
+    def get_batch(self, max_items=64, timeout=1.0) -> List[tuple]:
+        """
+        Block up to `timeout` for the first item, then take whatever else is
+        ready up to `max_items`. Returns [(enqueued_at, item)].
+        """
+        if self._memory.qsize() < self.max_items // 2:
+            self._refill()
+        try:
+            batch = [self._memory.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < max_items:
+            try:
+                batch.append(self._memory.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def task_done(self, batch, finished_at: Optional[float] = None):
+        """Record a processed batch for the throughput and lag metrics."""
+        if not batch:
+            return
+        finished_at = finished_at or time.time()
+        lag = finished_at - min(enqueued_at for enqueued_at, _ in batch)
+        with self._lock:
+            self._counts["processed"] += len(batch)
+            self._counts["batches"] += 1
+            self._lag["last"] = lag
+            self._lag["max"] = max(self._lag["max"], lag)
+            self._lag["ewma"] = lag if self._counts["batches"] == 1 else 0.9 * self._lag["ewma"] + 0.1 * lag
+
+    def depth(self) -> int:
+        return self._memory.qsize() + self._spilled
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "memory_depth": self._memory.qsize(),
+                "spill_depth": self._spilled,
+                "depth": self._memory.qsize() + self._spilled,
+                **self._counts,
+                "lag_seconds": round(self._lag["last"], 3),
+                "lag_seconds_ewma": round(self._lag["ewma"], 3),
+                "lag_seconds_max": round(self._lag["max"], 3),
+            }
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
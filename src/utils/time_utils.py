@@ -0,0 +1,23 @@
+# src/utils/time_utils.py
+
+from datetime import datetime
+
+
+def normalize_timestamp(value):
+    """ISO-8601 string for a datetime or a str(datetime) value; None if it can't be read."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    value = str(value).strip()
+    if not value or value in ("None", "NaT"):
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).isoformat()
+    except ValueError:
+        return None
+
+
+def publish_timestamp(metadata: dict):
+    """When the item itself was published: article publish_date or tweet created_at."""
+    return normalize_timestamp(metadata.get("publish_date") or metadata.get("created_at"))
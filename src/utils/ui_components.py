@@ -1,10 +1,10 @@
 # src/utils/ui_components.py
 
-import streamlit as st
 import pandas as pd
-from datetime import time as dtime
+import streamlit as st
+from src.utils.filtering import InferenceFilter
 from src.utils.label_utils import save_manual_label
-from src.utils.metadata_utils import load_metadata_from_file
+from src.utils.metadata_utils import load_preview, find_similar
 
 
 def render_filters(df):
@@ -14,21 +14,18 @@ def render_filters(df):
     filter_flagged = st.sidebar.checkbox("Flagged only", value=False)
     min_conf = st.sidebar.slider("Min Confidence", 0.0, 1.0, 0.5, step=0.01)
     days_back = st.sidebar.slider("Days Back", 0, 30, 7)
-
-    time_threshold = pd.Timestamp.combine(
-        pd.Timestamp.now().date() - pd.Timedelta(days=days_back),
-        dtime.min
+    collapse = st.sidebar.checkbox("Collapse near-duplicates", value=False)
+
+    return (
+        InferenceFilter(df)
+        .filter_by_date(days_back)
+        .filter_by_type(filter_type)
+        .filter_by_flagged(filter_flagged)
+        .filter_by_confidence(min_conf)
+        .collapse_duplicates(collapse)
+        .get_filtered()
     )
 
-    filtered_df = df[df["datetime"] >= time_threshold]
-    if filter_type != "All":
-        filtered_df = filtered_df[filtered_df["type"] == filter_type]
-    if filter_flagged:
-        filtered_df = filtered_df[filtered_df["flagged"] == True]
-    filtered_df = filtered_df[filtered_df["confidence"] >= min_conf]
-
-    return filtered_df
-
 
 def render_export_button(df, label="Export Filtered Results to CSV"):
     if not df.empty:
@@ -36,40 +33,71 @@ def render_export_button(df, label="Export Filtered Results to CSV"):
         st.download_button(label, data=csv, file_name="disinfo_results.csv")
 
 
+def render_pagination(total, page_sizes=(10, 25, 50, 100)):
+    """Sidebar paging/sort controls. Returns kwargs for InferenceFilter.get_filtered."""
+    st.sidebar.header("Results")
+    page_size = st.sidebar.selectbox("Page size", options=list(page_sizes), index=1)
+    sort_by = st.sidebar.radio("Sort by", options=["time", "confidence"], format_func=str.capitalize)
+    descending = st.sidebar.checkbox("Descending", value=True)
+
+    num_pages = max(1, -(-total // page_size))
+    page = st.number_input(f"Page (of {num_pages})", min_value=1, max_value=num_pages, value=1, step=1)
+    return {"limit": page_size, "offset": (page - 1) * page_size,
+            "sort_by": sort_by, "descending": descending}
+
+
 def render_entry_card(row):
+    key = row.get("id", row.name)
     with st.expander(f"{row['type'].capitalize()} | Confidence: {row['confidence']:.2f}", expanded=False):
         st.write(f"**Flagged**: {'Yes' if row['flagged'] else 'No'}")
         st.write(f"**Reason**: {row['reason']}")
         st.write(f"**File**: `{row['file']}`")
+        if pd.notna(row.get("cluster_size")) and row["cluster_size"] > 1:
+            st.write(f"**Near-duplicates**: {int(row['cluster_size'])} in cluster #{int(row['cluster_id'])}")
+
+        # Expander bodies run even when collapsed, so the record read sits behind a toggle.
+        if st.checkbox("Show text & entities", key=f"details_{key}"):
+            preview = load_preview(row["file"])
+            st.text_area("Preview", preview["text"], height=200, key=f"preview_{key}")
 
-        metadata = load_metadata_from_file(row["file"])
-        preview = metadata.get("text", "")[:1000]
-        st.text_area("Preview", preview, height=200)
+            if preview["named_entities"]:
+                st.markdown("**Named Entities:**")
+                st.write(", ".join(preview["named_entities"]))
 
-        if metadata.get("named_entities"):
-            st.markdown("**Named Entities:**")
-            st.write(", ".join(metadata["named_entities"][:10]))
+            if preview["url"]:
+                st.markdown(f"[Source Link]({preview['url']})")
 
-        if metadata.get("url"):
-            st.markdown(f"[Source Link]({metadata['url']})")
+        if st.checkbox("Find similar items", key=f"similar_{key}"):
+            similar = find_similar(row["file"])
+            if similar is None:
+                st.info("This record is not in the similarity index yet.")
+            for rid, score in similar or []:
+                st.markdown(f"`{rid}` (similarity {score:.2f})")
+                st.caption(load_preview(rid, max_chars=200)["text"])
 
         label = st.radio(
             f"Label this item (ID: {row['file']})",
             options=["None", "Disinformation", "Uncertain", "Legit"],
-            key=row["file"]
+            key=f"label_{key}"
         )
         if label != "None":
             save_manual_label(row["file"], label)
             st.success(f"Labeled as: {label}")
 
 
-def render_review_queue(queue):
-    if not queue:
-        st.success("No items in review queue.")
+def render_review_queue(queue, reviewer, claim_size=5):
+    """Claim-based view over a ReviewQueue: a reviewer only sees the batch they claimed."""
+    st.markdown("### Review Queue")
+    st.write(f"{len(queue)} items pending")
+    if st.button("Claim next items"):
+        queue.claim_next(claim_size, reviewer)
+
+    claimed = queue.claimed(reviewer)
+    if not claimed:
+        st.success("No items claimed.")
         return
 
-    st.markdown("### Review Queue")
-    for item in queue:
+    for item in claimed:
         with st.expander(f"Sample | Uncertainty: {item['uncertainty']:.4f}"):
             st.text_area("Text", item["text"], height=200)
             label = st.radio(
@@ -79,4 +107,5 @@ def render_review_queue(queue):
             )
             if label != "None":
                 save_manual_label(item["file"], label)
+                queue.complete(item["file"])
                 st.success(f"Labeled as {label}")
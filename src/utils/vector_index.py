@@ -0,0 +1,341 @@
+# src/utils/vector_index.py
+
+import fcntl
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    return vectors / (np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-9)
+
+
+def _append(path: Path, array: np.ndarray):
+    with open(path, "ab") as f:
+        f.write(np.ascontiguousarray(array).tobytes())
+
+
+def _map(path: Path, dtype, width: int = 0, size: Optional[int] = None) -> np.ndarray:
+    """Read-only view of an append-only file, trimmed to whole rows (or the first `size`)."""
+    itemsize = np.dtype(dtype).itemsize * max(width, 1)
+    if size is None:
+        size = path.stat().st_size // itemsize if path.exists() else 0
+    if size == 0:
+        return np.empty((0, width) if width else 0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(size, width) if width else (size,))
+
+
+def spherical_kmeans(vectors: np.ndarray, k: int, iterations=10, seed=0, chunk_size=65536) -> np.ndarray:
+    """Unit-norm centroids maximizing cosine similarity to their members."""
+    rng = np.random.RandomState(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=len(vectors) < k)].copy()
+    for _ in range(iterations):
+        sums = np.zeros_like(centroids)
+        counts = np.zeros(k)
+        for start in range(0, len(vectors), chunk_size):
+            block = vectors[start:start + chunk_size]
+            assigned = np.argmax(block @ centroids.T, axis=1)
+            np.add.at(sums, assigned, block)
+            counts += np.bincount(assigned, minlength=k)
+        empty = counts == 0
+        # Re-seed empty lists from random points so every list stays in use.
+        sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class VectorIndex:
+    """
+    On-disk approximate nearest-neighbour index (IVF) over record embeddings.
+
+    Every vector is L2-normalized and appended to `vectors.f32`, whose row
+    number is the record's row id, so scores are cosine similarities. Until
+    `train_size` vectors have arrived, queries scan that file exactly. Then
+    the index trains itself: an SVD projection down to `reduced_dim` and
+    `nlist` spherical k-means centroids in the projected space. From then on
+    each vector's projection is also appended to the list of its nearest
+    centroid (`lists/NNNNN.vec`, with row ids in the matching `.rows`). A
+    query scans only the `nprobe` closest lists in the reduced space. By
+    default it answers from there. With `rerank` set, it re-scores that many
+    of the best candidates exactly from `vectors.f32`, which is worth it
+    while that file fits in the page cache. Record ids live in a SQLite
+    table next to the files.
+
+    `model` names the embedding model; the first writer records it in
+    `meta.json`, and vectors from a different model are rejected.
+
+    Writers from several processes are serialized with an flock. All files
+    are append-only, so readers never need the lock.
+    """
+
+    def __init__(self, root, nlist=1024, nprobe=16, reduced_dim=128, train_size=None, rerank=0, model=None):
+        self.root = Path(root)
+        (self.root / "lists").mkdir(parents=True, exist_ok=True)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.reduced_dim = reduced_dim
+        self.train_size = train_size or max(40 * nlist, 10000)
+        self.rerank = rerank
+        self.model = model
+        self.stored_model = None
+        self._lock = threading.Lock()
+        self._lock_path = self.root / ".lock"
+        self._meta_path = self.root / "meta.json"
+        self._vectors_path = self.root / "vectors.f32"
+        self.dim = None
+        self.projection = None
+        self.centroids = None
+        self._maps = {}
+
+        self.conn = sqlite3.connect(str(self.root / "rows.sqlite"), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS rows (
+                row INTEGER PRIMARY KEY,
+                record_id TEXT NOT NULL UNIQUE
+            );
+        """)
+        self.conn.commit()
+        self._load_meta()
+
+    # --------- State ---------
+
+    def _load_meta(self):
+        if self.trained or not self._meta_path.exists():
+            return
+        with open(self._meta_path, "r") as f:
+            meta = json.load(f)
+        self.dim = meta["dim"]
+        self.stored_model = meta.get("model")
+        if meta.get("trained"):
+            self.nlist = meta["nlist"]
+            self.reduced_dim = meta["reduced_dim"]
+            self.projection = np.load(self.root / "projection.npy")
+            self.centroids = np.load(self.root / "centroids.npy")
+
+    def _save_meta(self):
+        tmp_path = self._meta_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"dim": self.dim, "model": self.stored_model, "trained": self.trained, "nlist": self.nlist,
+                       "reduced_dim": self.reduced_dim}, f)
+        os.replace(tmp_path, self._meta_path)
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def _list_paths(self, list_no: int) -> Tuple[Path, Path]:
+        base = self.root / "lists" / f"{list_no:05d}"
+        return base.with_suffix(".vec"), base.with_suffix(".rows")
+
+    def _vectors(self) -> np.ndarray:
+        return _map(self._vectors_path, np.float32, self.dim or 1)
+
+    def _list_arrays(self, list_no: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(reduced vectors, rows) of one list. Maps are reused until the list grows; one stat per call."""
+        vec_path, rows_path = self._list_paths(list_no)
+        try:
+            n = os.stat(rows_path).st_size // 8
+        except FileNotFoundError:
+            n = 0
+        cached = self._maps.get(list_no)
+        if cached is None or cached[0] != n:
+            # The .vec file is written first, so it always holds at least n vectors.
+            cached = (n, _map(vec_path, np.float32, self.reduced_dim, n), _map(rows_path, np.int64, 0, n))
+            self._maps[list_no] = cached
+        return cached[1], cached[2]
+
+    @contextmanager
+    def _write_lock(self):
+        with self._lock, open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Another process may have trained the index since we last looked.
+                self._load_meta()
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # --------- Writes ---------
+
+    def add_many(self, items: Iterable[Tuple[str, np.ndarray]]) -> int:
+        """Insert (record_id, embedding) pairs; ids already indexed are skipped. Returns how many were added."""
+        items = list(items)
+        if not items:
+            return 0
+        with self._write_lock():
+            if self.model and self.stored_model and self.model != self.stored_model:
+                raise ValueError(f"Index at {self.root} holds {self.stored_model} embeddings, not {self.model}")
+            known = set()
+            ids = [str(rid) for rid, _ in items]
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                known.update(row[0] for row in self.conn.execute(
+                    f"SELECT record_id FROM rows WHERE record_id IN ({','.join('?' * len(chunk))})", chunk
+                ))
+            fresh = {}
+            for rid, (_, vector) in zip(ids, items):
+                if rid not in known:
+                    fresh[rid] = vector
+            if not fresh:
+                return 0
+            vectors = _normalize(np.stack(list(fresh.values())))
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self.stored_model = self.model
+                self._save_meta()
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Index at {self.root} holds {self.dim}-d vectors, not {vectors.shape[1]}-d")
+
+            # Rows are positions in vectors.f32; a crashed writer's orphan rows are simply skipped.
+            start = len(self._vectors())
+            rows = np.arange(start, start + len(vectors), dtype=np.int64)
+            _append(self._vectors_path, vectors)
+            if self.trained:
+                self._insert_lists(rows, vectors)
+            self.conn.executemany("INSERT INTO rows VALUES (?, ?)", zip(rows.tolist(), fresh))
+            self.conn.commit()
+            if not self.trained and start + len(vectors) >= self.train_size:
+                self._train()
+        return len(fresh)
+
+    def add(self, record_id: str, vector: np.ndarray) -> int:
+        return self.add_many([(record_id, vector)])
+
+    def _project(self, vectors: np.ndarray) -> np.ndarray:
+        return np.ascontiguousarray(vectors @ self.projection, dtype=np.float32)
+
+    def _insert_lists(self, rows: np.ndarray, vectors: np.ndarray):
+        reduced = self._project(vectors)
+        assigned = np.argmax(reduced @ self.centroids.T, axis=1)
+        for list_no in np.unique(assigned):
+            members = np.flatnonzero(assigned == list_no)
+            vec_path, rows_path = self._list_paths(int(list_no))
+            # Vectors first: readers size a list by its .rows file, so a half-written batch stays invisible.
+            _append(vec_path, reduced[members])
+            _append(rows_path, rows[members])
+
+    def _train(self):
+        # Lists left by a training run that crashed before saving meta.json would otherwise get duplicates.
+        shutil.rmtree(self.root / "lists", ignore_errors=True)
+        (self.root / "lists").mkdir()
+        self._maps = {}
+        vectors = self._vectors()
+        sample = np.array(vectors[np.sort(np.random.RandomState(0).permutation(len(vectors))[:self.train_size])])
+        # Uncentered SVD, so inner products in the reduced space approximate cosine similarity.
+        _, _, vt = np.linalg.svd(sample, full_matrices=False)
+        self.reduced_dim = min(self.reduced_dim, self.dim)
+        self.projection = np.ascontiguousarray(vt[:self.reduced_dim].T, dtype=np.float32)
+        self.nlist = min(self.nlist, len(sample))
+        self.centroids = spherical_kmeans(self._project(sample), self.nlist)
+        for start in range(0, len(vectors), 65536):
+            block = np.array(vectors[start:start + 65536])
+            self._insert_lists(np.arange(start, start + len(block), dtype=np.int64), block)
+        np.save(self.root / "projection.npy", self.projection)
+        np.save(self.root / "centroids.npy", self.centroids)
+        # Lists are complete before meta.json marks the index trained.
+        self._save_meta()
+        print(f"[VECTOR] Trained IVF index: {self.nlist} lists, {self.dim}->{self.reduced_dim} dims, "
+              f"{len(vectors)} vectors")
+
+    # --------- Queries ---------
+
+    @staticmethod
+    def _top(scores: np.ndarray, rows: np.ndarray, k: int):
+        if len(scores) > k:
+            keep = np.argpartition(-scores, k)[:k]
+            return scores[keep], rows[keep]
+        return scores, rows
+
+    def _candidates(self, query: np.ndarray, want: int, nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Best `want` (reduced-space scores, rows) from the `nprobe` lists nearest the query."""
+        reduced = query @ self.projection
+        nprobe = min(nprobe, self.nlist)
+        probes = np.argpartition(-(self.centroids @ reduced), nprobe - 1)[:nprobe]
+        found_scores, found_rows = [], []
+        for list_no in probes:
+            vectors, rows = self._list_arrays(int(list_no))
+            if len(rows):
+                scores, rows = self._top(np.asarray(vectors @ reduced), np.asarray(rows), want)
+                found_scores.append(scores)
+                found_rows.append(rows)
+        if not found_rows:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+        return self._top(np.concatenate(found_scores), np.concatenate(found_rows), want)
+
+    def search(self, vector: np.ndarray, k=10, nprobe: Optional[int] = None,
+               exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """Top-k (record_id, cosine score) for one query embedding, best first."""
+        self._load_meta()
+        if self.dim is None:
+            return []
+        exclude = set(exclude)
+        query = _normalize(vector)[0]
+        want = k + len(exclude)
+        vectors = self._vectors()
+
+        if self.trained and not self.rerank:
+            scores, rows = self._candidates(query, want, nprobe or self.nprobe)
+        elif self.trained:
+            _, rows = self._candidates(query, max(self.rerank, want), nprobe or self.nprobe)
+            rows = np.sort(rows)
+            rows = rows[rows < len(vectors)]
+            scores = np.asarray(vectors[rows] @ query) if len(rows) else np.empty(0, dtype=np.float32)
+        else:
+            rows = np.arange(len(vectors), dtype=np.int64)
+            scores = np.asarray(vectors @ query)
+        scores, rows = self._top(scores, rows, want)
+        if not len(rows):
+            return []
+
+        order = np.argsort(-scores)
+        ids = dict(self.conn.execute(
+            f"SELECT row, record_id FROM rows WHERE row IN ({','.join('?' * len(rows))})",
+            [int(r) for r in rows]
+        ))
+        results = [(ids[int(rows[i])], float(scores[i])) for i in order
+                   if int(rows[i]) in ids and ids[int(rows[i])] not in exclude]
+        return results[:k]
+
+    def vector_of(self, record_id: str) -> Optional[np.ndarray]:
+        """The stored (normalized) vector of an indexed record, usable as a query."""
+        self._load_meta()
+        row = self.conn.execute("SELECT row FROM rows WHERE record_id = ?", (str(record_id),)).fetchone()
+        return np.array(self._vectors()[row[0]]) if row else None
+
+    def similar_to(self, record_id: str, k=10) -> List[Tuple[str, float]]:
+        """Records most similar to an already indexed one (itself excluded)."""
+        vector = self.vector_of(record_id)
+        if vector is None:
+            return []
+        return self.search(vector, k, exclude=[str(record_id)])
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+
+    def __contains__(self, record_id: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM rows WHERE record_id = ?", (str(record_id),)).fetchone() is not None
+
+    def close(self):
+        self.conn.close()
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def open_vector_index(path, **kwargs) -> VectorIndex:
+    """One VectorIndex per directory per process."""
+    key = os.path.abspath(path)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = VectorIndex(key, **kwargs)
+        return _indexes[key]
@@ -0,0 +1,69 @@
+# tests/test_backends.py
+
+import os
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from src.inference.runner_model import load_runner_module
+
+WORDS = ["breaking", "officials", "confirm", "new", "cyber", "campaign", "vaccine", "claims", "local", "event"]
+TEXTS = ["breaking officials confirm new cyber campaign", "vaccine claims local event", "new event", "cyber"]
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    """A tiny randomly initialized BERT with its own vocabulary, so no download is needed."""
+    torch.manual_seed(0)
+    vocab = tmp_path / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + WORDS) + "\n")
+    path = tmp_path / "checkpoint"
+    transformers.BertTokenizer(str(vocab)).save_pretrained(path)
+    config = transformers.BertConfig(vocab_size=len(WORDS) + 5, hidden_size=32, num_hidden_layers=2,
+                                     num_attention_heads=2, intermediate_size=64, num_labels=2)
+    transformers.BertForSequenceClassification(config).save_pretrained(path)
+    return path
+
+
+def _probs(model):
+    return np.array(model.score_encoded(model.encode(TEXTS))[1])
+
+
+def test_int8_matches_fp32(checkpoint):
+    bert = load_runner_module()
+    reference = _probs(bert.BertDisinfoModel(checkpoint_path=str(checkpoint)))
+    quantized = _probs(bert.BertDisinfoModel(checkpoint_path=str(checkpoint), backend="int8"))
+    assert np.max(np.abs(reference - quantized)) < 0.05
+
+
+def test_onnx_matches_fp32_and_export_follows_retraining(checkpoint, tmp_path, monkeypatch):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnx")
+    bert = load_runner_module()
+    monkeypatch.setattr(bert, "ONNX_DIR", tmp_path / "onnx")
+
+    reference = _probs(bert.BertDisinfoModel(checkpoint_path=str(checkpoint)))
+    assert np.allclose(_probs(bert.BertDisinfoModel(checkpoint_path=str(checkpoint), backend="onnx")),
+                       reference, atol=1e-4)
+    first = list((tmp_path / "onnx").glob("*.onnx"))
+    assert [p.name for p in first] == [f"{bert.onnx_cache_name(checkpoint)}.onnx"]
+
+    # "Retrain" into the same directory: the old export must not be reused.
+    transformers.BertForSequenceClassification.from_pretrained(checkpoint, num_labels=2).save_pretrained(checkpoint)
+    for f in checkpoint.iterdir():
+        os.utime(f, ns=(f.stat().st_atime_ns, f.stat().st_mtime_ns + 10 ** 9))
+    bert.BertDisinfoModel(checkpoint_path=str(checkpoint), backend="onnx")
+    second = list((tmp_path / "onnx").glob("*.onnx"))
+    assert len(second) == 1 and second != first
+
+
+def test_onnx_cache_name_changes_with_checkpoint_files(tmp_path):
+    bert = load_runner_module()
+    (tmp_path / "model.safetensors").write_bytes(b"a")
+    before = bert.onnx_cache_name(tmp_path)
+    os.utime(tmp_path / "model.safetensors", ns=(0, (tmp_path / "model.safetensors").stat().st_mtime_ns + 10 ** 9))
+    assert bert.onnx_cache_name(tmp_path) != before
+    assert bert.onnx_cache_name("bert-base-uncased") == "bert-base-uncased"
@@ -0,0 +1,29 @@
+# tests/test_backfill_log_timestamps.py
+
+import json
+
+from scripts.backfill_log_timestamps import backfill
+
+
+def test_backfill_is_idempotent(tmp_path):
+    record = tmp_path / "a1.json"
+    record.write_text(json.dumps({"type": "article", "publish_date": "2024-01-02 10:00:00"}))
+    log = tmp_path / "inference_log.jsonl"
+    log.write_text("".join(json.dumps(r) + "\n" for r in [
+        {"file": str(record), "flagged": True},
+        {"file": "gone.json", "flagged": False},
+        {"file": "b2", "flagged": False, "ingested_at": "2024-03-01T00:00:00", "published_at": None},
+    ]))
+
+    backfill(log, tmp_path / "no_store")
+    first = log.read_text()
+    records = [json.loads(line) for line in first.splitlines()]
+    assert records[0]["ingested_at"] and records[0]["published_at"].startswith("2024-01-02")
+    assert records[1]["ingested_at"] is None
+    assert records[2]["ingested_at"] == "2024-03-01T00:00:00"
+
+    # Already-backfilled records are left alone, even once their source changes.
+    record.write_text(json.dumps({"type": "article", "publish_date": "2025-06-01"}))
+    backfill(log, tmp_path / "no_store")
+    assert log.read_text() == first
+    assert not (tmp_path / "inference_log.jsonl.backfill").exists()
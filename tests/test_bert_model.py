@@ -0,0 +1,59 @@
+# tests/test_bert_model.py
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from src.models.bert_model import LengthGroupedTrainer, TokenizedDataset
+
+WORDS = ["breaking", "officials", "confirm", "new", "cyber", "campaign", "vaccine", "claims", "local", "event"]
+TEXTS = ["breaking officials confirm new cyber campaign", "new event", "cyber", "vaccine claims local event"]
+
+
+@pytest.fixture
+def tokenizer(tmp_path):
+    vocab = tmp_path / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + WORDS) + "\n")
+    return transformers.BertTokenizer(str(vocab))
+
+
+def test_dataset_round_trips_unpadded_ids(tokenizer):
+    dataset = TokenizedDataset.from_texts(tokenizer, TEXTS, [1, 0, 0, 1], chunk_size=3)
+
+    assert len(dataset) == 4
+    assert dataset.token_ids.dtype == np.int32
+    assert dataset.lengths.tolist() == [8, 4, 3, 6]
+    for i, text in enumerate(TEXTS):
+        assert dataset[i]["input_ids"] == tokenizer(text)["input_ids"]
+    assert [dataset[i]["labels"] for i in range(4)] == [1, 0, 0, 1]
+
+
+def test_collator_pads_each_batch_to_its_longest_example(tokenizer):
+    dataset = TokenizedDataset.from_texts(tokenizer, TEXTS, [1, 0, 0, 1])
+    collator = transformers.DataCollatorWithPadding(tokenizer)
+
+    batch = collator([dataset[1], dataset[2]])
+    assert batch["input_ids"].shape == (2, 4)
+    assert batch["attention_mask"].sum(dim=1).tolist() == [4, 3]
+    assert batch["labels"].tolist() == [0, 0]
+
+
+def test_length_grouped_sampler_uses_stored_lengths(tokenizer, tmp_path):
+    class NoIndexing(TokenizedDataset):
+        def __getitem__(self, idx):
+            raise AssertionError("sampler should not index the dataset")
+
+    encoded = TokenizedDataset.from_texts(tokenizer, TEXTS, [1, 0, 0, 1])
+    dataset = NoIndexing(encoded.token_ids, encoded.offsets, encoded.labels)
+    config = transformers.BertConfig(vocab_size=len(WORDS) + 5, hidden_size=32, num_hidden_layers=1,
+                                     num_attention_heads=2, intermediate_size=64, num_labels=2)
+    args = transformers.TrainingArguments(output_dir=str(tmp_path), per_device_train_batch_size=2,
+                                          group_by_length=True, report_to=[])
+    trainer = LengthGroupedTrainer(model=transformers.BertForSequenceClassification(config), args=args,
+                                   train_dataset=dataset)
+
+    sampler = trainer._get_train_sampler()
+    assert isinstance(sampler, transformers.trainer_pt_utils.LengthGroupedSampler)
+    assert sorted(sampler) == [0, 1, 2, 3]
@@ -0,0 +1,71 @@
+# tests/test_cascade.py
+
+from src.inference.cascade import CascadeClassifier
+
+
+class FixedFastModel:
+    version = "test"
+
+    def disinfo_proba(self, records):
+        return [r["p"] for r in records]
+
+
+class CountingSlowModel:
+    calls = []
+
+    def predict_with_proba(self, texts):
+        self.calls.append(list(texts))
+        for text in texts:
+            yield text, "disinfo", [0.2, 0.8]
+
+
+def test_only_uncertain_records_reach_the_transformer():
+    slow = CountingSlowModel()
+    cascade = CascadeClassifier(FixedFastModel(), slow_factory=lambda: slow, band=(0.3, 0.7))
+    results = cascade.score_batch([
+        {"text": "a", "p": 0.95},
+        {"text": "b", "p": 0.5},
+        {"text": "c", "p": 0.05},
+    ])
+
+    assert slow.calls == [["b"]]
+    assert [r["stage"] for r in results] == ["fast", "slow", "fast"]
+    assert results[1]["confidence"] == 0.8 and results[1]["stages"]["fast"]["confidence"] == 0.5
+    assert [r["flagged"] for r in results] == [True, True, False]
+    assert cascade.escalation_rate() == 1 / 3
+
+
+def test_transformer_not_loaded_when_nothing_is_uncertain():
+    def fail():
+        raise AssertionError("slow model should not load")
+
+    cascade = CascadeClassifier(FixedFastModel(), slow_factory=fail)
+    assert cascade.score_batch([{"text": "a", "p": 0.99}])[0]["stage"] == "fast"
+
+
+def test_transformer_failure_keeps_fast_scores():
+    class BrokenSlowModel:
+        def predict_with_proba(self, texts):
+            raise TypeError("unexpected keyword argument 'backend'")
+
+    def fail_to_load():
+        raise OSError("no checkpoint")
+
+    records = [{"text": "a", "p": 0.6}, {"text": "b", "p": 0.9}]
+    for factory in (lambda: BrokenSlowModel(), fail_to_load):
+        cascade = CascadeClassifier(FixedFastModel(), slow_factory=factory, band=(0.3, 0.7))
+        results = cascade.score_batch(records)
+        assert [r["stage"] for r in results] == ["fast", "fast"]
+        assert [r["confidence"] for r in results] == [0.6, 0.9]
+        assert cascade.escalation_rate() == 0.0
+
+
+def test_slow_model_disinfo_index_is_respected():
+    class ReorderedSlowModel:
+        disinfo_index = 0
+
+        def predict_with_proba(self, texts):
+            return [(t, "Disinformation", [0.9, 0.1]) for t in texts]
+
+    cascade = CascadeClassifier(FixedFastModel(), slow_factory=ReorderedSlowModel, band=(0.3, 0.7))
+    assert cascade.score_batch([{"text": "a", "p": 0.5}])[0]["confidence"] == 0.9
@@ -0,0 +1,48 @@
+# tests/test_checkpoints.py
+
+from src.utils.checkpoints import CheckpointRegistry
+
+
+def _save(registry, labels, **info):
+    path = registry.next_dir()
+    (path / "weights.bin").write_bytes(b"x")
+    return registry.commit(path, labels, **info)
+
+
+def test_versions_are_ordered_and_pruned(tmp_path):
+    registry = CheckpointRegistry(tmp_path, keep=2)
+    assert registry.latest() is None
+
+    _save(registry, {"a": "Legit"}, full_retrain=True)
+    _save(registry, {"a": "Legit", "b": "Disinformation"}, full_retrain=False)
+    latest = _save(registry, {"a": "Legit", "b": "Legit"}, full_retrain=False)
+
+    assert latest["version"] == "v0003"
+    assert [v["version"] for v in registry.versions()] == ["v0002", "v0003"]
+    assert not (tmp_path / "v0001").exists()
+    assert registry.trained_labels(latest) == {"a": "Legit", "b": "Legit"}
+
+
+def test_rounds_since_full_and_uncommitted_dirs(tmp_path):
+    registry = CheckpointRegistry(tmp_path)
+    _save(registry, {}, full_retrain=True)
+    assert registry.rounds_since_full() == 0
+    _save(registry, {}, full_retrain=False)
+    _save(registry, {}, full_retrain=False)
+    assert registry.rounds_since_full() == 2
+
+    # A round that crashed after next_dir() is not visible and its directory is reused.
+    registry.next_dir()
+    assert registry.latest()["version"] == "v0003"
+    assert _save(registry, {}, full_retrain=True)["version"] == "v0004"
+    assert registry.rounds_since_full() == 0
+
+
+def test_rounds_since_full_survives_pruning(tmp_path):
+    registry = CheckpointRegistry(tmp_path, keep=2)
+    _save(registry, {}, full_retrain=True)
+    for _ in range(5):
+        _save(registry, {}, full_retrain=False)
+
+    assert not any(v.get("full_retrain") for v in registry.versions())
+    assert registry.rounds_since_full() == 5
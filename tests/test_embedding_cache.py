@@ -0,0 +1,54 @@
+# tests/test_embedding_cache.py
+
+import numpy as np
+import pytest
+
+from src.utils.embedding_cache import EmbeddingCache
+from src.utils.sampling_utils import k_center_greedy, select_diverse
+
+
+def test_rows_grow_persist_and_dedupe_by_content(tmp_path):
+    cache = EmbeddingCache(tmp_path, "v0001", dim=4)
+    texts = [f"text {i}" for i in range(1500)]
+    vectors = np.random.RandomState(0).rand(1500, 4).astype(np.float32)
+    rows = cache.add_many(texts, vectors)
+    assert list(rows[:3]) == [0, 1, 2] and len(cache) == 1500
+
+    # Same content after normalization maps to the same row.
+    assert cache.add_many(["  TEXT 7 "], np.zeros((1, 4)))[0] == 7
+    cache.close()
+
+    reopened = EmbeddingCache(tmp_path, "v0001", dim=4)
+    assert list(reopened.rows(["text 42", "unseen"])) == [42, -1]
+    np.testing.assert_array_equal(reopened.vectors[42], vectors[42])
+
+    with pytest.raises(ValueError):
+        EmbeddingCache(tmp_path, "v0001", dim=8)
+    assert EmbeddingCache(tmp_path, "v0002", dim=4).purge_other_versions() == 1
+
+
+def test_k_center_skips_near_duplicates():
+    rng = np.random.RandomState(0)
+    centers = rng.rand(5, 16) * 10
+    # 100 points: 20 jittered copies of each of 5 narratives.
+    points = np.repeat(centers, 20, axis=0) + rng.rand(100, 16) * 0.01
+    picked = k_center_greedy(points, 5, chunk_size=7)
+    assert picked[0] == 0
+    assert sorted(i // 20 for i in picked) == [0, 1, 2, 3, 4]
+    assert len(k_center_greedy(np.ones((10, 3)), 4)) == 1
+
+
+def test_select_diverse_embeds_missing_candidates(tmp_path):
+    cache = EmbeddingCache(tmp_path, "v0001", dim=2)
+    cache.add_many(["a1"], np.array([[1.0, 0.0]]))
+    basis = {"a": [1.0, 0.0], "b": [0.0, 1.0]}
+    embedded = []
+
+    def embed(texts):
+        embedded.extend(texts)
+        return np.array([basis[t[0]] for t in texts])
+
+    candidates = [(0.9, ("r1", {"text": "a1"})), (0.8, ("r2", {"text": "a2"})), (0.7, ("r3", {"text": "b1"}))]
+    picked = select_diverse(candidates, 2, cache, embed)
+    assert [rid for _, (rid, _) in picked] == ["r1", "r3"]
+    assert embedded == ["a2", "b1"]
@@ -0,0 +1,50 @@
+# tests/test_infer.py
+
+import os
+import sys
+from pathlib import Path
+
+# infer is a src/ script and imports its siblings by bare name.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import infer
+from models.fast_model import FastDisinfoModel
+
+
+class StubFastModel:
+    def __init__(self, version):
+        self.version = version
+
+
+def test_cascade_appears_and_reloads_when_fast_model_changes(tmp_path, monkeypatch):
+    fast_path = tmp_path / "fast_model.joblib"
+    monkeypatch.setattr(infer, "FAST_MODEL_PATH", str(fast_path))
+    monkeypatch.setattr(infer, "SLOW_CHECKPOINT_DIR", str(tmp_path / "active_learning"))
+    monkeypatch.setattr(infer, "_cascade", None)
+    monkeypatch.setattr(infer, "_cascade_stamp", None)
+    monkeypatch.setattr(FastDisinfoModel, "load", classmethod(lambda cls, path: StubFastModel(Path(path).read_text())))
+
+    assert infer.get_cascade() is None
+
+    # Trained after the first call: the monitor must not keep running without it.
+    fast_path.write_text("v1")
+    first = infer.get_cascade()
+    assert first.fast_model.version == "v1"
+    assert infer.get_cascade() is first
+
+    fast_path.write_text("v2")
+    os.utime(fast_path, ns=(0, fast_path.stat().st_mtime_ns + 10 ** 9))
+    assert infer.get_cascade().fast_model.version == "v2"
+    assert infer.current_model_version().startswith("cascade-v2-")
+
+
+def test_result_cache_follows_the_live_model_version(tmp_path, monkeypatch):
+    versions = iter(["v1", "v2"])
+    monkeypatch.setattr(infer, "RESULT_CACHE_PATH", tmp_path / "cache.sqlite")
+    monkeypatch.setattr(infer, "_result_cache", None)
+    monkeypatch.setattr(infer, "current_model_version", lambda: next(versions))
+
+    cache = infer.get_result_cache()
+    cache.put("some text", {"flagged": True})
+    assert infer.get_result_cache() is cache and cache.model_version == "v2"
+    assert cache.get("some text") is None
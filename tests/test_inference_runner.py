@@ -0,0 +1,64 @@
+# tests/test_inference_runner.py
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+# inference_runner imports its siblings by bare name from src/.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from inference import inference_runner
+
+
+class KilledMidRun(Exception):
+    pass
+
+
+class FakeBert:
+    """Scores `text <n>` as P(disinfo) = n / 100; raises once `kill_at` chunks have been encoded."""
+
+    labels = ["real", "disinfo"]
+    disinfo_index = 1
+    encoded_chunks = 0
+    kill_at = None
+
+    def __init__(self, checkpoint_path=None, backend="torch"):
+        pass
+
+    def encode(self, texts):
+        FakeBert.encoded_chunks += 1
+        if FakeBert.encoded_chunks == FakeBert.kill_at:
+            raise KilledMidRun()
+        return [[101, int(text.split()[1]), 102] for text in texts]
+
+    def score_encoded(self, input_ids):
+        probs = [[1 - ids[1] / 100, ids[1] / 100] for ids in input_ids]
+        return [self.labels[p[1] >= 0.5] for p in probs], probs
+
+
+def test_resumed_stream_has_no_duplicates_or_gaps(tmp_path, monkeypatch):
+    monkeypatch.setattr(inference_runner, "BertDisinfoModel", FakeBert)
+    input_path = tmp_path / "input.jsonl"
+    output_path = tmp_path / "output.jsonl"
+    input_path.write_text("".join(json.dumps({"id": i, "text": f"text {i}"}) + "\n" for i in range(10)))
+
+    FakeBert.encoded_chunks, FakeBert.kill_at = 0, 3
+    with pytest.raises(KilledMidRun):
+        inference_runner.stream_inference(input_path, output_path, chunk_size=3)
+    assert len(output_path.read_text().splitlines()) == 6
+    # A chunk the kill cut short mid-write.
+    with open(output_path, "a") as f:
+        f.write('{"id": 6, "text": "text 6", "predicted_')
+
+    FakeBert.encoded_chunks, FakeBert.kill_at = 0, None
+    checkpoint = inference_runner.stream_inference(input_path, output_path, chunk_size=3)
+
+    records = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert [r["id"] for r in records] == list(range(10))
+    assert [r["probabilities"][1] for r in records] == [pytest.approx(i / 100) for i in range(10)]
+    assert checkpoint["records"] == 10 and checkpoint["input_offset"] == input_path.stat().st_size
+    assert FakeBert.encoded_chunks == 2
@@ -0,0 +1,88 @@
+# tests/test_ingest_pipeline.py
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+for module in ("aiohttp", "tldextract", "newspaper", "dateparser", "youtube_transcript_api", "spacy"):
+    pytest.importorskip(module)
+# ingest_pipeline is a src/ script and imports its siblings by bare name.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from ingest_pipeline import _DONE, IngestPipeline
+
+
+def _drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+def test_stages_pass_jobs_on_and_shut_down_on_sentinels():
+    pipeline = IngestPipeline({})
+
+    async def handler(job):
+        if job["source"] == "bad":
+            raise ValueError("unparseable")
+        return job
+
+    async def main():
+        inbox, middle, outbox = asyncio.Queue(), asyncio.Queue(), asyncio.Queue()
+        for source in ("a", "bad", "b", "c"):
+            inbox.put_nowait({"kind": "tweet", "source": source})
+        for _ in range(3):
+            inbox.put_nowait(_DONE)
+        pipeline.nlp_batch_size = 2
+        # Both stages must return once every worker has seen a sentinel; a hang fails the timeout.
+        await asyncio.wait_for(asyncio.gather(
+            pipeline._stage("parse", inbox, handler, 3, middle, downstream_workers=2),
+            pipeline._nlp_stage(middle, 2, outbox),
+        ), timeout=5)
+        return _drain(outbox)
+
+    out = asyncio.run(main())
+    assert out[-1] is _DONE and _DONE not in out[:-1]
+    assert sorted(job["source"] for job in out[:-1]) == ["a", "b", "c"]
+
+
+def test_fetches_are_limited_per_domain_and_limits_are_released():
+    pipeline = IngestPipeline({}, per_domain_limit=2)
+    in_flight, peak = {}, {}
+
+    class StubResponse:
+        def __init__(self, url):
+            self.domain = url.split("/")[2].split(".", 1)[1]
+
+        async def __aenter__(self):
+            in_flight[self.domain] = in_flight.get(self.domain, 0) + 1
+            peak[self.domain] = max(peak.get(self.domain, 0), in_flight[self.domain])
+            await asyncio.sleep(0.01)
+            return self
+
+        async def __aexit__(self, *exc):
+            in_flight[self.domain] -= 1
+
+        def raise_for_status(self):
+            pass
+
+        async def text(self, errors="strict"):
+            return "<html></html>"
+
+    class StubSession:
+        def get(self, url):
+            return StubResponse(url)
+
+    pipeline.session = StubSession()
+    urls = [f"https://{host}.{domain}/{i}" for i in range(6)
+            for host, domain in (("www", "example.com"), ("news", "example.org"))]
+
+    async def main():
+        return await asyncio.gather(*(pipeline._fetch({"kind": "article", "source": url}) for url in urls))
+
+    jobs = asyncio.run(main())
+    assert all(job["html"] == "<html></html>" for job in jobs)
+    assert peak == {"example.com": 2, "example.org": 2}
+    assert pipeline._domain_limits == {}
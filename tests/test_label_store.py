@@ -0,0 +1,67 @@
+# tests/test_label_store.py
+
+import json
+
+from src.utils.label_store import LabelStore
+
+
+def test_set_is_idempotent_and_keeps_latest(tmp_path):
+    store = LabelStore(tmp_path / "labels.sqlite")
+    assert store.set("a", "Legit")
+    assert not store.set("a", "Legit")
+    assert store.set("a", "Disinformation")
+    store.set("b", "Uncertain")
+
+    assert len(store) == 2
+    assert store.as_dict() == {"a": "Disinformation", "b": "Uncertain"}
+    # A fresh process with no memo still sees no change for the same value.
+    assert not LabelStore(tmp_path / "labels.sqlite").set("b", "Uncertain")
+
+
+def test_import_legacy_jsonl(tmp_path):
+    log = tmp_path / "manual_labels.jsonl"
+    with open(log, "w") as f:
+        for rid, label in [("x", "Legit"), ("y", "Legit"), ("x", "Legit"), ("x", "Disinformation")]:
+            f.write(json.dumps({"id": rid, "label": label, "timestamp": "2024-01-01T00:00:00"}) + "\n")
+
+    store = LabelStore(tmp_path / "labels.sqlite")
+    store.import_jsonl(log)
+    assert store.as_dict() == {"x": "Disinformation", "y": "Legit"}
+
+
+def test_legacy_log_is_merged_on_open_without_overriding_newer_labels(tmp_path):
+    log = tmp_path / "manual_labels.jsonl"
+    with open(log, "w") as f:
+        f.write(json.dumps({"id": "x", "label": "Legit", "timestamp": "2024-01-01T00:00:00"}) + "\n")
+        f.write(json.dumps({"id": "y", "label": "Legit", "timestamp": "2024-01-01T00:00:00"}) + "\n")
+
+    # The store already exists, e.g. because the dashboard wrote a label first.
+    LabelStore(tmp_path / "labels.sqlite").set("x", "Disinformation")
+    store = LabelStore(tmp_path / "labels.sqlite", legacy_log=log)
+    assert store.as_dict() == {"x": "Disinformation", "y": "Legit"}
+    assert store.merge_legacy_log(log) == 0
+
+
+def test_setting_a_label_the_merge_rejected_still_writes_it(tmp_path):
+    log = tmp_path / "manual_labels.jsonl"
+    log.write_text(json.dumps({"id": "a", "label": "Legit", "timestamp": "2024-01-01T00:00:00"}) + "\n")
+    store = LabelStore(tmp_path / "labels.sqlite")
+    store.set("a", "Disinformation")
+
+    store.merge_legacy_log(log)
+    assert store.get("a") == "Disinformation"
+    assert store.set("a", "Legit")
+    assert store.get("a") == "Legit"
+
+
+def test_compaction_keeps_labels_newer_than_the_log(tmp_path):
+    from scripts.compact_labels import compact
+
+    log = tmp_path / "manual_labels.jsonl"
+    log.write_text(json.dumps({"id": "a", "label": "Legit", "timestamp": "2024-01-01T00:00:00"}) + "\n"
+                   + json.dumps({"id": "b", "label": "Legit", "timestamp": "2024-01-01T00:00:00"}) + "\n")
+    LabelStore(tmp_path / "labels.sqlite").set("a", "Disinformation")
+
+    assert compact(log, tmp_path / "labels.sqlite") == 2
+    rewritten = {e["id"]: e["label"] for e in map(json.loads, log.read_text().splitlines())}
+    assert rewritten == {"a": "Disinformation", "b": "Legit"}
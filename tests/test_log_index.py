@@ -0,0 +1,71 @@
+# tests/test_log_index.py
+
+import json
+from datetime import datetime, timedelta
+
+from src.utils.filtering import InferenceFilter
+from src.utils.log_index import InferenceLogIndex
+
+
+def _write(path, records):
+    with open(path, "a", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r) + "\n")
+
+
+def _record(i, days_ago=0, flagged=False, confidence=0.5, type_="article"):
+    return {
+        "file": f"rec-{i}",
+        "type": type_,
+        "ingested_at": (datetime.now() - timedelta(days=days_ago)).isoformat(),
+        "result": {"flagged": flagged, "confidence": confidence, "reason": "test"},
+    }
+
+
+def test_sync_is_incremental(tmp_path):
+    log = tmp_path / "inference_log.jsonl"
+    _write(log, [_record(i) for i in range(3)])
+    index = InferenceLogIndex(tmp_path / "index.sqlite", log)
+
+    assert index.sync() == 3
+    assert index.sync() == 0
+    _write(log, [_record(3)])
+    assert index.sync() == 1
+    assert index.count() == 4
+
+
+def test_filters_pushed_down(tmp_path):
+    log = tmp_path / "inference_log.jsonl"
+    _write(log, [
+        _record(0, days_ago=0, flagged=True, confidence=0.9),
+        _record(1, days_ago=0, flagged=False, confidence=0.9, type_="tweet"),
+        _record(2, days_ago=10, flagged=True, confidence=0.9),
+        _record(3, days_ago=0, flagged=True, confidence=0.2),
+    ])
+    index = InferenceLogIndex(tmp_path / "index.sqlite", log)
+    index.sync()
+
+    query = (InferenceFilter(index).filter_by_date(7).filter_by_type("article")
+             .filter_by_flagged(True).filter_by_confidence(0.5))
+    assert query.count() == 1
+    assert list(query.get_filtered()["file"]) == ["rec-0"]
+
+    ranked = InferenceFilter(index).get_filtered(limit=2, sort_by="confidence", descending=False)
+    assert list(ranked["file"]) == ["rec-3", "rec-0"]
+
+
+def test_collapse_duplicates(tmp_path):
+    log = tmp_path / "inference_log.jsonl"
+    records = [_record(i) for i in range(4)]
+    for record, (cid, size) in zip(records, [(1, 1), (1, 2), (2, 1), (1, 3)]):
+        record.update(cluster_id=cid, cluster_size=size)
+    _write(log, records + [_record(4)])
+    index = InferenceLogIndex(tmp_path / "index.sqlite", log)
+    index.sync()
+
+    query = InferenceFilter(index).collapse_duplicates(True)
+    assert query.count() == 3
+    assert sorted(query.get_filtered()["file"]) == ["rec-2", "rec-3", "rec-4"]
+
+    frame = index.query()
+    assert InferenceFilter(frame).collapse_duplicates(True).count() == 3
@@ -0,0 +1,41 @@
+# tests/test_log_reader.py
+
+import json
+
+import pandas as pd
+
+from src.utils import log_reader
+from src.utils.log_reader import InferenceLogReader
+
+
+def _append(path, start, count):
+    with open(path, "a") as f:
+        for i in range(start, start + count):
+            f.write(json.dumps({"file": f"f{i}", "type": "tweet", "cluster_id": i,
+                                "result": {"confidence": i / 10, "flagged": i % 2 == 0}}) + "\n")
+
+
+def test_refresh_parses_each_line_once_and_rarely_copies_history(tmp_path, monkeypatch):
+    parsed, concatenated = [], []
+    to_frame, concat = log_reader.records_to_frame, pd.concat
+    monkeypatch.setattr(log_reader, "records_to_frame",
+                        lambda records: parsed.append(len(records)) or to_frame(records))
+    monkeypatch.setattr(log_reader.pd, "concat",
+                        lambda frames, **kw: concatenated.append(sum(map(len, frames))) or concat(frames, **kw))
+
+    path = tmp_path / "inference_log.jsonl"
+    _append(path, 0, 4)
+    reader = InferenceLogReader(path)
+    assert len(reader.refresh()) == 4
+    _append(path, 4, 1)
+    assert len(reader.refresh()) == 5
+    _append(path, 5, 2)
+    df = reader.refresh()
+
+    # Only the new lines are parsed, and the last refresh fit in spare capacity without a concat.
+    assert [n for n in parsed if n] == [4, 1, 2]
+    assert concatenated == [4, 8]
+    assert df["file"].tolist() == [f"f{i}" for i in range(7)]
+    assert df["cluster_id"].tolist() == list(range(7))
+    assert df["type"].dtype == log_reader.CONTENT_TYPES and df["flagged"].dtype == bool
+    assert reader.refresh() is not None and len(reader.frame) == 7
@@ -0,0 +1,25 @@
+# tests/test_metadata_utils.py
+
+import json
+
+from src.utils import metadata_utils
+from src.utils.metadata_utils import load_preview
+
+
+def test_preview_cache_skips_missing_records_and_returns_copies(tmp_path, monkeypatch):
+    monkeypatch.setattr(metadata_utils, "RECORD_STORE_DIR", tmp_path / "no_store")
+    metadata_utils._cached_preview.cache_clear()
+    path = str(tmp_path / "a1.json")
+
+    assert load_preview(path) == {"text": "", "named_entities": [], "url": None}
+    # Written after the first lookup: the miss must not have been cached.
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"text": "x" * 50, "named_entities": ["NATO", "EU"], "url": "https://example.com"}, f)
+    preview = load_preview(path, max_chars=10)
+    assert preview == {"text": "x" * 10, "named_entities": ["NATO", "EU"], "url": "https://example.com"}
+
+    preview["named_entities"].append("UN")
+    preview["text"] = "edited"
+    assert load_preview(path, max_chars=10) == {"text": "x" * 10, "named_entities": ["NATO", "EU"],
+                                                "url": "https://example.com"}
+    assert metadata_utils._cached_preview.cache_info().hits == 1
@@ -0,0 +1,101 @@
+# tests/test_micro_batcher.py
+
+import pytest
+
+from src.inference.micro_batcher import MicroBatcher, aggregate_windows
+
+
+class WindowedModel:
+    """Each text is a space-separated list of per-window P(disinfo) values; a window is [CLS, p*100, SEP]."""
+
+    labels = ["real", "disinfo"]
+
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts):
+        return [[101, int(float(text.split()[0]) * 100), 102] for text in texts]
+
+    def encode_windows(self, texts, stride=128, max_windows=None):
+        return [[[101, int(float(p) * 100), 102] for p in text.split()][:max_windows] for text in texts]
+
+    def score_encoded(self, input_ids):
+        self.batches.append(len(input_ids))
+        probs = [[1 - ids[1] / 100, ids[1] / 100] for ids in input_ids]
+        return [self.labels[p[1] >= 0.5] for p in probs], probs
+
+
+def test_aggregations():
+    windows = [[0.9, 0.1], [0.4, 0.6], [0.8, 0.2]]
+    assert aggregate_windows(windows, "max") == [0.4, 0.6]
+    assert aggregate_windows(windows, "mean")[1] == pytest.approx(0.3)
+    attention = aggregate_windows(windows, "attention")[1]
+    assert 0.3 < attention < 0.6
+    with pytest.raises(ValueError):
+        aggregate_windows(windows, "median")
+
+
+def test_long_documents_cover_every_window_and_stop_early():
+    model = WindowedModel()
+    engine = MicroBatcher(model, max_batch_size=8, long_documents=True, stop_threshold=0.9)
+    texts = ["0.1 0.2 0.7", "0.95 0.1 0.1", "0.3"]
+    results = list(engine.run(texts))
+
+    # Truncation would have scored only the first window of the first text.
+    assert [label for _, label, _ in results] == ["disinfo", "disinfo", "real"]
+    assert results[0][2][1] == pytest.approx(0.7)
+    # Windows from all documents share batches: round 1 has 3, round 2 has 1, round 3 has 1.
+    assert model.batches == [3, 1, 1]
+    assert engine.stats.windows == 5 and engine.stats.stopped_early == 1
+
+
+def test_max_windows_bounds_compute_and_short_mode_is_unchanged():
+    model = WindowedModel()
+    engine = MicroBatcher(model, long_documents=True, max_windows=2, aggregate="mean")
+    _, _, probs = next(engine.run(["0.2 0.4 0.99"]))
+    assert probs[1] == pytest.approx(0.3)
+
+    short = MicroBatcher(WindowedModel())
+    assert [label for _, label, _ in short.run(["0.1 0.99", "0.8"])] == ["real", "disinfo"]
+
+
+@pytest.mark.parametrize("aggregate", ["max", "mean", "attention"])
+def test_stopping_window_is_the_document_score(aggregate):
+    engine = MicroBatcher(WindowedModel(), long_documents=True, aggregate=aggregate, stop_threshold=0.9)
+    results = list(engine.run(["0.1 0.2 0.95 0.1", "0.95 0.1 0.2 0.1"]))
+    assert [probs[1] for _, _, probs in results] == [pytest.approx(0.95)] * 2
+    assert [label for _, label, _ in results] == ["disinfo", "disinfo"]
+
+
+class LengthModel:
+    """A text of n words encodes to n tokens, all equal to its first word; P(disinfo) is that value / 100."""
+
+    labels = ["real", "disinfo"]
+
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts):
+        return [[int(text.split()[0])] * len(text.split()) for text in texts]
+
+    def score_encoded(self, input_ids):
+        self.batches.append([list(ids) for ids in input_ids])
+        probs = [[1 - ids[0] / 100, ids[0] / 100] for ids in input_ids]
+        return [self.labels[p[1] >= 0.5] for p in probs], probs
+
+
+def test_buckets_respect_batch_size_and_token_budget_and_keep_input_order():
+    lengths = [7, 1, 12, 3, 3, 9, 1, 25, 5, 12, 2, 8, 4]
+    texts = [" ".join([str(i)] * n) for i, n in enumerate(lengths)]
+    model = LengthModel()
+    engine = MicroBatcher(model, max_batch_size=3, max_tokens=20, window_size=8)
+    results = list(engine.run(texts))
+
+    assert [text for text, _, _ in results] == texts
+    assert [probs[1] for _, _, probs in results] == [pytest.approx(i / 100) for i in range(len(texts))]
+    assert sorted(len(ids) for batch in model.batches for ids in batch) == sorted(lengths)
+    for batch in model.batches:
+        assert len(batch) <= 3
+        # A single text longer than the budget still gets a batch of its own.
+        assert len(batch) == 1 or max(map(len, batch)) * len(batch) <= 20
+    assert engine.stats.padded_tokens == sum(max(map(len, b)) * len(b) for b in model.batches)
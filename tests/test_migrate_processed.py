@@ -0,0 +1,17 @@
+# tests/test_migrate_processed.py
+
+import json
+
+from scripts.migrate_processed_to_store import migrate
+from src.utils.record_store import RecordStore
+
+
+def test_migrated_records_keep_the_path_the_log_and_labels_used(tmp_path):
+    articles = tmp_path / "data" / "processed" / "articles"
+    articles.mkdir(parents=True)
+    (articles / "a1.json").write_text(json.dumps({"type": "article", "text": "x"}))
+
+    store_dir = tmp_path / "data" / "processed" / "store"
+    assert migrate(tmp_path / "data" / "processed", store_dir, delete=True, root=tmp_path) == 1
+    assert RecordStore(store_dir).get("a1")["source_file"] == "data/processed/articles/a1.json"
+    assert not (articles / "a1.json").exists()
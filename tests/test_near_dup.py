@@ -0,0 +1,44 @@
+# tests/test_near_dup.py
+
+from src.utils.near_dup import NearDupIndex
+
+BASE = ("breaking the election was stolen by foreign agents who hacked voting machines "
+        "in several swing states says anonymous insider at the commission")
+
+
+def test_near_duplicates_share_a_cluster(tmp_path):
+    index = NearDupIndex(tmp_path / "near_dup.sqlite")
+    results = index.assign_many([
+        ("a", BASE),
+        ("b", BASE + " share this now"),
+        ("c", "RT " + BASE.upper()),
+        ("d", "the weather tomorrow will be sunny with light winds across the north of the country"),
+        ("e", ""),
+    ])
+    assert results[0] == (results[0][0], 1)
+    assert results[1] == (results[0][0], 2)
+    assert results[2] == (results[0][0], 3)
+    assert results[3][0] != results[0][0] and results[3][1] == 1
+    assert results[4] is None
+
+
+def test_resaving_a_record_does_not_grow_its_cluster(tmp_path):
+    index = NearDupIndex(tmp_path / "near_dup.sqlite")
+    first = index.assign("a", BASE)
+    index.assign("b", BASE + " again")
+    assert index.assign("a", BASE) == (first[0], 2)
+    assert len(index) == 2
+
+
+def test_textless_records_are_not_clustered(tmp_path):
+    index = NearDupIndex(tmp_path / "near_dup.sqlite")
+    assert index.assign_many([("a", ""), ("b", "   "), ("c", None)]) == [None, None, None]
+    assert len(index) == 0
+
+
+def test_repeated_id_in_one_batch_is_assigned_once(tmp_path):
+    index = NearDupIndex(tmp_path / "near_dup.sqlite")
+    results = index.assign_many([("a", BASE), ("b", BASE + " share"), ("a", BASE)])
+    assert results[0][0] == results[1][0] == results[2][0]
+    assert results[2] == (results[0][0], 2)
+    assert len(index) == 2
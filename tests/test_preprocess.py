@@ -0,0 +1,95 @@
+# tests/test_preprocess.py
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("spacy")
+# preprocess is a src/ script and imports its siblings by bare name.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import preprocess
+from nlp_stage import NLPStage
+
+
+class FakeStage:
+    """Whitespace 'parse': lowercased words, one sentence per '.', capitalized words as entities."""
+
+    def pipe(self, texts):
+        for text in texts:
+            words = (text or "").replace(".", " ").split()
+            yield {
+                "clean_text": " ".join(w.lower() for w in words),
+                "sentence_count": max(1, (text or "").count(".")),
+                "named_entities": sorted({w for w in words if w[:1].isupper()}),
+            }
+
+
+@pytest.fixture
+def fake_stage(monkeypatch):
+    monkeypatch.setattr(preprocess, "nlp_stage", FakeStage())
+
+
+def test_entities_are_filled_from_the_parse_unless_the_extractor_gave_them(fake_stage):
+    df = pd.DataFrame({
+        "text": ["Officials in Berlin met Reuters.", "Video about Paris."],
+        "named_entities": [None, ["YouTube"]],
+    })
+    df = preprocess.add_nlp_features(df)
+    assert df["named_entities"].tolist() == [["Berlin", "Officials", "Reuters"], ["YouTube"]]
+    assert df["ner_count"].tolist() == [3, 1]
+    assert df["word_count"].tolist() == [5, 3]
+
+
+def test_empty_frame_gets_feature_columns(fake_stage):
+    df = preprocess.add_nlp_features(pd.DataFrame(columns=["id", "type", "text", "source_file"]))
+    assert len(df) == 0
+    assert {"clean_text", "sentence_count", "named_entities", "ner_count", "word_count"} <= set(df.columns)
+
+
+def test_nlp_stage_loads_only_what_it_needs():
+    spacy = pytest.importorskip("spacy")
+    try:
+        spacy.load("en_core_web_sm")
+    except OSError:
+        pytest.skip("en_core_web_sm is not installed")
+
+    stage = NLPStage(entities=False)
+    assert "ner" not in stage.nlp.pipe_names and "parser" not in stage.nlp.pipe_names
+    results = stage.analyze_many(["The cats were running. Then they slept.", None])
+    assert results[0]["sentence_count"] == 2 and "cat" in results[0]["clean_text"]
+    assert "named_entities" not in results[0]
+    assert results[1]["clean_text"] == ""
+
+
+@pytest.fixture
+def labeled_store(monkeypatch, fake_stage):
+    records = pd.DataFrame({
+        "id": ["a", "b", "c", "d"],
+        "type": ["article", "tweet", "tweet", "article"],
+        "text": ["Officials deny the Claim.", "vaccine microchips are real", "local event today.", None],
+    })
+    records["source_file"] = records["id"]
+    monkeypatch.setattr(preprocess, "load_metadata_files", lambda columns=None: records.copy())
+    labels = {"a": "Legit", "b": "Disinformation"}
+    monkeypatch.setattr(preprocess, "load_manual_labels", lambda: labels)
+    return labels
+
+
+@pytest.mark.parametrize("mode", ["tfidf", "hashing"])
+def test_features_stay_sparse_end_to_end(labeled_store, mode):
+    X, y, df, builder = preprocess.preprocess_and_vectorize(mode=mode, return_builder=True)
+
+    assert preprocess.sp.isspmatrix_csr(X)
+    text_width = len(builder.vectorizer.vocabulary_) if mode == "tfidf" else builder.vectorizer.n_features
+    assert X.shape == (2, text_width + len(preprocess.METADATA_FEATURES))
+    assert y.tolist() == ["Legit", "Disinformation"]
+
+
+@pytest.mark.parametrize("mode", ["tfidf", "hashing"])
+def test_no_labeled_rows_gives_an_empty_matrix(labeled_store, mode):
+    labeled_store.clear()
+    X, y, df = preprocess.preprocess_and_vectorize(mode=mode)
+    assert preprocess.sp.issparse(X) and X.shape[0] == 0 and len(y) == 0
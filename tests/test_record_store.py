@@ -0,0 +1,72 @@
+# tests/test_record_store.py
+
+import gzip
+import json
+
+import pandas as pd
+import pytest
+
+from src.utils.record_store import RecordStore, record_id
+
+
+def test_append_and_random_access(tmp_path):
+    store = RecordStore(tmp_path, shard_max_bytes=256)
+    for i in range(30):
+        store.append(f"t{i}", {"type": "tweet", "text": f"tweet number {i}"})
+
+    assert len(store) == 30
+    assert len(store.shards()) > 1
+    assert store.get("t17")["text"] == "tweet number 17"
+    assert store.get("missing") is None
+    assert set(store.get_many(["t1", "t2", "nope"])) == {"t1", "t2"}
+
+
+def test_reappend_supersedes_and_scan_is_live_only(tmp_path):
+    store = RecordStore(tmp_path, shard_max_bytes=200)
+    for i in range(10):
+        store.append(f"r{i}", {"type": "article" if i % 2 else "tweet", "text": str(i)})
+    store.append("r3", {"type": "article", "text": "edited"})
+
+    df = store.scan(columns=["text"])
+    assert len(df) == 10
+    assert df.set_index("id").loc["r3", "text"] == "edited"
+    assert len(store.scan(types=["tweet"])) == 5
+    assert [rid for rid, _ in store.iter_records(types=["tweet"])] == ["r0", "r2", "r4", "r6", "r8"]
+
+
+def test_shards_are_plain_jsonl_gz(tmp_path):
+    store = RecordStore(tmp_path)
+    store.append_many([("a", {"type": "tweet", "text": "x"}), ("b", {"type": "tweet", "text": "y"})])
+    with gzip.open(store._shard_path(1), "rt") as f:
+        assert [json.loads(line)["text"] for line in f] == ["x", "y"]
+
+
+def test_record_id_is_stable():
+    assert record_id({"tweet_id": 42}) == "42"
+    article = {"type": "article", "url": "https://example.com/a"}
+    assert record_id(article) == record_id(dict(article))
+
+
+def test_failed_parquet_seal_keeps_the_store_writable(tmp_path, monkeypatch):
+    def fail(self, *args, **kwargs):
+        raise ValueError("Could not convert 'x' with type str: tried to convert to int64")
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", fail)
+    store = RecordStore(tmp_path, shard_max_bytes=100)
+    for i in range(10):
+        store.append(f"r{i}", {"type": "tweet", "text": str(i)})
+
+    assert len(store.shards()) > 1
+    assert not list(tmp_path.glob("*.parquet*"))
+    assert len(store.scan(columns=["text"])) == 10
+
+
+def test_mixed_type_columns_fall_back_to_jsonl(tmp_path):
+    pytest.importorskip("pyarrow")
+    store = RecordStore(tmp_path, shard_max_bytes=100)
+    for i in range(10):
+        store.append(f"r{i}", {"type": "tweet", "text": str(i), "likes": i if i % 2 else f"{i}k"})
+
+    assert len(store.shards()) > 1
+    df = store.scan(columns=["likes"]).set_index("id")
+    assert len(df) == 10 and df.loc["r2", "likes"] == "2k" and df.loc["r3", "likes"] == 3
@@ -0,0 +1,77 @@
+# tests/test_result_cache.py
+
+from src.utils.result_cache import ResultCache, content_hash, read_cache_stats
+
+
+def test_normalized_duplicates_share_a_key():
+    assert content_hash("Breaking  NEWS\n today") == content_hash("breaking news today")
+    assert content_hash("breaking news") != content_hash("breaking views")
+
+
+def test_hit_skips_compute_and_counts(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite", model_version="v1")
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"flagged": True, "confidence": 0.9}
+
+    first, hit1 = cache.get_or_compute("Same text", compute)
+    second, hit2 = cache.get_or_compute("same   TEXT", compute)
+
+    assert (hit1, hit2) == (False, True)
+    assert first == second
+    assert len(calls) == 1
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    cache.close()
+
+
+def test_model_version_is_part_of_the_key(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    old = ResultCache(path, model_version="v1")
+    old.put("text", {"confidence": 0.1})
+    old.close()
+
+    new = ResultCache(path, model_version="v2")
+    assert new.get("text") is None
+    new.close()
+
+    reopened = ResultCache(path, model_version="v1", lru_size=0)
+    assert reopened.get("text") == {"confidence": 0.1}
+    reopened.close()
+
+
+def test_eviction_caps_entries(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = ResultCache(path, model_version="v1", max_entries=50)
+    for i in range(300):
+        cache.put(f"text {i}", {"i": i})
+    cache.close()
+    assert read_cache_stats(path)["entries"] <= 100
+
+
+def test_memory_hits_keep_rows_from_eviction(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite", model_version="v1", max_entries=20)
+    cache.FLUSH_EVERY = 5
+    cache.put("hot", {"n": 0})
+    for i in range(40):
+        # Answered from the in-process LRU, never from SQLite.
+        assert cache.get("hot") == {"n": 0}
+        cache.put(f"cold {i}", {"n": i})
+
+    cache.close()
+    assert ResultCache(tmp_path / "cache.sqlite", model_version="v1", lru_size=0).get("hot") == {"n": 0}
+
+
+def test_new_model_version_is_not_answered_from_the_old_one(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite", model_version="v1")
+    cache.put("some text", {"flagged": True})
+    cache.set_model_version("v2")
+    assert cache.get("some text") is None
+
+    cache.put("some text", {"flagged": False})
+    cache.set_model_version("v1")
+    assert cache.get("some text") == {"flagged": True}
+    cache.close()
@@ -0,0 +1,41 @@
+# tests/test_review_queue.py
+
+from src.utils.label_store import LabelStore
+from src.utils.review_queue import ReviewQueue
+
+
+def _entries(scores):
+    return [{"file": rid, "uncertainty": u, "text": rid} for rid, u in scores.items()]
+
+
+def test_dedupe_priority_and_labeled_skip(tmp_path):
+    labels = LabelStore(tmp_path / "labels.sqlite")
+    labels.set("b", "Legit")
+    queue = ReviewQueue(tmp_path / "queue.sqlite", labels_path=tmp_path / "labels.sqlite")
+
+    assert queue.push_many(_entries({"a": 0.2, "b": 0.9, "c": 0.5})) == 2
+    queue.push_many(_entries({"a": 0.8}))
+    assert len(queue) == 2
+    assert [item["file"] for item in queue.page()] == ["a", "c"]
+
+    labels.set("c", "Disinformation")
+    assert [item["file"] for item in queue.page()] == ["a"]
+
+
+def test_claims_are_exclusive_and_expire(tmp_path):
+    queue = ReviewQueue(tmp_path / "queue.sqlite")
+    queue.push_many(_entries({f"r{i}": i / 10 for i in range(5)}))
+
+    first = queue.claim_next(2, "alice")
+    second = queue.claim_next(2, "bob")
+    assert [i["file"] for i in first] == ["r4", "r3"]
+    assert [i["file"] for i in second] == ["r2", "r1"]
+
+    queue.complete("r4")
+    assert [i["file"] for i in queue.claimed("alice")] == ["r3"]
+
+    queue.claim_next(5, "carol", lease=-1)  # lease already over: items go back to the pool
+    assert [i["file"] for i in queue.claim_next(5, "dave")] == ["r0"]
+
+    queue.push_many(_entries({"old": 1.0}), ttl=-1)
+    assert queue.purge() == 1
@@ -0,0 +1,54 @@
+# tests/test_sampling.py
+
+import numpy as np
+
+from src.utils.sampling_utils import TopK, entropy, least_confidence, margin, select_uncertain
+from src.utils.score_cache import ScoreCache
+
+
+def _pool(n):
+    # P(class 1) = i / n, so the most uncertain records sit around i = n / 2.
+    return ((f"r{i}", {"text": str(i / n)}) for i in range(n))
+
+
+def _proba(texts):
+    p = np.array([float(t) for t in texts])
+    return np.column_stack([1 - p, p])
+
+
+def test_strategies_rank_the_same_binary_pool():
+    probs = _proba(["0.5", "0.6", "0.95"])
+    for fn in (entropy, margin, least_confidence):
+        scores = fn(probs)
+        assert scores[0] > scores[1] > scores[2]
+
+
+def test_topk_matches_full_sort():
+    scores = np.random.RandomState(0).rand(1000)
+    top = TopK(10)
+    for i in range(0, 1000, 64):
+        top.push_many(scores[i:i + 64], list(range(i, min(i + 64, 1000))))
+    assert [item for _, item in top.items()] == list(np.argsort(-scores)[:10])
+
+
+def test_select_uncertain_streams_and_reuses_cached_scores(tmp_path):
+    calls = []
+
+    def predict_proba(texts):
+        calls.append(len(texts))
+        return _proba(texts)
+
+    cache = ScoreCache(tmp_path / "scores.sqlite", "v0001:entropy")
+    stats = {}
+    top = select_uncertain(_pool(1000), predict_proba, 3, batch_size=100, cache=cache, stats=stats)
+    assert [rid for _, (rid, _) in top] == ["r500", "r499", "r501"]
+    assert max(calls) == 100 and stats == {"scored": 1000, "cached": 0}
+
+    calls.clear()
+    again = select_uncertain(_pool(1000), predict_proba, 3, batch_size=100, cache=cache, stats=stats)
+    assert again == top and calls == [] and stats["cached"] == 1000
+
+    # A new checkpoint invalidates the cached scores.
+    other = ScoreCache(tmp_path / "scores.sqlite", "v0002:entropy")
+    assert other.get_many(["r1"]) == {}
+    assert other.purge_other_versions() == 1000
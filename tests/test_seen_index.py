@@ -0,0 +1,27 @@
+# tests/test_seen_index.py
+
+import time
+
+from src.utils.seen_index import SeenIndex, canonicalize_url
+
+
+def test_canonicalize_url():
+    assert canonicalize_url("http://www.Example.com:80/story/?utm_source=rss&b=2&a=1#top") == \
+        "https://example.com/story?a=1&b=2"
+    assert canonicalize_url("https://example.com/") == "https://example.com/"
+
+
+def test_shared_between_instances_and_ttl(tmp_path):
+    path = tmp_path / "seen.idx"
+    first, second = SeenIndex(path), SeenIndex(path)
+
+    first.add_many([f"https://site.com/{i}" for i in range(100)])
+    assert "http://www.site.com/7/?fbclid=abc" in second
+    assert "https://site.com/not-seen" not in second
+    assert len(second) == 100
+
+    first.ttl = 0.01
+    time.sleep(0.02)
+    assert "https://site.com/7" not in first
+    assert first.compact() == 0
+    assert len(second) == 0
@@ -0,0 +1,57 @@
+# tests/test_stream_buffer.py
+
+from src.utils.stream_buffer import StreamBuffer
+
+
+def test_spills_when_full_and_refills_in_order(tmp_path):
+    buffer = StreamBuffer(max_items=4, spill_path=tmp_path / "spill.sqlite")
+    for i in range(10):
+        assert buffer.put({"id": i})
+
+    metrics = buffer.metrics()
+    assert metrics["memory_depth"] == 4 and metrics["spill_depth"] == 6 and metrics["spilled"] == 6
+
+    seen = []
+    while buffer.depth():
+        batch = buffer.get_batch(3, timeout=0.1)
+        seen += [item["id"] for _, item in batch]
+        buffer.task_done(batch)
+    assert seen == list(range(10))
+    assert buffer.metrics()["processed"] == 10
+
+
+def test_drops_without_spill(tmp_path):
+    buffer = StreamBuffer(max_items=2)
+    results = [buffer.put(i) for i in range(5)]
+    assert results == [True, True, False, False, False]
+    assert buffer.metrics()["dropped"] == 3
+    assert buffer.get_batch(10, timeout=0.1)[-1][1] == 1
+
+
+def test_puts_queue_behind_spilled_items(tmp_path):
+    buffer = StreamBuffer(max_items=4, spill_path=tmp_path / "spill.sqlite")
+    for i in range(8):
+        buffer.put(i)
+
+    seen = [item for _, item in buffer.get_batch(2, timeout=0.1)]
+    # Memory has room again, but 4..7 are still on disk.
+    for i in range(8, 10):
+        buffer.put(i)
+    while buffer.depth():
+        seen += [item for _, item in buffer.get_batch(3, timeout=0.1)]
+    assert seen == list(range(10))
+
+
+def test_requeued_batch_comes_back_before_newer_items(tmp_path):
+    buffer = StreamBuffer(max_items=2, spill_path=tmp_path / "spill.sqlite")
+    assert buffer._spill.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    for i in range(5):
+        buffer.put(i)
+
+    failed = buffer.get_batch(2, timeout=0.1)
+    assert buffer.requeue(failed) == 2
+    seen = []
+    while buffer.depth():
+        seen += [item for _, item in buffer.get_batch(2, timeout=0.1)]
+    assert seen == [0, 1, 2, 3, 4]
+    assert buffer.metrics()["requeued"] == 2
@@ -0,0 +1,75 @@
+# tests/test_vector_index.py
+
+import numpy as np
+import pytest
+
+from src.utils.vector_index import VectorIndex
+
+
+def _clustered(n, dim=32, topics=20, seed=0):
+    rng = np.random.RandomState(0)
+    centres = rng.randn(topics, dim)
+    rng = np.random.RandomState(seed + 1)
+    labels = rng.randint(topics, size=n)
+    return centres[labels] + 0.1 * rng.randn(n, dim), labels
+
+
+def test_exact_until_trained_then_ivf(tmp_path):
+    vectors, labels = _clustered(3000)
+    index = VectorIndex(tmp_path, nlist=16, nprobe=4, reduced_dim=32, train_size=1000, rerank=50)
+
+    assert index.add_many((f"r{i}", v) for i, v in enumerate(vectors[:500])) == 500
+    assert not index.trained
+    assert index.search(vectors[3], 1) == [("r3", pytest.approx(1.0, abs=1e-5))]
+
+    index.add_many((f"r{i}", v) for i, v in enumerate(vectors))
+    assert index.trained and len(index) == 3000
+
+    # Neighbours come from the same topic, and re-scoring makes the scores exact cosines.
+    results = index.search(vectors[42], 10)
+    assert results[0][0] == "r42"
+    assert all(labels[int(rid[1:])] == labels[42] for rid, _ in results)
+    assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+
+
+def test_other_processes_see_training_and_inserts(tmp_path):
+    vectors, _ = _clustered(1500)
+    writer = VectorIndex(tmp_path, nlist=8, reduced_dim=32, train_size=1000)
+    reader = VectorIndex(tmp_path)
+    writer.add_many((f"r{i}", v) for i, v in enumerate(vectors[:1200]))
+
+    assert reader.search(vectors[7], 1)[0][0] == "r7"
+    assert reader.trained and reader.nlist == 8
+
+    writer.add_many((f"r{i}", v) for i, v in enumerate(vectors))
+    assert reader.similar_to("r1400", 3)[0][0] != "r1400"
+    assert "r1499" in reader and reader.search(vectors[1499], 1)[0][0] == "r1499"
+
+
+def test_duplicates_and_dimension_checks(tmp_path):
+    index = VectorIndex(tmp_path)
+    assert index.search(np.ones(4), 5) == []
+    assert index.add("a", np.ones(4)) == 1
+    assert index.add("a", np.ones(4)) == 0
+    assert index.similar_to("missing") == []
+    with pytest.raises(ValueError):
+        index.add("b", np.ones(8))
+
+
+def test_embeddings_from_another_model_are_rejected(tmp_path):
+    VectorIndex(tmp_path, model="bert-base-uncased").add("a", np.ones(4))
+    with pytest.raises(ValueError):
+        VectorIndex(tmp_path, model="distilbert-base-uncased").add("b", np.ones(4))
+    assert VectorIndex(tmp_path, model="bert-base-uncased").add("b", np.ones(4)) == 1
+
+
+def test_training_discards_lists_from_a_crashed_run(tmp_path):
+    vectors, _ = _clustered(1000)
+    stale = tmp_path / "lists" / "00000.rows"
+    stale.parent.mkdir(parents=True)
+    np.arange(50, dtype=np.int64).tofile(stale)
+    index = VectorIndex(tmp_path, nlist=8, reduced_dim=32, train_size=1000)
+    index.add_many((f"r{i}", v) for i, v in enumerate(vectors))
+
+    assert index.trained
+    assert sum(len(index._list_arrays(i)[1]) for i in range(index.nlist)) == 1000